@@ -0,0 +1,147 @@
+"""Background analysis of saved journal entries."""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Dict, Iterable, Optional, Set
+
+from utils import analysis_version
+
+
+class BackgroundAnalyzer:
+    """
+    Score saved entries on a thread pool and write the results back.
+
+    The apps insert an entry with empty scores and hand it here, so a save
+    costs a single insert. Until the analysis is written the entry is
+    listed by `pending`; afterwards `collect` reports how it went. An
+    entry whose analysis fails (or is lost with the process) keeps a NULL
+    analyzer_version, so `rescore.py --stale` picks it up later.
+
+    With a BudgetedAnalyzer, entries submitted while every worker is busy
+    get its latency-budgeted analysis instead, so the queue drains and a
+    score lands quickly. A partial result is stored stamped '+partial'
+    and overwritten when the budgeted analyzer's background pass finishes.
+    """
+
+    # Finished outcomes kept for `collect`; older ones are dropped
+    MAX_FINISHED = 1000
+
+    def __init__(self, sentiment_analyzer, bias_detector, workers: int = 2,
+                 budgeted_analyzer=None):
+        """
+        Args:
+            sentiment_analyzer: Analyzer whose `analyze` scores the entry
+            bias_detector: Detector whose `detect_all` finds its biases
+            workers: Threads running analyses
+            budgeted_analyzer: Optional BudgetedAnalyzer used while the
+                pool is backed up
+        """
+        self.sentiment_analyzer = sentiment_analyzer
+        self.bias_detector = bias_detector
+        self.workers = workers
+        self.budgeted_analyzer = budgeted_analyzer
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='mirror-entry-analysis'
+        )
+        self._lock = threading.Lock()
+        self._pending: Dict[Any, Future] = {}
+        self._finished: OrderedDict = OrderedDict()
+
+    @property
+    def version(self) -> str:
+        """Version stamp written on analyzed entries."""
+        return analysis_version(self.sentiment_analyzer, self.bias_detector)
+
+    def submit(self, db, entry_id: Any, text: str) -> Future:
+        """
+        Analyze a saved entry in the background.
+
+        Args:
+            db: `Database` or `SupabaseDatabase` the entry was saved to
+            entry_id: Id returned by `add_journal_entry`
+            text: The entry text
+        """
+        with self._lock:
+            # Every worker already has an entry, so this one would queue
+            budgeted = self.budgeted_analyzer is not None and len(self._pending) >= self.workers
+            future = self._executor.submit(self._analyze, db, entry_id, text, budgeted)
+            self._pending[entry_id] = future
+        return future
+
+    def _analyze(self, db, entry_id: Any, text: str, budgeted: bool = False):
+        """Score one entry and store its scores and biases in one write."""
+        try:
+            if budgeted:
+                analysis = self.budgeted_analyzer.analyze(text)
+            else:
+                sentiment = self.sentiment_analyzer.analyze(text)
+                analysis = {
+                    'sentiment': sentiment,
+                    'biases': self.bias_detector.detect_all(text, sentiment['valence']),
+                    'partial': False,
+                    'analyzer_version': self.version,
+                    'pattern_version': self.bias_detector.version
+                }
+            self._save(db, entry_id, analysis)
+            if analysis['partial']:
+                # Started only once the partial result is stored, so the
+                # full one always lands last
+                self.budgeted_analyzer.complete_later(text, partial(self._save, db, entry_id))
+            outcome = {
+                'valence': analysis['sentiment']['valence'],
+                'biases': len(analysis['biases']),
+                'partial': analysis['partial']
+            }
+        except Exception as e:
+            print(f"Error analyzing entry {entry_id} in the background: {e}")
+            outcome = {'error': str(e)}
+
+        with self._lock:
+            self._pending.pop(entry_id, None)
+            self._finished[entry_id] = outcome
+            while len(self._finished) > self.MAX_FINISHED:
+                self._finished.popitem(last=False)
+
+    def _save(self, db, entry_id: Any, analysis: Dict[str, Any]):
+        """Store an analysis shaped like `BudgetedAnalyzer.analyze`'s."""
+        db.save_analyses([{
+            'entry_id': entry_id,
+            'sentiment_score': analysis['sentiment']['sentiment_score'],
+            'valence': analysis['sentiment']['valence'],
+            'analyzer_version': analysis['analyzer_version'],
+            'pattern_version': analysis['pattern_version'],
+            'biases': analysis['biases']
+        }])
+
+    def pending(self, entry_ids: Optional[Iterable[Any]] = None) -> Set[Any]:
+        """Ids of entries still being analyzed, optionally limited to `entry_ids`."""
+        with self._lock:
+            pending = set(self._pending)
+        return pending if entry_ids is None else pending & set(entry_ids)
+
+    def collect(self, entry_ids: Iterable[Any]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Take the outcomes of finished analyses among `entry_ids`.
+
+        Returns:
+            {entry_id: outcome} where an outcome has 'valence', 'biases'
+            (the number found) and 'partial', or 'error' if the analysis
+            failed. Each outcome is returned once.
+        """
+        with self._lock:
+            return {entry_id: self._finished.pop(entry_id)
+                    for entry_id in entry_ids if entry_id in self._finished}
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for running analyses, and the passes completing partial ones,
+        to finish; returns True if none remain.
+        """
+        with self._lock:
+            pending = list(self._pending.values())
+        _, not_done = wait(pending, timeout=timeout)
+        if not not_done and self.budgeted_analyzer is not None:
+            return self.budgeted_analyzer.wait(timeout)
+        return not not_done
@@ -0,0 +1,144 @@
+"""Process-pool helpers for bulk analysis."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# Batches smaller than this are scored inline; pool start-up costs more
+# than it saves on a handful of entries.
+MIN_PARALLEL_ITEMS = 64
+
+_worker_instance = None
+
+
+def _init_worker(factory: Callable[[], Any]):
+    """Build the per-process instance once when a worker starts."""
+    global _worker_instance
+    _worker_instance = factory()
+
+
+def _run_chunk(method_name: str, chunk: List[Tuple], batched: bool = False) -> List[Any]:
+    """Apply a method of the worker instance to every argument tuple in a chunk."""
+    return _apply(_worker_instance, method_name, chunk, batched)
+
+
+def _apply(instance: Any, method_name: str, chunk: Sequence[Tuple], batched: bool) -> List[Any]:
+    """Call a method per argument tuple, or once per chunk when `batched`."""
+    method = getattr(instance, method_name)
+    if batched:
+        return method(*[list(column) for column in zip(*chunk)])
+    return [method(*args) for args in chunk]
+
+
+def chunked(items: Sequence, size: int) -> List[Sequence]:
+    """Split a sequence into consecutive slices of at most `size` items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class WorkerPool:
+    """
+    A process pool whose workers each build one instance with `factory`.
+
+    Unlike `map_in_pool`, the pool and its per-worker instances are kept
+    between calls, so a long job sending many batches pays for worker
+    start-up and instance construction once.
+    """
+
+    def __init__(self, factory: Callable[[], Any], workers: Optional[int] = None,
+                 local: Any = None):
+        """
+        Args:
+            factory: Picklable callable that builds the instance in each worker
+            workers: Number of worker processes (defaults to CPU count)
+            local: Instance to use when a batch is scored in this process
+        """
+        self.factory = factory
+        self.workers = workers or os.cpu_count() or 1
+        self.local = local
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def map(
+        self,
+        method_name: str,
+        arg_tuples: Sequence[Tuple],
+        chunksize: int = 256,
+        batched: bool = False
+    ) -> List[Any]:
+        """
+        Call `method_name` on a worker instance for every argument tuple.
+
+        Args:
+            method_name: Name of the method to call on the instance
+            arg_tuples: Positional arguments for each call
+            chunksize: Number of calls sent to a worker per task
+            batched: Call the method once per chunk with one list per argument
+                (e.g. `method(texts)`) instead of once per tuple
+
+        Returns:
+            Results in the same order as `arg_tuples`
+        """
+        if not arg_tuples:
+            return []
+
+        if self.workers <= 1 or len(arg_tuples) < MIN_PARALLEL_ITEMS:
+            if self.local is None:
+                self.local = self.factory()
+            return _apply(self.local, method_name, arg_tuples, batched)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.factory,)
+            )
+
+        # Keep every worker busy on small batches instead of leaving some idle
+        chunksize = max(1, min(chunksize, -(-len(arg_tuples) // self.workers)))
+
+        results = []
+        chunks = chunked(list(arg_tuples), chunksize)
+        for chunk_results in self._executor.map(_run_chunk, [method_name] * len(chunks), chunks,
+                                                [batched] * len(chunks)):
+            results.extend(chunk_results)
+
+        return results
+
+    def close(self):
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> 'WorkerPool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def map_in_pool(
+    factory: Callable[[], Any],
+    method_name: str,
+    arg_tuples: Sequence[Tuple],
+    workers: Optional[int] = None,
+    chunksize: int = 256,
+    local: Any = None,
+    batched: bool = False
+) -> List[Any]:
+    """
+    Call `method_name` on a per-worker instance for every argument tuple.
+
+    Args:
+        factory: Picklable callable that builds the instance in each worker
+        method_name: Name of the method to call on that instance
+        arg_tuples: Positional arguments for each call
+        workers: Number of worker processes (defaults to CPU count)
+        chunksize: Number of calls sent to a worker per task
+        local: Instance to use when the batch is scored in this process
+        batched: Call the method once per chunk with one list per argument
+            (e.g. `method(texts)`) instead of once per tuple
+
+    Returns:
+        Results in the same order as `arg_tuples`
+    """
+    with WorkerPool(factory, workers=workers, local=local) as pool:
+        return pool.map(method_name, arg_tuples, chunksize=chunksize, batched=batched)
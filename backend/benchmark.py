@@ -0,0 +1,1056 @@
+"""Throughput benchmarks for the Mirror analyzers.
+
+Usage:
+    python benchmark.py batch --entries 2000 --workers 4
+    python benchmark.py emotions --words 5000
+    python benchmark.py vader --entries 5000
+    python benchmark.py incremental --words 10000
+    python benchmark.py rolling --entries 2000
+    python benchmark.py coldstart --runs 5
+    python benchmark.py polarity --entries 3000
+    python benchmark.py memory --entries 10000
+    python benchmark.py suite --entries 100 --output suite.json
+    python benchmark.py suite --baseline suite.json
+    python benchmark.py biasregex --entries 300
+    python benchmark.py adversarial --size 100000 --limit-ms 2000
+    python benchmark.py prefilter --entries 2000
+    python benchmark.py confidence --entries 300
+    python benchmark.py packs --threads 4 --reloads 50
+    python benchmark.py biascache --entries 500
+"""
+import argparse
+import copy
+import json
+import multiprocessing
+import os
+import pickle
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from bias_detector import BiasDetector
+from enhanced_bias_detector import EnhancedBiasDetector
+from pattern_packs import PatternPack, compile_pack, pack_path, reload_packs
+from sentiment_analyzer import SentimentAnalyzer
+from enhanced_sentiment import EnhancedSentimentAnalyzer
+from polarity import LexiconPolarity, TextBlobPolarity
+from result_cache import ResultCache
+from rolling_stats import RollingSentimentStats
+from shared_instances import deep_sizeof
+from synthetic_corpus import SAMPLE_SENTENCES, make_corpus, make_timeline, make_vader_corpus
+from tests.reference import (
+    NoTriggerFilter, per_pattern_basic_detect, per_pattern_detect, split_window_confidence
+)
+from text_processing import prepare_entry
+from vader_numpy import VectorizedVader
+
+
+def make_entries(count: int, sentences_per_entry: int = 8, seed: int = 7) -> List[str]:
+    """Build a reproducible list of journal-like entries."""
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choice(SAMPLE_SENTENCES) for _ in range(sentences_per_entry))
+        for _ in range(count)
+    ]
+
+
+def make_long_entry(words: int, seed: int = 7) -> str:
+    """Build a single entry of roughly `words` words."""
+    rng = random.Random(seed)
+    parts = []
+    count = 0
+    while count < words:
+        sentence = rng.choice(SAMPLE_SENTENCES)
+        parts.append(sentence)
+        count += len(sentence.split())
+    return ' '.join(parts)
+
+
+def make_distinct_sentences(words: int, seed: int = 7) -> List[str]:
+    """Build roughly `words` words of sentences that are all different."""
+    rng = random.Random(seed)
+    sentences = []
+    count = 0
+    while count < words:
+        sentence = f"On day {len(sentences)} {rng.choice(SAMPLE_SENTENCES)}"
+        sentences.append(sentence)
+        count += len(sentence.split())
+    return sentences
+
+
+def time_call(fn: Callable[[], object], repeat: int) -> float:
+    """Return the mean wall time of `fn` in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def measure(fn: Callable[[], object], count: int) -> float:
+    """Run `fn` once and return entries processed per second."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed > 0 else float('inf')
+
+
+def bench_batch(args):
+    """Compare the per-entry loop against `analyze_batch` and `detect_batch`."""
+    entries = make_entries(args.entries)
+
+    for analyzer_cls in (SentimentAnalyzer, EnhancedSentimentAnalyzer):
+        analyzer = analyzer_cls()
+        loop_rate = measure(lambda: [analyzer.analyze(t) for t in entries], len(entries))
+        batch_rate = measure(
+            lambda: analyzer.analyze_batch(entries, workers=args.workers),
+            len(entries)
+        )
+        print(f"{analyzer_cls.__name__}:")
+        print(f"  per-entry loop : {loop_rate:10.1f} entries/sec")
+        print(f"  analyze_batch  : {batch_rate:10.1f} entries/sec "
+              f"({args.workers or 'all'} workers, x{batch_rate / loop_rate:.2f})")
+
+    valences = [[-0.5, -0.12, 0.3][i % 3] for i in range(len(entries))]
+    for detector_cls in (BiasDetector, EnhancedBiasDetector):
+        detector = detector_cls()
+        expected = [detector.detect_all(t, v) for t, v in zip(entries, valences)]
+        loop_rate = measure(lambda: [detector.detect_all(t, v) for t, v in zip(entries, valences)],
+                            len(entries))
+        batch_rate = measure(
+            lambda: detector.detect_batch(entries, valences, workers=args.workers),
+            len(entries)
+        )
+        aligned = detector.detect_batch(entries, valences, workers=args.workers) == expected
+        print(f"{detector_cls.__name__}:")
+        print(f"  per-entry loop : {loop_rate:10.1f} entries/sec")
+        print(f"  detect_batch   : {batch_rate:10.1f} entries/sec "
+              f"({args.workers or 'all'} workers, x{batch_rate / loop_rate:.2f}, "
+              f"{'same' if aligned else 'DIFFERENT'} results)")
+
+
+def substring_emotions(emotion_words: Dict[str, List[str]], tokens) -> Dict[str, int]:
+    """The original O(words x lexicon) substring scan, kept as a baseline."""
+    emotions = {}
+    for emotion, words in emotion_words.items():
+        count = sum(1 for word in tokens if any(ew in word for ew in words))
+        if count > 0:
+            emotions[emotion] = count
+    return emotions
+
+
+def bench_emotions(args):
+    """Compare the substring scan against the compiled lexicon matcher."""
+    analyzer = EnhancedSentimentAnalyzer()
+    entry = prepare_entry(make_long_entry(args.words))
+
+    baseline_ms = time_call(
+        lambda: substring_emotions(analyzer.emotion_words, entry.tokens), args.repeat
+    )
+    matcher_ms = time_call(lambda: analyzer._detect_emotions(entry), args.repeat)
+
+    print(f"Emotion detection on a {entry.word_count}-word entry:")
+    print(f"  substring scan   : {baseline_ms:8.2f} ms")
+    print(f"  compiled matcher : {matcher_ms:8.2f} ms (x{baseline_ms / matcher_ms:.1f})")
+
+
+def bench_vader(args):
+    """Time the NumPy engine against the polarity_scores loop (tests check they agree)."""
+    analyzer = SentimentAnalyzer()
+    engine = VectorizedVader(analyzer.vader)
+    corpus = make_vader_corpus(args.entries, list(analyzer.vader.lexicon))
+
+    start = time.perf_counter()
+    [analyzer.vader.polarity_scores(text) for text in corpus]
+    reference_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.polarity_scores_batch(corpus)
+    vectorized_s = time.perf_counter() - start
+
+    print(f"VADER on {len(corpus)} entries:")
+    print(f"  polarity_scores loop : {len(corpus) / reference_s:10.1f} entries/sec")
+    print(f"  VectorizedVader      : {len(corpus) / vectorized_s:10.1f} entries/sec "
+          f"(x{reference_s / vectorized_s:.1f})")
+
+
+def bench_incremental(args):
+    """Compare whole-text analysis with sentence-level incremental re-scoring."""
+    sentences = make_distinct_sentences(args.words)
+    text = ' '.join(sentences)
+    edited = sentences[:]
+    edited[len(edited) // 2] = "Today I realised I was wrong and it actually went well!"
+    edited_text = ' '.join(edited)
+
+    print(f"Sentence-level re-scoring on a {len(text.split())}-word entry "
+          f"({len(sentences)} sentences):")
+
+    for analyzer_cls in (SentimentAnalyzer, EnhancedSentimentAnalyzer):
+        analyzer = analyzer_cls()
+        analyzer.analyze_incremental(text)
+        full_ms = time_call(lambda: analyzer._analyze(edited_text), args.repeat)
+
+        timings = []
+        rescored = []
+        for _ in range(args.repeat):
+            analyzer.sentence_scorer.cache.clear()
+            analyzer.analyze_incremental(text)
+            misses = analyzer.sentence_scorer.cache.stats()['misses']
+            start = time.perf_counter()
+            analyzer.analyze_incremental(edited_text)
+            timings.append((time.perf_counter() - start) * 1000)
+            rescored.append(analyzer.sentence_scorer.cache.stats()['misses'] - misses)
+        edit_ms = sum(timings) / len(timings)
+
+        analyzer.sentence_scorer.cache.clear()
+        cold_ms = time_call(lambda: analyzer.analyze_incremental(edited_text), 1)
+        warm_ms = time_call(lambda: analyzer.analyze_incremental(edited_text), args.repeat)
+
+        full = analyzer._analyze(edited_text)
+        incremental = analyzer.analyze_incremental(edited_text)
+
+        print(f"{analyzer_cls.__name__}:")
+        print(f"  full analysis        : {full_ms:8.1f} ms")
+        print(f"  incremental, cold    : {cold_ms:8.1f} ms")
+        print(f"  incremental, 1 edit  : {edit_ms:8.1f} ms (x{full_ms / edit_ms:.1f}, "
+              f"{max(rescored)} sentence(s) re-scored)")
+        print(f"  incremental, no edit : {warm_ms:8.1f} ms (x{full_ms / warm_ms:.1f})")
+        print(f"  valence full/incr.   : {full['valence']:.4f} / {incremental['valence']:.4f}")
+
+
+def bench_rolling(args):
+    """Time recomputing the pandas timeline statistics against incremental updates."""
+    analyzer = EnhancedSentimentAnalyzer()
+    df = make_timeline(args.entries)
+
+    def pandas_stats(frame):
+        rolling = analyzer.calculate_rolling_average(frame)
+        volatile = analyzer.detect_volatility(frame)
+        shifts = analyzer.detect_mood_shifts(frame)
+        return rolling['rolling_avg'], volatile, shifts['shift']
+
+    # The dashboard recomputes everything whenever an entry is added
+    start = time.perf_counter()
+    for end in range(1, len(df) + 1):
+        pandas_stats(df.iloc[:end])
+    recompute_s = time.perf_counter() - start
+
+    stats = RollingSentimentStats()
+    start = time.perf_counter()
+    rows = [stats.update(ts, v) for ts, v in zip(df['timestamp'], df['valence'])]
+    incremental_s = time.perf_counter() - start
+
+    print(f"Timeline statistics over {len(df)} entries, one entry at a time:")
+    print(f"  pandas recompute : {recompute_s * 1000 / len(df):8.3f} ms/entry")
+    print(f"  incremental      : {incremental_s * 1000 / len(rows):8.3f} ms/entry "
+          f"(x{recompute_s / incremental_s:.0f})")
+
+
+# Each snippet runs in a fresh interpreter and prints its timings (ms) as JSON
+COLDSTART_FROM_TEXT = """
+import json, time
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from textblob.en import sentiment
+start = time.perf_counter()
+SentimentIntensityAnalyzer()
+vader = time.perf_counter()
+len(sentiment)
+textblob = time.perf_counter()
+SentimentIntensityAnalyzer()
+again = time.perf_counter()
+print(json.dumps({'vader': (vader - start) * 1000, 'textblob': (textblob - vader) * 1000,
+                  'vader_again': (again - textblob) * 1000}))
+"""
+
+COLDSTART_FROM_SNAPSHOT = """
+import json, time
+from lexicon_snapshot import load_textblob_lexicon, vader_analyzer
+start = time.perf_counter()
+vader_analyzer()
+vader = time.perf_counter()
+load_textblob_lexicon()
+textblob = time.perf_counter()
+vader_analyzer()
+again = time.perf_counter()
+print(json.dumps({'vader': (vader - start) * 1000, 'textblob': (textblob - vader) * 1000,
+                  'vader_again': (again - textblob) * 1000}))
+"""
+
+COLDSTART_ANALYZERS = """
+import json, time
+from bias_detector import BiasDetector
+from enhanced_bias_detector import EnhancedBiasDetector
+from sentiment_analyzer import SentimentAnalyzer
+from enhanced_sentiment import EnhancedSentimentAnalyzer
+from polarity import LexiconPolarity, TextBlobPolarity
+timings = {}
+for cls in (SentimentAnalyzer, EnhancedSentimentAnalyzer):
+    start = time.perf_counter()
+    cls().analyze("I feel really good today, though a little worried.")
+    timings[cls.__name__] = (time.perf_counter() - start) * 1000
+print(json.dumps(timings))
+"""
+
+
+def run_fresh(code: str, runs: int) -> Dict[str, float]:
+    """Run a snippet in `runs` fresh interpreters and average its timings."""
+    totals: Dict[str, float] = {}
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                                text=True, check=True).stdout
+        for name, value in json.loads(output.splitlines()[-1]).items():
+            totals[name] = totals.get(name, 0.0) + value / runs
+    return totals
+
+
+def bench_coldstart(args):
+    """Compare loading the lexicons from their text files and from the snapshot."""
+    import lexicon_snapshot
+    lexicon_snapshot.build_snapshot()
+
+    from_text = run_fresh(COLDSTART_FROM_TEXT, args.runs)
+    from_snapshot = run_fresh(COLDSTART_FROM_SNAPSHOT, args.runs)
+    analyzers = run_fresh(COLDSTART_ANALYZERS, args.runs)
+
+    print(f"Lexicon loading in a fresh process (mean of {args.runs} runs):")
+    for name, label in (('vader', 'VADER analyzer   '), ('textblob', 'TextBlob lexicon '),
+                        ('vader_again', 'second VADER     ')):
+        print(f"  {label}: {from_text[name]:7.1f} ms from text, "
+              f"{from_snapshot[name]:7.1f} ms from snapshot "
+              f"(x{from_text[name] / max(from_snapshot[name], 1e-3):.0f})")
+    print("Construct and first analyze, from snapshot:")
+    for name, ms in analyzers.items():
+        print(f"  {name:26}: {ms:7.1f} ms")
+
+
+def bench_polarity(args):
+    """Compare the lexicon polarity backend with TextBlob for accuracy and speed."""
+    reference, fast = TextBlobPolarity(), LexiconPolarity()
+    corpora = {
+        'journal entries': make_entries(args.entries),
+        'VADER rule mix': make_vader_corpus(args.entries, list(SentimentAnalyzer().vader.lexicon))
+    }
+
+    for name, corpus in corpora.items():
+        start = time.perf_counter()
+        expected = [reference.scores(text) for text in corpus]
+        reference_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = [fast.scores(text) for text in corpus]
+        fast_s = time.perf_counter() - start
+
+        errors = [abs(a[0] - b[0]) for a, b in zip(expected, actual)]
+        identical = sum(a == b for a, b in zip(expected, actual))
+        print(f"Polarity on {len(corpus)} texts ({name}):")
+        print(f"  textblob : {len(corpus) / reference_s:10.1f} texts/sec")
+        print(f"  lexicon  : {len(corpus) / fast_s:10.1f} texts/sec "
+              f"(x{reference_s / fast_s:.1f})")
+        print(f"  agreement: {identical}/{len(corpus)} identical, polarity error "
+              f"mean {sum(errors) / len(errors):.4f} / max {max(errors):.4f}")
+
+    corpus = corpora['journal entries']
+    print(f"End-to-end analyze on {len(corpus)} journal entries:")
+    for analyzer_cls in (SentimentAnalyzer, EnhancedSentimentAnalyzer):
+        rates = {}
+        for backend in ('textblob', 'lexicon'):
+            analyzer = analyzer_cls(polarity_backend=backend)
+            rates[backend] = measure(lambda: [analyzer.analyze(t) for t in corpus], len(corpus))
+        print(f"  {analyzer_cls.__name__:26}: {rates['textblob']:8.1f} -> "
+              f"{rates['lexicon']:8.1f} entries/sec (x{rates['lexicon'] / rates['textblob']:.2f})")
+
+
+def bench_memory(args):
+    """Memory held by bulk results as dicts vs compact batches, per 100k entries."""
+    entries = make_entries(args.entries, seed=11)
+    scale = 100_000 / len(entries)
+
+    print(f"Bulk results for {len(entries)} entries, scaled to 100k entries:")
+    for analyzer_cls in (SentimentAnalyzer, EnhancedSentimentAnalyzer):
+        analyzer = analyzer_cls(polarity_backend='lexicon')
+        batch = analyzer.analyze_batch(entries, workers=args.workers, compact=True)
+        # A pickle round trip gives every dict its own objects, as results
+        # sent back by pool workers have
+        dicts = pickle.loads(pickle.dumps(batch.to_dicts()))
+
+        start = time.perf_counter()
+        converted = batch.to_dicts()
+        to_dicts_s = time.perf_counter() - start
+        assert converted == dicts
+
+        dict_bytes = deep_sizeof(dicts) * scale
+        batch_bytes = deep_sizeof(batch) * scale
+        print(f"{analyzer_cls.__name__}:")
+        print(f"  list of dicts : {dict_bytes / 2**20:8.1f} MB "
+              f"({dict_bytes / 100_000:.0f} B/entry), "
+              f"pickled {len(pickle.dumps(dicts)) * scale / 2**20:.1f} MB")
+        print(f"  compact batch : {batch_bytes / 2**20:8.1f} MB "
+              f"({batch_bytes / 100_000:.0f} B/entry, x{dict_bytes / batch_bytes:.1f} smaller), "
+              f"pickled {len(pickle.dumps(batch)) * scale / 2**20:.1f} MB")
+        print(f"  to_dicts      : {to_dicts_s * scale * 1000:8.1f} ms")
+
+
+class StageTimer:
+    """Record the wall time between successive `lap` calls, in milliseconds."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.timings[stage] = (now - self._last) * 1000
+        self._last = now
+
+
+def sentiment_stages(analyzer, text: str) -> Tuple[Dict[str, float], Dict[str, Any]]:
+    """
+    Score text the way the analyzer's `_analyze` does, timing each step.
+
+    Returns:
+        Per-stage milliseconds and the analysis result
+    """
+    timer = StageTimer()
+    if isinstance(analyzer, EnhancedSentimentAnalyzer):
+        entry = prepare_entry(text)
+        timer.lap('prepare')
+    vader_scores = analyzer.vader.polarity_scores(text)
+    timer.lap('vader')
+    polarity, subjectivity = analyzer.polarity.scores(text)
+    timer.lap('polarity')
+    if isinstance(analyzer, EnhancedSentimentAnalyzer):
+        emotions = analyzer._detect_emotions(entry)
+        timer.lap('emotions')
+        intensity = analyzer._calculate_intensity(entry)
+        timer.lap('intensity')
+        result = analyzer._build_result(entry, vader_scores, polarity, subjectivity,
+                                        emotions, intensity)
+    else:
+        result = analyzer._build_result(vader_scores, polarity, subjectivity)
+    timer.lap('combine')
+    return timer.timings, result
+
+
+def bias_stages(detector, text: str) -> Dict[str, float]:
+    """
+    Time a full scan of each bias type's patterns.
+
+    Runs every pattern to the end, without `detect_all`'s valence gates
+    and early exits, so it shows where the regex time goes rather than
+    what a call costs.
+    """
+    timer = StageTimer()
+    text_lower = text.lower()
+    timer.lap('lower')
+    for bias_type, group in detector.pack.pattern_groups.items():
+        for _ in group.matches(text_lower):
+            pass
+        timer.lap(bias_type)
+    return timer.timings
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99, mean and max of a list of latencies."""
+    array = np.asarray(values, dtype=float)
+    if not len(array):
+        return {}
+    p50, p95, p99 = np.percentile(array, [50, 95, 99])
+    return {'p50': p50, 'p95': p95, 'p99': p99, 'mean': array.mean(), 'max': array.max()}
+
+
+LENGTH_BUCKETS = ((0, 100), (100, 1000), (1000, 5000), (5000, None))
+
+
+def summarize_run(version: str, corpus, totals: List[float],
+                  stages: List[Dict[str, float]]) -> Dict[str, Any]:
+    """Build the report section for one analyzer."""
+    seconds = sum(totals) / 1000
+    words = sum(entry.words for entry in corpus)
+
+    by_length = {}
+    for low, high in LENGTH_BUCKETS:
+        latencies = [total for entry, total in zip(corpus, totals)
+                     if entry.words >= low and (high is None or entry.words < high)]
+        label = f'{low}-{high}' if high else f'{low}+'
+        by_length[label] = {'entries': len(latencies), **percentiles(latencies)}
+
+    by_density = {}
+    for density in sorted({entry.bias_density for entry in corpus}):
+        latencies = [total for entry, total in zip(corpus, totals)
+                     if entry.bias_density == density]
+        by_density[str(density)] = {'entries': len(latencies), **percentiles(latencies)}
+
+    stage_names = list(dict.fromkeys(stage for timings in stages for stage in timings))
+    stage_total = sum(sum(timings.values()) for timings in stages) or 1.0
+    by_stage = {}
+    for stage in stage_names:
+        latencies = [timings.get(stage, 0.0) for timings in stages]
+        by_stage[stage] = {**percentiles(latencies), 'share': sum(latencies) / stage_total}
+
+    return {
+        'version': version,
+        'latency_ms': percentiles(totals),
+        'throughput': {
+            'entries_per_sec': len(totals) / seconds if seconds else float('inf'),
+            'words_per_sec': words / seconds if seconds else float('inf')
+        },
+        'by_length': by_length,
+        'by_bias_density': by_density,
+        'stages_ms': by_stage
+    }
+
+
+def run_suite(corpus, polarity_backend: str = 'textblob') -> Dict[str, Dict[str, Any]]:
+    """Time every analyzer and detector over the corpus, per entry and per stage."""
+    texts = [entry.text for entry in corpus]
+    report = {}
+
+    # Each detector gets the valences of the analyzer it is paired with in the apps
+    pairs = [
+        (SentimentAnalyzer(polarity_backend=polarity_backend), BiasDetector()),
+        (EnhancedSentimentAnalyzer(polarity_backend=polarity_backend), EnhancedBiasDetector()),
+    ]
+    for analyzer, detector in pairs:
+        analyzer.warm_up()
+        detector.warm_up()
+
+        # One staged pass: VADER is quadratic in entry length, so a second,
+        # untimed-by-stage pass would double an already long run
+        stages, valences = [], []
+        for text in texts:
+            timings, result = sentiment_stages(analyzer, text)
+            stages.append(timings)
+            valences.append(result['valence'])
+        totals = [sum(timings.values()) for timings in stages]
+        report[type(analyzer).__name__] = summarize_run(
+            analyzer.version, corpus, totals, stages
+        )
+
+        totals = []
+        for text, valence in zip(texts, valences):
+            start = time.perf_counter()
+            detector.detect_all(text, valence)
+            totals.append((time.perf_counter() - start) * 1000)
+        stages = [bias_stages(detector, text) for text in texts]
+        report[type(detector).__name__] = summarize_run(
+            detector.version, corpus, totals, stages
+        )
+
+    return report
+
+
+def print_suite(report: Dict[str, Any], baseline: Dict[str, Any] = None):
+    """Print the headline numbers, with ratios against a baseline report if given."""
+    for name, run in report['analyzers'].items():
+        latency = run['latency_ms']
+        rate = run['throughput']['entries_per_sec']
+        line = (f"{name:26} p50 {latency['p50']:9.2f}  p95 {latency['p95']:9.2f}  "
+                f"p99 {latency['p99']:9.2f} ms  {rate:9.1f} entries/sec")
+        old = (baseline or {}).get('analyzers', {}).get(name)
+        if old:
+            line += (f"  (speedup vs baseline: p50 x{old['latency_ms']['p50'] / latency['p50']:.2f}, "
+                     f"p99 x{old['latency_ms']['p99'] / latency['p99']:.2f})")
+        print(line)
+
+        stages = sorted(run['stages_ms'].items(), key=lambda item: -item[1]['share'])
+        print('    ' + ', '.join(f"{stage} {stats['share']:.0%}" for stage, stats in stages))
+
+
+def bench_suite(args):
+    """Latency percentiles and throughput per analyzer and stage on a synthetic corpus."""
+    corpus = make_corpus(args.entries, seed=args.seed, min_words=args.min_words,
+                         max_words=args.max_words)
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'seed': args.seed,
+            'entries': len(corpus),
+            'words': sum(entry.words for entry in corpus),
+            'min_words': args.min_words,
+            'max_words': args.max_words,
+            'polarity_backend': args.polarity,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'analyzers': run_suite(corpus, polarity_backend=args.polarity)
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        corpus_keys = ('seed', 'entries', 'min_words', 'max_words')
+        if any(baseline.get('meta', {}).get(key) != report['meta'][key] for key in corpus_keys):
+            print("Warning: the baseline was run on a different corpus")
+
+    print(f"Suite on {len(corpus)} entries, {report['meta']['words']} words "
+          f"(seed {args.seed}), latency per entry:")
+    print_suite(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+def bench_biasregex(args):
+    """Time per-pattern scans vs one master regex per bias type, for both detectors."""
+    corpus = make_corpus(args.entries, seed=args.seed, max_words=args.max_words)
+    valences = [-0.5, -0.12, 0.3]
+    cases = [(entry, valences[i % len(valences)]) for i, entry in enumerate(corpus)]
+    words = sum(entry.words for entry in corpus)
+
+    for detector, per_pattern in ((BiasDetector(), per_pattern_basic_detect),
+                                  (EnhancedBiasDetector(), per_pattern_detect)):
+        timings = {'per pattern': [], 'master regex': []}
+        for entry, valence in cases:
+            for name, detect in (('per pattern', per_pattern),
+                                 ('master regex', type(detector).detect_all)):
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    detect(detector, entry.text, valence)
+                timings[name].append((time.perf_counter() - start) * 1000 / args.repeat)
+
+        print(f"{type(detector).__name__}.detect_all on {len(corpus)} entries ({words} words):")
+        baseline = percentiles(timings['per pattern'])
+        for name, latencies in timings.items():
+            stats = percentiles(latencies)
+            print(f"  {name:12}: mean {stats['mean']:7.3f}  p50 {stats['p50']:7.3f}  "
+                  f"p95 {stats['p95']:7.3f}  p99 {stats['p99']:7.3f} ms/entry "
+                  f"(x{baseline['mean'] / stats['mean']:.2f}, "
+                  f"{1000 / stats['mean']:.0f} entries/sec)")
+        for low, high in LENGTH_BUCKETS:
+            rows = [i for i, entry in enumerate(corpus)
+                    if entry.words >= low and (high is None or entry.words < high)]
+            if rows:
+                before = sum(timings['per pattern'][i] for i in rows) / len(rows)
+                after = sum(timings['master regex'][i] for i in rows) / len(rows)
+                label = f'{low}-{high}' if high else f'{low}+'
+                print(f"  {label:>10} words: {before:8.3f} -> {after:8.3f} ms/entry "
+                      f"(x{before / after:.2f}, {len(rows)} entries)")
+
+
+def trigger_words(pattern: str) -> List[List[str]]:
+    """Literal alternatives of each parenthesized group in a pattern, in order."""
+    groups = []
+    for group in re.findall(r'\(([^()]*)\)', pattern):
+        words = [re.split(r'[.\\\[]', alternative.replace("\\'", "'"))[0]
+                 for alternative in group.split('|')]
+        words = [word for word in words if word]
+        if words:
+            groups.append(words)
+    return groups
+
+
+def repeat_to(words: List[str], size: int) -> str:
+    """Words cycled into one line of `size` characters, with no sentence breaks."""
+    line = ' '.join(words) + ' '
+    return (line * (size // len(line) + 1))[:size]
+
+
+def adversarial_texts(pattern: str, size: int) -> Dict[str, str]:
+    """
+    Inputs that make a pattern backtrack as much as it can.
+
+    All are a single line without sentence punctuation, so gaps between
+    a pattern's parts are never cut short: each opening word alone, the
+    opening words together, every part but the last (so partial matches
+    pile up and then fail), and every part (so matches are found
+    everywhere).
+    """
+    groups = trigger_words(pattern)
+    if not groups:
+        return {}
+    texts = {f'"{word}"': repeat_to([word], size) for word in groups[0]}
+    texts['openers'] = repeat_to(groups[0], size)
+    if len(groups) > 1:
+        texts['no closer'] = repeat_to([word for words in groups[:-1] for word in words], size)
+    texts['all parts'] = repeat_to([word for words in groups for word in words], size)
+    return texts
+
+
+def time_pattern(pattern: str, texts: Dict[str, str]) -> Tuple[str, float]:
+    """Worst full `finditer` scan of a pattern over the texts, as (text kind, ms)."""
+    compiled = re.compile(pattern, re.IGNORECASE)
+    worst = ('', 0.0)
+    for kind, text in texts.items():
+        start = time.perf_counter()
+        for _ in compiled.finditer(text):
+            pass
+        elapsed = (time.perf_counter() - start) * 1000
+        if elapsed > worst[1]:
+            worst = (kind, elapsed)
+    return worst
+
+
+def detector_patterns(detector) -> List[Tuple[str, str, List[str]]]:
+    """
+    (label, regex, source patterns) for every regex a detector runs.
+
+    Each bias type's master regex is included, with the patterns it
+    combines as its source.
+    """
+    found = []
+    pack = detector.pack
+    for bias_type, patterns in pack.patterns.items():
+        patterns = [pattern for pattern, _ in patterns]
+        for i, pattern in enumerate(patterns):
+            found.append((f'{bias_type} #{i}', pattern, [pattern]))
+        found.append((f'{bias_type} master', pack.pattern_groups[bias_type].master.pattern, patterns))
+    return found
+
+
+def bench_adversarial(args):
+    """Time every bias pattern on inputs built to make it backtrack; exit 1 if any is too slow."""
+    timeout = max(args.limit_ms * 5 / 1000, 5.0)
+    slow = []
+    pool = multiprocessing.Pool(1)
+    try:
+        for detector in (BiasDetector(), EnhancedBiasDetector()):
+            print(f"{detector.version} on {args.size // 1000} KB inputs "
+                  f"(limit {args.limit_ms:.0f} ms per pattern):")
+            for label, pattern, sources in detector_patterns(detector):
+                texts = {}
+                for i, source in enumerate(sources):
+                    for kind, text in adversarial_texts(source, args.size).items():
+                        texts[kind if len(sources) == 1 else f'{kind} for #{i}'] = text
+                try:
+                    kind, ms = pool.apply_async(time_pattern, (pattern, texts)).get(timeout)
+                except multiprocessing.TimeoutError:
+                    pool.terminate()
+                    pool = multiprocessing.Pool(1)
+                    kind, ms = f'timed out after {timeout:.0f} s', float('inf')
+                over = ms > args.limit_ms
+                if over:
+                    slow.append(f'{detector.version} {label}')
+                print(f"  {label:32}: {ms:9.1f} ms  {'SLOW' if over else 'ok  '}  worst on {kind}")
+    finally:
+        pool.terminate()
+
+    if slow:
+        print(f"{len(slow)} pattern(s) over {args.limit_ms:.0f} ms: {', '.join(slow)}")
+        sys.exit(1)
+    print(f"All patterns within {args.limit_ms:.0f} ms.")
+
+
+def bench_prefilter(args):
+    """Time bias detection with and without the trigger-word prefilter."""
+    corpus = make_corpus(args.entries, seed=args.seed, max_words=args.max_words)
+    valences = [-0.5, -0.12, 0.3]
+    cases = [(entry.text, valences[i % len(valences)]) for i, entry in enumerate(corpus)]
+
+    for detector_class in (BiasDetector, EnhancedBiasDetector):
+        filtered = detector_class()
+        # A private copy, not the shared cached one
+        unfiltered_pack = PatternPack(filtered.pack.spec)
+        unfiltered_pack.trigger_filter = NoTriggerFilter(filtered.pack.trigger_filter)
+        unfiltered = detector_class(pattern_pack=unfiltered_pack)
+
+        bias_types = len(filtered.pack.trigger_filter.words)
+        skipped = sum(bias_types - len(filtered.pack.trigger_filter.candidates(text.lower()))
+                      for text, _ in cases)
+        entries_skipped = {
+            bias_type: sum(bias_type not in filtered.pack.trigger_filter.candidates(text.lower())
+                           for text, _ in cases)
+            for bias_type in filtered.pack.trigger_filter.words
+        }
+
+        # Best of the interleaved repeats, to keep machine noise out
+        timings = {'all patterns': float('inf'), 'prefiltered': float('inf')}
+        for _ in range(args.repeat):
+            for name, detector in (('all patterns', unfiltered), ('prefiltered', filtered)):
+                start = time.perf_counter()
+                for text, valence in cases:
+                    detector.detect_all(text, valence)
+                elapsed = (time.perf_counter() - start) * 1000 / len(cases)
+                timings[name] = min(timings[name], elapsed)
+
+        print(f"{filtered.version} on {len(cases)} entries, "
+              f"{100 * skipped / (bias_types * len(cases)):.1f}% of bias type checks skipped:")
+        for bias_type, count in entries_skipped.items():
+            print(f"  {bias_type:26}: skipped for {100 * count / len(cases):5.1f}% of entries")
+        print(f"  {timings['all patterns']:.3f} -> {timings['prefiltered']:.3f} ms/entry "
+              f"(x{timings['all patterns'] / timings['prefiltered']:.2f})")
+
+
+def bench_confidence(args):
+    """Time window splitting vs the token-offset index for bias match confidence."""
+    corpus = make_corpus(args.entries, seed=args.seed, max_words=args.max_words)
+    detector = EnhancedBiasDetector()
+    cases = []
+    for entry in corpus:
+        text_lower = entry.text.lower()
+        matches = [(start, end, group.confidences[index])
+                   for group in detector.pack.pattern_groups.values()
+                   for index, start, end in group.matches(text_lower)]
+        cases.append((text_lower, matches))
+
+    def split_windows(text_lower, matches):
+        return [split_window_confidence(detector, text_lower, start, end, base)
+                for start, end, base in matches]
+
+    def indexed(text_lower, matches):
+        context = detector.context_modifiers.index(text_lower)
+        return [detector._calculate_confidence(context, start, end, base)
+                for start, end, base in matches]
+
+    timings = {'split windows': float('inf'), 'token index': float('inf')}
+    for _ in range(args.repeat):
+        for name, confidences in (('split windows', split_windows), ('token index', indexed)):
+            start = time.perf_counter()
+            for case in cases:
+                confidences(*case)
+            timings[name] = min(timings[name], (time.perf_counter() - start) * 1000 / len(cases))
+
+    matches = sum(len(case[1]) for case in cases)
+    print(f"Confidence of {matches} matches in {len(cases)} entries:")
+    for name, ms in timings.items():
+        print(f"  {name:13}: {ms:7.3f} ms/entry (x{timings['split windows'] / ms:.2f})")
+    for low, high in LENGTH_BUCKETS:
+        rows = [case for entry, case in zip(corpus, cases)
+                if entry.words >= low and (high is None or entry.words < high)]
+        if rows:
+            before = time_call(lambda: [split_windows(*case) for case in rows], args.repeat)
+            after = time_call(lambda: [indexed(*case) for case in rows], args.repeat)
+            label = f'{low}-{high}' if high else f'{low}+'
+            print(f"  {label:>10} words: {before / len(rows):8.3f} -> "
+                  f"{after / len(rows):8.3f} ms/entry (x{before / after:.2f}, "
+                  f"{sum(len(case[1]) for case in rows) / len(rows):.0f} matches/entry)")
+
+
+def write_pack(path: str, spec: Dict[str, Any]):
+    """Write a pattern pack file atomically, as a deploy would."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(spec, f)
+    os.replace(tmp_path, path)
+
+
+def bench_packs(args):
+    """Detector construction from the shared pack cache, and pack reloads during detection."""
+    corpus = make_corpus(args.entries, seed=args.seed, max_words=args.max_words)
+    valences = [-0.5, -0.12, 0.3]
+    cases = [(entry.text, valences[i % len(valences)]) for i, entry in enumerate(corpus)]
+
+    for detector_class in (BiasDetector, EnhancedBiasDetector):
+        spec = detector_class().pack.spec
+        # Purged so `re`'s own cache doesn't hide the compile
+        compile_ms = time_call(lambda: (re.purge(), PatternPack(spec)), args.repeat)
+        construct_ms = time_call(detector_class, args.repeat)
+        print(f"{detector_class.__name__}: compiling its pack {compile_ms:.2f} ms, "
+              f"building a detector {construct_ms:.3f} ms (x{compile_ms / construct_ms:.0f})")
+
+    # Two packs that give different results, swapped back and forth while
+    # threads detect; every result must match one pack or the other
+    with open(pack_path('enhanced'), encoding='utf-8') as f:
+        spec_a = json.load(f)
+    spec_b = copy.deepcopy(spec_a)
+    spec_b['version'] = f"{spec_a['version']}-reload"
+    for patterns in spec_b['bias_types'].values():
+        for entry in patterns:
+            entry['confidence'] = round(entry['confidence'] * 0.9, 3)
+
+    with tempfile.TemporaryDirectory() as pack_dir:
+        path = os.path.join(pack_dir, 'reload.json')
+        write_pack(path, spec_a)
+        detector = EnhancedBiasDetector(pattern_pack=path)
+        expected = [
+            [pinned.detect_all(text, valence) for text, valence in cases]
+            for pinned in (EnhancedBiasDetector(pattern_pack=compile_pack(spec))
+                           for spec in (spec_a, spec_b))
+        ]
+        differing = sum(a != b for a, b in zip(*expected))
+
+        stop = threading.Event()
+        checked = [0] * args.threads
+        mixed = [0] * args.threads
+
+        def detect(worker: int):
+            while not stop.is_set():
+                for i, (text, valence) in enumerate(cases):
+                    biases = detector.detect_all(text, valence)
+                    checked[worker] += 1
+                    if biases != expected[0][i] and biases != expected[1][i]:
+                        mixed[worker] += 1
+
+        threads = [threading.Thread(target=detect, args=(worker,)) for worker in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        reload_ms = []
+        versions = set()
+        try:
+            for i in range(args.reloads):
+                write_pack(path, spec_b if i % 2 == 0 else spec_a)
+                start = time.perf_counter()
+                reload_packs(force=True)
+                reload_ms.append((time.perf_counter() - start) * 1000)
+                versions.add(detector.version)
+                time.sleep(args.interval_ms / 1000)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    print(f"{args.reloads} reloads while {args.threads} thread(s) ran {sum(checked)} detections "
+          f"({differing}/{len(cases)} entries differ between the packs): "
+          f"{sum(mixed)} matched neither pack; versions seen {sorted(versions)}")
+    print(f"  reload: {percentiles(reload_ms)['p50']:.3f} ms p50, "
+          f"{max(reload_ms):.3f} ms max (the first compiles each pack, later ones reuse it)")
+    if sum(mixed):
+        sys.exit(1)
+
+
+def bench_biascache(args):
+    """Repeated bias detections without a cache, from the LRU tier and from the SQLite tier."""
+    corpus = make_corpus(args.entries, seed=args.seed, max_words=args.max_words)
+    # Valences on and either side of every gate, so each bucket is exercised
+    valences = [-0.5, -0.2, -0.17, -0.15, -0.12, -0.1, -0.05, 0.3]
+    rng = random.Random(args.seed)
+    cases = [(entry.text, rng.choice(valences)) for entry in corpus]
+    # Every valence for every entry, shuffled so buckets fill in any order
+    spread = [(entry.text, valence) for entry in corpus for valence in valences]
+    rng.shuffle(spread)
+
+    def per_entry_ms(detector) -> float:
+        start = time.perf_counter()
+        for text, valence in cases:
+            detector.detect_all(text, valence)
+        return (time.perf_counter() - start) * 1000 / len(cases)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for detector_class in (BiasDetector, EnhancedBiasDetector):
+            uncached = detector_class()
+            checked = detector_class(cache=ResultCache(max_entries=len(spread)))
+            identical = sum(checked.detect_all(text, valence) == uncached.detect_all(text, valence)
+                            for text, valence in spread)
+
+            memory = detector_class(cache=ResultCache(max_entries=args.entries))
+            db_path = os.path.join(cache_dir, f'{detector_class.__name__}.db')
+            filled = detector_class(cache=ResultCache(max_entries=args.entries, db_path=db_path))
+            per_entry_ms(filled)
+            # A fresh process's view: nothing in memory, everything on disk
+            disk = detector_class(cache=ResultCache(max_entries=args.entries, db_path=db_path))
+            timings = [
+                ('no cache', min(per_entry_ms(uncached) for _ in range(args.repeat))),
+                ('LRU, first pass', per_entry_ms(memory)),
+                ('LRU, repeat', min(per_entry_ms(memory) for _ in range(args.repeat))),
+                ('SQLite, new process', per_entry_ms(disk)),
+            ]
+
+            stats = memory.cache.stats()
+            print(f"{uncached.version} on {len(cases)} entries "
+                  f"({identical}/{len(spread)} detections identical across valence buckets; "
+                  f"LRU hit rate {stats['hit_rate']:.0%}):")
+            for name, ms in timings:
+                print(f"  {name:20}: {ms:8.4f} ms/entry (x{timings[0][1] / ms:.1f})")
+
+
+def main():
+    """Parse arguments and run the selected benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='suite', required=True)
+
+    batch = subparsers.add_parser('batch', help='per-entry loop vs analyze_batch')
+    batch.add_argument('--entries', type=int, default=2000)
+    batch.add_argument('--workers', type=int, default=None)
+    batch.set_defaults(func=bench_batch)
+
+    emotions = subparsers.add_parser('emotions', help='emotion lexicon matching')
+    emotions.add_argument('--words', type=int, default=5000)
+    emotions.add_argument('--repeat', type=int, default=20)
+    emotions.set_defaults(func=bench_emotions)
+
+    vader = subparsers.add_parser('vader', help='NumPy VADER parity and speedup')
+    vader.add_argument('--entries', type=int, default=5000)
+    vader.set_defaults(func=bench_vader)
+
+    incremental = subparsers.add_parser('incremental', help='sentence-level re-scoring')
+    incremental.add_argument('--words', type=int, default=10000)
+    incremental.add_argument('--repeat', type=int, default=5)
+    incremental.set_defaults(func=bench_incremental)
+
+    rolling = subparsers.add_parser('rolling', help='incremental timeline statistics')
+    rolling.add_argument('--entries', type=int, default=2000)
+    rolling.set_defaults(func=bench_rolling)
+
+    coldstart = subparsers.add_parser('coldstart', help='lexicon loading from the snapshot')
+    coldstart.add_argument('--runs', type=int, default=5)
+    coldstart.set_defaults(func=bench_coldstart)
+
+    polarity = subparsers.add_parser('polarity', help='lexicon polarity backend vs TextBlob')
+    polarity.add_argument('--entries', type=int, default=3000)
+    polarity.set_defaults(func=bench_polarity)
+
+    memory = subparsers.add_parser('memory', help='bulk results as dicts vs compact batches')
+    memory.add_argument('--entries', type=int, default=10000)
+    memory.add_argument('--workers', type=int, default=None)
+    memory.set_defaults(func=bench_memory)
+
+    suite = subparsers.add_parser('suite', help='latency percentiles per analyzer and stage')
+    suite.add_argument('--entries', type=int, default=100)
+    suite.add_argument('--seed', type=int, default=7)
+    suite.add_argument('--min-words', type=int, default=10)
+    suite.add_argument('--max-words', type=int, default=20000)
+    suite.add_argument('--polarity', choices=['textblob', 'lexicon'], default='textblob')
+    suite.add_argument('--output', default=None, help='write the JSON report here')
+    suite.add_argument('--baseline', default=None, help='JSON report to compare against')
+    suite.set_defaults(func=bench_suite)
+
+    biasregex = subparsers.add_parser('biasregex', help='master regex per bias type')
+    biasregex.add_argument('--entries', type=int, default=300)
+    biasregex.add_argument('--seed', type=int, default=7)
+    biasregex.add_argument('--max-words', type=int, default=5000)
+    biasregex.add_argument('--repeat', type=int, default=3)
+    biasregex.set_defaults(func=bench_biasregex)
+
+    adversarial = subparsers.add_parser('adversarial', help='bias pattern backtracking limits')
+    adversarial.add_argument('--size', type=int, default=100000, help='input size in characters')
+    adversarial.add_argument('--limit-ms', type=float, default=2000.0)
+    adversarial.set_defaults(func=bench_adversarial)
+
+    prefilter = subparsers.add_parser('prefilter', help='trigger-word prefilter for bias types')
+    prefilter.add_argument('--entries', type=int, default=2000)
+    prefilter.add_argument('--seed', type=int, default=7)
+    prefilter.add_argument('--max-words', type=int, default=1000)
+    prefilter.add_argument('--repeat', type=int, default=3)
+    prefilter.set_defaults(func=bench_prefilter)
+
+    confidence = subparsers.add_parser('confidence', help='token-offset index for bias confidence')
+    confidence.add_argument('--entries', type=int, default=300)
+    confidence.add_argument('--seed', type=int, default=7)
+    confidence.add_argument('--max-words', type=int, default=5000)
+    confidence.add_argument('--repeat', type=int, default=3)
+    confidence.set_defaults(func=bench_confidence)
+
+    packs = subparsers.add_parser('packs', help='shared pattern packs and hot reloads')
+    packs.add_argument('--entries', type=int, default=200)
+    packs.add_argument('--seed', type=int, default=7)
+    packs.add_argument('--max-words', type=int, default=300)
+    packs.add_argument('--repeat', type=int, default=20)
+    packs.add_argument('--threads', type=int, default=4)
+    packs.add_argument('--reloads', type=int, default=50)
+    packs.add_argument('--interval-ms', type=float, default=20.0)
+    packs.set_defaults(func=bench_packs)
+
+    biascache = subparsers.add_parser('biascache', help='bias result cache tiers')
+    biascache.add_argument('--entries', type=int, default=500)
+    biascache.add_argument('--seed', type=int, default=7)
+    biascache.add_argument('--max-words', type=int, default=1000)
+    biascache.add_argument('--repeat', type=int, default=3)
+    biascache.set_defaults(func=bench_biascache)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,55 +1,60 @@
 """Cognitive bias detection module."""
 import re
-from typing import List, Dict
+from functools import partial
+from typing import List, Dict, Optional, Sequence, Union
 from collections import Counter
 
+from batch import map_in_pool
+from pattern_packs import PatternPack, active_pack, pack_path
+from result_cache import ResultCache, make_key
+
 
 class BiasDetector:
     """Detect cognitive biases in journal entries."""
     
-    def __init__(self):
-        """Initialize bias detection patterns."""
+    # Bias types reported only below a sentiment valence, by that valence
+    VALENCE_GATES = {
+        'Catastrophizing': -0.2,
+        'Fortune Telling': -0.1,
+    }
+    
+    def __init__(self, pattern_pack: Union[str, PatternPack] = 'basic',
+                 cache: Optional[ResultCache] = None):
+        """
+        Initialize bias detection patterns.
+        
+        Args:
+            pattern_pack: Name or path of the pattern pack file, whose
+                reloads are picked up, or a compiled PatternPack to pin
+            cache: Optional result cache shared across calls
+        """
+        self.pattern_pack = pattern_pack
+        self.cache = cache
         self.setup_patterns()
     
+    @property
+    def version(self) -> str:
+        """Identifier of the pattern set, stamped on stored bias rows."""
+        return f'{type(self).__name__}/{self.pack.version}'
+    
+    @property
+    def pack(self) -> PatternPack:
+        """The current pattern pack; read it once per detection, as reloads swap it."""
+        if self._pack_path is None:
+            return self.pattern_pack
+        return active_pack(self._pack_path)
+    
     def setup_patterns(self):
-        """Setup regex patterns for bias detection."""
-        # Catastrophizing: absolutist language + negative sentiment
-        self.catastrophizing_patterns = [
-            r'\b(always|never|everything|nothing|everyone|no one)\b.*(terrible|awful|horrible|worst|disaster|ruined)',
-            r'\b(can\'t|cannot|couldn\'t|won\'t|wouldn\'t)\b.*(anything|ever|never|always)',
-            r'\b(end|over|finished|done for|hopeless)\b'
-        ]
-        
-        # Black-and-white thinking: binary language patterns
-        self.black_white_patterns = [
-            r'\b(all|none|every|nothing|everything)\b',
-            r'\b(either|or).*\b(or|but not)',
-            r'\b(perfect|flawless|terrible|awful)\b',
-            r'\b(always|never)\b',
-            r'\b(completely|totally|absolutely)\s+(wrong|right|bad|good)'
-        ]
-        
-        # Emotional reasoning: feelings as facts
-        self.emotional_reasoning_patterns = [
-            r'\b(i feel|feels like|i sense).*\b(so|therefore|that means|which means|this proves)',
-            r'\b(must be|cannot be|has to be)\b.*\b(because|since|as)\b.*\b(i feel|feeling|emotion)',
-            r'\b(i feel|feeling).*\b(it\'s|it is|that\'s|this is|they are|he is|she is)'
-        ]
-        
-        # Fortune telling: unsubstantiated negative predictions
-        self.fortune_telling_patterns = [
-            r'\b(will|going to|gonna)\b.*\b(bad|terrible|awful|horrible|worst|fail|screw up|mess up)',
-            r'\b(it\'s|it is|things are|this will|that will).*\b(going to|about to).*\b(go wrong|fail|collapse|end badly)',
-            r'\b(know|certain|sure)\b.*\b(will|going to)\b.*\b(bad|terrible|wrong|fail)'
-        ]
-        
-        # Overgeneralization: isolated incidents as universal patterns
-        self.overgeneralization_patterns = [
-            r'\b(always|never|every|all|no one|everyone|everything|nothing)\b.*\b(happens|happened|will happen)',
-            r'\b(one|once|single|this time).*\b(always|never|every|all)',
-            r'\b(every time|whenever|always when|never when)\b',
-            r'\b(all|every).*\b(are|is|do|does|have|has)\b.*\b(like|similar to|the same as)\b'
-        ]
+        """Load the pattern pack, compiled once per process for every detector using it."""
+        if isinstance(self.pattern_pack, PatternPack):
+            self._pack_path = None
+        else:
+            self._pack_path = pack_path(self.pattern_pack)
+            active_pack(self._pack_path)
+    
+    def warm_up(self):
+        """Run every pattern once so compilation happens up front."""
+        self.detect_all("I always feel like everything will go wrong.", -1.0)
     
     def detect_all(self, text: str, sentiment_valence: float) -> List[Dict]:
         """
@@ -62,24 +67,44 @@ class BiasDetector:
         Returns:
             List of detected biases with type, pattern, and explanation
         """
+        # One pack for the whole call, even if it is reloaded meanwhile
+        pack = self.pack
+        if self.cache is None:
+            return self._detect(pack, text, sentiment_valence)
+        
+        key = self._cache_key(pack, text, sentiment_valence)
+        biases = self.cache.get(key)
+        if biases is None:
+            biases = self._detect(pack, text, sentiment_valence)
+            self.cache.put(key, biases)
+        return biases
+    
+    def _detect(self, pack: PatternPack, text: str, sentiment_valence: float) -> List[Dict]:
+        """Detect biases with `pack`, without consulting the cache."""
         text_lower = text.lower()
         detected_biases = []
+        gates = self.VALENCE_GATES
+        # Bias types with none of their trigger words are skipped
+        candidates = pack.trigger_filter.candidates(text_lower)
         
         # Catastrophizing (requires negative sentiment)
-        if sentiment_valence < -0.2:
-            for pattern in self.catastrophizing_patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    detected_biases.append({
-                        'type': 'Catastrophizing',
-                        'pattern': self._extract_match(text, pattern),
-                        'explanation': 'You may be magnifying negative events and expecting the worst possible outcomes.'
-                    })
-                    break
+        if sentiment_valence < gates['Catastrophizing'] and 'Catastrophizing' in candidates:
+            excerpt = self._find(pack, 'Catastrophizing', text, text_lower)
+            if excerpt is not None:
+                detected_biases.append({
+                    'type': 'Catastrophizing',
+                    'pattern': excerpt,
+                    'explanation': 'You may be magnifying negative events and expecting the worst possible outcomes.'
+                })
         
         # Black-and-white thinking
-        matches = sum(1 for pattern in self.black_white_patterns 
-                     if re.search(pattern, text_lower, re.IGNORECASE))
-        if matches >= 2:  # Need multiple patterns
+        matched = set()
+        if 'Black-and-white Thinking' in candidates:
+            for index, _, _ in pack.pattern_groups['Black-and-white Thinking'].matches(text_lower):
+                matched.add(index)
+                if len(matched) >= 2:
+                    break
+        if len(matched) >= 2:  # Need multiple patterns
             detected_biases.append({
                 'type': 'Black-and-white Thinking',
                 'pattern': 'Binary language patterns detected',
@@ -87,48 +112,130 @@ class BiasDetector:
             })
         
         # Emotional reasoning
-        for pattern in self.emotional_reasoning_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        if 'Emotional Reasoning' in candidates:
+            excerpt = self._find(pack, 'Emotional Reasoning', text, text_lower)
+            if excerpt is not None:
                 detected_biases.append({
                     'type': 'Emotional Reasoning',
-                    'pattern': self._extract_match(text, pattern),
+                    'pattern': excerpt,
                     'explanation': 'You may be treating your feelings as facts, assuming that negative emotions reflect reality.'
                 })
-                break
         
         # Fortune telling
-        if sentiment_valence < -0.1:
-            for pattern in self.fortune_telling_patterns:
-                if re.search(pattern, text_lower, re.IGNORECASE):
-                    detected_biases.append({
-                        'type': 'Fortune Telling',
-                        'pattern': self._extract_match(text, pattern),
-                        'explanation': 'You may be predicting negative outcomes without evidence, assuming things will go badly.'
-                    })
-                    break
+        if sentiment_valence < gates['Fortune Telling'] and 'Fortune Telling' in candidates:
+            excerpt = self._find(pack, 'Fortune Telling', text, text_lower)
+            if excerpt is not None:
+                detected_biases.append({
+                    'type': 'Fortune Telling',
+                    'pattern': excerpt,
+                    'explanation': 'You may be predicting negative outcomes without evidence, assuming things will go badly.'
+                })
         
         # Overgeneralization
-        for pattern in self.overgeneralization_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        if 'Overgeneralization' in candidates:
+            excerpt = self._find(pack, 'Overgeneralization', text, text_lower)
+            if excerpt is not None:
                 detected_biases.append({
                     'type': 'Overgeneralization',
-                    'pattern': self._extract_match(text, pattern),
+                    'pattern': excerpt,
                     'explanation': 'You may be treating isolated incidents as universal patterns or rules.'
                 })
-                break
         
         return detected_biases
     
+    def detect_batch(self, texts: Sequence[str], valences: Sequence[float],
+                     workers: Optional[int] = None, chunksize: int = 256) -> List[List[Dict]]:
+        """
+        Detect biases in many texts, spreading the work over a process pool.
+        
+        Each worker builds its own detector with this detector's current
+        pattern pack, compiled once per worker, and is sent the texts in
+        chunks. With a cache, only the texts it misses are detected.
+        
+        Args:
+            texts: Journal entry texts
+            valences: Sentiment valence of each text (-1 to 1)
+            workers: Number of worker processes (defaults to CPU count)
+            chunksize: Number of texts sent to a worker per task
+        
+        Returns:
+            One list of biases per text, in input order, shaped like `detect_all`'s
+        """
+        if len(texts) != len(valences):
+            raise ValueError(f"Got {len(texts)} texts but {len(valences)} valences")
+        pack = self.pack
+        factory = partial(type(self), pattern_pack=pack)
+        if self.cache is None:
+            return map_in_pool(factory, '_detect_many', list(zip(texts, valences)),
+                               workers=workers, chunksize=chunksize, batched=True)
+        
+        keys = [self._cache_key(pack, text, valence) for text, valence in zip(texts, valences)]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, biases in enumerate(results) if biases is None]
+        
+        detected = map_in_pool(factory, '_detect_many', [(texts[i], valences[i]) for i in missing],
+                               workers=workers, chunksize=chunksize, batched=True)
+        for i, biases in zip(missing, detected):
+            self.cache.put(keys[i], biases)
+            results[i] = biases
+        return results
+    
+    def _detect_many(self, texts: List[str], valences: List[float]) -> List[List[Dict]]:
+        """Detect biases in a chunk of texts."""
+        pack = self.pack
+        return [self._detect(pack, text, valence) for text, valence in zip(texts, valences)]
+    
+    def _cache_key(self, pack: PatternPack, text: str, sentiment_valence: float) -> str:
+        """
+        Cache key for detecting biases in `text` with `pack`.
+        
+        The valence only matters through VALENCE_GATES, so it is bucketed
+        by how many of the gates it passes. The text is hashed as is, not
+        normalized: excerpts quote it, and patterns stop at line breaks.
+        """
+        bucket = sum(sentiment_valence < gate for gate in set(self.VALENCE_GATES.values()))
+        version = f'{type(self).__name__}/{pack.version}/{pack.digest}/valence{bucket}'
+        return make_key(text, version, normalize=False)
+    
+    def _find(self, pack: PatternPack, bias_type: str, text: str, text_lower: str) -> Optional[str]:
+        """
+        Excerpt around the first match of a bias type's first matching pattern.
+        
+        One scan finds every pattern's matches; the scan stops as soon as
+        the first pattern matches, since no other can then win.
+        
+        Returns:
+            The excerpt, or None if no pattern matches
+        """
+        best = None
+        for index, start, end in pack.pattern_groups[bias_type].matches(text_lower):
+            if best is None or index < best[0]:
+                best = (index, start, end)
+                if index == 0:
+                    break
+        if best is None:
+            return None
+        
+        index, start, end = best
+        if len(text_lower) != len(text):
+            # Lowercasing changed the length (e.g. 'İ'), so offsets differ
+            pattern = pack.patterns[bias_type][index][0]
+            return self._extract_match(text, pattern)
+        return self._excerpt(text, start, end)
+    
     def _extract_match(self, text: str, pattern: str, context_words: int = 10) -> str:
         """Extract matching text with context."""
-        matches = list(re.finditer(pattern, text, re.IGNORECASE))
-        if matches:
-            match = matches[0]
-            start = max(0, match.start() - context_words * 5)
-            end = min(len(text), match.end() + context_words * 5)
-            return text[start:end].strip()
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return self._excerpt(text, match.start(), match.end(), context_words)
         return ""
     
+    def _excerpt(self, text: str, start: int, end: int, context_words: int = 10) -> str:
+        """text[start:end] with about `context_words` words on either side."""
+        start = max(0, start - context_words * 5)
+        end = min(len(text), end + context_words * 5)
+        return text[start:end].strip()
+    
     def get_bias_frequency(self, biases_list: List[Dict]) -> Dict[str, int]:
         """Get frequency of each bias type."""
         counter = Counter([bias['type'] for bias in biases_list])
@@ -0,0 +1,122 @@
+"""Trigger-word prefilter for the bias detectors.
+
+Every bias pattern opens with a word boundary and a group of literal
+alternatives, so a match always contains one of a few known words. An
+entry containing none of a bias type's trigger words cannot match any of
+its patterns, and the detectors skip that type's regexes after one set
+check against the entry's words.
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+WORD_RE = re.compile(r'\w+')
+
+# ASCII characters outside \w, mapped to spaces: splitting ASCII text
+# translated with this gives WORD_RE's words, faster than the regex
+ASCII_NON_WORD = str.maketrans({
+    chr(code): ' ' for code in range(128) if not WORD_RE.match(chr(code))
+})
+
+# Characters that case-insensitive regexes match to ASCII letters even in
+# lowercased text ('ı' matches 'i', 'ſ' matches 's')
+REGEX_CASE_FOLDS = str.maketrans('ıſ', 'is')
+
+# Pattern text after a group that ends the group's last word: a literal
+# space or apostrophe, a whitespace class or a word boundary
+WORD_END_RE = re.compile(r" |'|\\'|\\s|\\b")
+
+
+def opening_triggers(pattern: str) -> Optional[Tuple[Set[str], Set[str]]]:
+    """
+    Words one of which every match of `pattern` contains.
+
+    Understands patterns opening with a word boundary and a group of
+    literal alternatives, like r'\b(always|no one)\b...'; returns None for
+    anything else. Each alternative contributes its longest word, the
+    one least likely to be common.
+
+    Returns:
+        (words, prefixes): a match contains a whole word from `words`, or
+        a word beginning with one of `prefixes` (for words the pattern
+        lets run on, like 'all' in r'\b(all|every).*')
+    """
+    opening = re.match(r'\\b\(([^()]*)\)', pattern)
+    if opening is None:
+        return None
+    after_group = pattern[opening.end():]
+    words, prefixes = set(), set()
+    for alternative in opening.group(1).split('|'):
+        alternative = alternative.replace("\\'", "'")
+        literal = re.match(r"[a-z0-9' ]*", alternative).group()
+        runs = list(re.finditer(r'[a-z0-9]+', literal))
+        if not runs or runs[0].start() != 0:
+            return None
+        # The last word ends there if the pattern continues with a word end
+        ends_word = literal == alternative and WORD_END_RE.match(after_group)
+        run = max(runs, key=lambda run: len(run.group()))
+        if run.end() < len(literal) or ends_word:
+            words.add(run.group())
+        else:
+            prefixes.add(run.group())
+    return words, prefixes
+
+
+class TriggerFilter:
+    """Precomputed trigger words per bias type, checked once per entry."""
+
+    def __init__(self, patterns: Dict[str, Iterable[str]]):
+        """
+        Args:
+            patterns: Regexes by bias type
+        """
+        self.words: Dict[str, FrozenSet[str]] = {}
+        self.prefixes: Dict[str, Tuple[str, ...]] = {}
+        # Types with a pattern whose trigger words can't be told; always run
+        self.unfiltered: Set[str] = set()
+
+        for bias_type, type_patterns in patterns.items():
+            words, prefixes = set(), set()
+            for pattern in type_patterns:
+                triggers = opening_triggers(pattern)
+                if triggers is None:
+                    self.unfiltered.add(bias_type)
+                    break
+                words |= triggers[0]
+                prefixes |= triggers[1]
+            self.words[bias_type] = frozenset(words)
+            self.prefixes[bias_type] = tuple(sorted(prefixes))
+
+        self._all_prefixes = tuple(sorted({prefix for prefixes in self.prefixes.values()
+                                           for prefix in prefixes}))
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._all_prefixes})
+
+    def candidates(self, text_lower: str) -> Set[str]:
+        """
+        Bias types whose patterns may match the lowercased text.
+
+        The others have none of their trigger words in the text and can be
+        skipped without changing any result.
+        """
+        if text_lower.isascii():
+            tokens = set(text_lower.translate(ASCII_NON_WORD).split())
+        else:
+            tokens = set(WORD_RE.findall(text_lower.translate(REGEX_CASE_FOLDS)))
+
+        found = set(self.unfiltered)
+        beginnings = None
+        for bias_type, words in self.words.items():
+            if bias_type in found or not words.isdisjoint(tokens):
+                found.add(bias_type)
+                continue
+            prefixes = self.prefixes[bias_type]
+            if not prefixes:
+                continue
+            if beginnings is None:
+                # Beginnings, of every length a prefix trigger has, of the
+                # tokens starting with any prefix trigger
+                beginnings = {token[:length] for token in tokens
+                              if token.startswith(self._all_prefixes)
+                              for length in self._prefix_lengths if len(token) >= length}
+            if not beginnings.isdisjoint(prefixes):
+                found.add(bias_type)
+        return found
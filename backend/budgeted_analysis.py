@@ -0,0 +1,213 @@
+"""Latency-budgeted entry analysis with a background pass for skipped stages."""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from enhanced_bias_detector import EnhancedBiasDetector
+from enhanced_sentiment import EnhancedSentimentAnalyzer
+from shared_instances import get_shared
+from text_processing import prepare_entry
+from utils import analysis_version
+
+
+class BudgetedAnalyzer:
+    """
+    Run sentiment and bias analysis within a latency budget.
+
+    Stages run in order: VADER, TextBlob, emotions/intensity, biases.
+    VADER always runs. Before each later stage the analyzer predicts its
+    cost from past runs (milliseconds per word, smoothed) and skips it
+    if it would overrun the budget; bias detection falls back to the
+    reduced pattern set instead of being skipped. A result with skipped
+    or reduced stages is marked partial; `complete_later` then runs the
+    full analysis on a background thread.
+    """
+
+    # Weight of the newest run in the smoothed per-word cost
+    SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        budget_ms: float = 500.0,
+        sentiment_analyzer: Optional[EnhancedSentimentAnalyzer] = None,
+        bias_detector: Optional[EnhancedBiasDetector] = None,
+        background_workers: int = 1
+    ):
+        """
+        Args:
+            budget_ms: Target wall time for `analyze`
+            sentiment_analyzer: Analyzer to use (the shared one by default)
+            bias_detector: Detector to use (the shared one by default)
+            background_workers: Threads completing partial results
+        """
+        self.budget_ms = budget_ms
+        self.sentiment_analyzer = sentiment_analyzer or get_shared(EnhancedSentimentAnalyzer)
+        self.bias_detector = bias_detector or get_shared(EnhancedBiasDetector)
+        self._executor = ThreadPoolExecutor(
+            max_workers=background_workers,
+            thread_name_prefix='mirror-analysis'
+        )
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+        self._stage_stats: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def version(self) -> str:
+        """Version stamp for complete results."""
+        return analysis_version(self.sentiment_analyzer, self.bias_detector)
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """
+        Analyze an entry, degrading to cheaper stages to stay within budget.
+
+        Returns:
+            Dictionary with 'sentiment' (shaped like
+            `EnhancedSentimentAnalyzer.analyze`; fields from skipped stages
+            are None or empty), 'biases', 'partial', 'skipped' stage names,
+            per-stage 'timings' in ms, and the 'analyzer_version' and
+            'pattern_version' to stamp on stored rows.
+        """
+        start = time.perf_counter()
+        analyzer = self.sentiment_analyzer
+        entry = prepare_entry(text)
+        words = max(entry.word_count, 1)
+        timings: Dict[str, float] = {}
+        skipped: List[str] = []
+
+        with self._timed('vader', words, timings):
+            vader_scores = analyzer.vader.polarity_scores(text)
+
+        polarity = subjectivity = None
+        if self._fits('textblob', words, start):
+            with self._timed('textblob', words, timings):
+                polarity, subjectivity = analyzer.polarity.scores(text)
+        else:
+            skipped.append('textblob')
+
+        emotions, intensity = {}, 1.0
+        if self._fits('emotions', words, start):
+            with self._timed('emotions', words, timings):
+                emotions = analyzer._detect_emotions(entry)
+                intensity = analyzer._calculate_intensity(entry)
+        else:
+            skipped.append('emotions')
+
+        if polarity is None:
+            # Without TextBlob, valence rests on VADER alone
+            sentiment = analyzer._build_result(
+                entry, vader_scores, vader_scores['compound'], 0.5, emotions, intensity
+            )
+            sentiment.update(textblob_polarity=None, textblob_subjectivity=None, confidence=None)
+        else:
+            sentiment = analyzer._build_result(
+                entry, vader_scores, polarity, subjectivity, emotions, intensity
+            )
+
+        reduced = not self._fits('biases', words, start)
+        stage = 'biases_reduced' if reduced else 'biases'
+        with self._timed(stage, words, timings):
+            biases = self.bias_detector.detect_all(text, sentiment['valence'], reduced=reduced)
+        if reduced:
+            skipped.append('biases')
+
+        timings['total'] = (time.perf_counter() - start) * 1000
+        partial = bool(skipped)
+
+        return {
+            'sentiment': sentiment,
+            'biases': biases,
+            'partial': partial,
+            'skipped': skipped,
+            'timings': timings,
+            'analyzer_version': f'{self.version}+partial' if partial else self.version,
+            'pattern_version': self.bias_detector.version
+        }
+
+    def complete_later(self, text: str, on_complete: Callable[[Dict[str, Any]], None]) -> Future:
+        """
+        Run the full analysis on a background thread.
+
+        `on_complete` is called from that thread with a complete result
+        shaped like `analyze`'s, e.g. to overwrite the stored partial one.
+        """
+        future = self._executor.submit(self._complete, text, on_complete)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _complete(self, text: str, on_complete: Callable[[Dict[str, Any]], None]):
+        """Run the full analysis for a partial result and report it."""
+        start = time.perf_counter()
+        try:
+            sentiment = self.sentiment_analyzer.analyze(text)
+            biases = self.bias_detector.detect_all(text, sentiment['valence'])
+            on_complete({
+                'sentiment': sentiment,
+                'biases': biases,
+                'partial': False,
+                'skipped': [],
+                'timings': {'total': (time.perf_counter() - start) * 1000},
+                'analyzer_version': self.version,
+                'pattern_version': self.bias_detector.version
+            })
+        except Exception as e:
+            print(f"Error completing background analysis: {e}")
+
+    def _forget(self, future: Future):
+        """Drop a finished background pass from the pending set."""
+        with self._lock:
+            self._pending.discard(future)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for background passes to finish; returns True if none remain."""
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return not not_done
+
+    def _fits(self, stage: str, words: int, start: float) -> bool:
+        """Whether a stage's predicted cost fits in what is left of the budget."""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            stats = self._stage_stats.get(stage)
+        predicted_ms = stats['ms_per_word'] * words if stats else 0.0
+        return elapsed_ms + predicted_ms <= self.budget_ms
+
+    @contextmanager
+    def _timed(self, stage: str, words: int, timings: Dict[str, float]):
+        """Time a stage, recording it in `timings` and the running stage stats."""
+        start = time.perf_counter()
+        yield
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        timings[stage] = elapsed_ms
+
+        with self._lock:
+            stats = self._stage_stats.get(stage)
+            if stats is None:
+                self._stage_stats[stage] = {
+                    'count': 1,
+                    'total_ms': elapsed_ms,
+                    'max_ms': elapsed_ms,
+                    'ms_per_word': elapsed_ms / words
+                }
+                return
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['ms_per_word'] += self.SMOOTHING * (elapsed_ms / words - stats['ms_per_word'])
+
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage timing summary, for tuning the budget."""
+        with self._lock:
+            return {
+                stage: {
+                    'count': stats['count'],
+                    'mean_ms': stats['total_ms'] / stats['count'],
+                    'max_ms': stats['max_ms'],
+                    'ms_per_word': stats['ms_per_word']
+                }
+                for stage, stats in self._stage_stats.items()
+            }
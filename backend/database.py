@@ -3,7 +3,7 @@ import sqlite3
 import json
 import os
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 import pandas as pd
 
@@ -53,6 +53,7 @@ class Database:
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 sentiment_score REAL,
                 valence REAL,
+                analyzer_version TEXT,
                 FOREIGN KEY (user_id) REFERENCES users(id)
             )
         """)
@@ -65,6 +66,7 @@ class Database:
                 bias_type TEXT NOT NULL,
                 detected_pattern TEXT,
                 explanation TEXT,
+                pattern_version TEXT,
                 FOREIGN KEY (entry_id) REFERENCES journal_entries(id)
             )
         """)
@@ -83,6 +85,10 @@ class Database:
             )
         """)
         
+        # Version stamps were added after the first release
+        self._ensure_column(cursor, 'journal_entries', 'analyzer_version', 'TEXT')
+        self._ensure_column(cursor, 'biases', 'pattern_version', 'TEXT')
+        
         # Create indexes for performance
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_entries_user_timestamp 
@@ -94,9 +100,26 @@ class Database:
             ON biases(entry_id)
         """)
         
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_entries_analyzer_version 
+            ON journal_entries(analyzer_version, id)
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_biases_pattern_version 
+            ON biases(pattern_version)
+        """)
+        
         conn.commit()
         conn.close()
     
+    @staticmethod
+    def _ensure_column(cursor, table: str, column: str, definition: str):
+        """Add a column to an existing table if it is missing."""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in {row['name'] for row in cursor.fetchall()}:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    
     def create_user(self, email: str, name: str, onboarding_data: dict) -> int:
         """Create a new user and return user_id."""
         conn = self.get_connection()
@@ -133,16 +156,21 @@ class Database:
         return None
     
     def add_journal_entry(self, user_id: int, entry_text: str, 
-                         sentiment_score: float, valence: float) -> int:
-        """Add a new journal entry."""
+                         sentiment_score: Optional[float], valence: Optional[float],
+                         analyzer_version: Optional[str] = None) -> int:
+        """
+        Add a new journal entry, stamped with the analysis version that scored it.
+        
+        Scores may be None for an entry that is analyzed afterwards.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
             INSERT INTO journal_entries 
-            (user_id, entry_text, sentiment_score, valence)
-            VALUES (?, ?, ?, ?)
-        """, (user_id, entry_text, sentiment_score, valence))
+            (user_id, entry_text, sentiment_score, valence, analyzer_version)
+            VALUES (?, ?, ?, ?, ?)
+        """, (user_id, entry_text, sentiment_score, valence, analyzer_version))
         
         entry_id = cursor.lastrowid
         conn.commit()
@@ -170,14 +198,123 @@ class Database:
         
         return [dict(row) for row in rows]
     
+    @staticmethod
+    def _entry_filter(after_id: Optional[int],
+                      current_version: Optional[str]) -> Tuple[str, Tuple]:
+        """WHERE clause selecting entries after an id, optionally only stale ones."""
+        clauses, params = [], []
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        if current_version is not None:
+            # Two ranges rather than != so SQLite can answer it from
+            # idx_entries_analyzer_version
+            clauses.append("(analyzer_version IS NULL "
+                           "OR analyzer_version < ? OR analyzer_version > ?)")
+            params += [current_version, current_version]
+        return " AND ".join(clauses) or "1 = 1", tuple(params)
+    
+    def count_entries(self, after_id: Optional[int] = None,
+                      current_version: Optional[str] = None) -> int:
+        """
+        Count journal entries across all users.
+        
+        Args:
+            after_id: Only count entries with a larger id
+            current_version: If given, only count entries not stamped with it
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        where, params = self._entry_filter(after_id, current_version)
+        cursor.execute(f"SELECT COUNT(*) FROM journal_entries WHERE {where}", params)
+        
+        count = cursor.fetchone()[0]
+        conn.close()
+        
+        return count
+    
+    def iter_entries(self, chunk_size: int = 500, after_id: Optional[int] = None,
+                     current_version: Optional[str] = None) -> Iterator[List[Dict]]:
+        """
+        Stream journal entries in id order, one chunk at a time.
+        
+        Uses keyset pagination, so each chunk is an indexed range scan and
+        a run can resume from the last id it finished. If `current_version`
+        is given, only entries whose analyzer_version differs from it
+        (including unstamped ones) are returned.
+        """
+        last_id = after_id
+        
+        while True:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            where, params = self._entry_filter(last_id, current_version)
+            cursor.execute(f"""
+                SELECT id, user_id, entry_text FROM journal_entries 
+                WHERE {where} 
+                ORDER BY id 
+                LIMIT ?
+            """, params + (chunk_size,))
+            
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            
+            if not rows:
+                return
+            
+            yield rows
+            last_id = rows[-1]['id']
+    
+    def save_analyses(self, analyses: List[Dict[str, Any]]):
+        """
+        Write re-computed scores and biases for many entries in one transaction.
+        
+        Each analysis has 'entry_id', 'sentiment_score', 'valence', the
+        'analyzer_version' and 'pattern_version' that produced it, and a
+        'biases' list of {'type', 'pattern', 'explanation'} dicts, which
+        replace the entry's existing bias rows.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.executemany("""
+                UPDATE journal_entries 
+                SET sentiment_score = ?, valence = ?, analyzer_version = ? 
+                WHERE id = ?
+            """, [(a['sentiment_score'], a['valence'], a['analyzer_version'], a['entry_id'])
+                  for a in analyses])
+            
+            cursor.executemany("""
+                DELETE FROM biases WHERE entry_id = ?
+            """, [(a['entry_id'],) for a in analyses])
+            
+            cursor.executemany("""
+                INSERT INTO biases 
+                (entry_id, bias_type, detected_pattern, explanation, pattern_version)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(a['entry_id'], bias['type'], bias['pattern'], bias['explanation'],
+                   a['pattern_version'])
+                  for a in analyses for bias in a['biases']])
+            
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
     def get_entries_dataframe(self, user_id: int) -> pd.DataFrame:
-        """Get entries as pandas DataFrame for analysis."""
+        """Get scored entries as pandas DataFrame for analysis."""
         conn = self.get_connection()
         
+        # Entries still being analyzed in the background have no scores yet
         query = """
             SELECT timestamp, sentiment_score, valence 
             FROM journal_entries 
-            WHERE user_id = ? 
+            WHERE user_id = ? AND valence IS NOT NULL
             ORDER BY timestamp ASC
         """
         
@@ -190,15 +327,17 @@ class Database:
         return df
     
     def add_bias(self, entry_id: int, bias_type: str, 
-                 detected_pattern: str, explanation: str) -> int:
-        """Add detected bias."""
+                 detected_pattern: str, explanation: str,
+                 pattern_version: Optional[str] = None) -> int:
+        """Add detected bias, stamped with the pattern set that found it."""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
-            INSERT INTO biases (entry_id, bias_type, detected_pattern, explanation)
-            VALUES (?, ?, ?, ?)
-        """, (entry_id, bias_type, detected_pattern, explanation))
+            INSERT INTO biases 
+            (entry_id, bias_type, detected_pattern, explanation, pattern_version)
+            VALUES (?, ?, ?, ?, ?)
+        """, (entry_id, bias_type, detected_pattern, explanation, pattern_version))
         
         bias_id = cursor.lastrowid
         conn.commit()
@@ -1,131 +1,241 @@
 """Enhanced cognitive bias detection with improved pattern matching."""
 import re
-from typing import List, Dict, Tuple
+from bisect import bisect_left
+from functools import partial
+from typing import AbstractSet, List, Dict, Optional, Sequence, Tuple, Union
 from collections import Counter
 
+from batch import map_in_pool
+from pattern_packs import PatternPack, active_pack, pack_path
+from result_cache import ResultCache, make_key
+from text_processing import TOKEN_RE
+
+
+class ContextModifiers:
+    """Negation and qualifier words, compiled for indexing entries."""
+
+    NEGATION = 1
+    QUALIFIER = 2
+
+    def __init__(self, negations: AbstractSet[str], qualifiers: AbstractSet[str]):
+        """
+        Args:
+            negations: Words that make a match less certain
+            qualifiers: Words that soften a match
+        """
+        self.kinds = {
+            word: (self.NEGATION if word in negations else 0)
+            | (self.QUALIFIER if word in qualifiers else 0)
+            for word in negations | qualifiers
+        }
+        self.longest = max(map(len, self.kinds), default=0)
+        self.first_chars = frozenset(word[0] for word in self.kinds)
+        self.last_chars = frozenset(word[-1] for word in self.kinds)
+        # Occurrences of the words that end a whitespace-separated token
+        alternatives = '|'.join(map(re.escape, sorted(self.kinds, key=len, reverse=True)))
+        self.regex = re.compile(rf'(?:{alternatives})(?!\S)')
+
+    def index(self, text: str) -> 'ContextIndex':
+        """Find the modifier words in a lowercased entry."""
+        return ContextIndex(self, text)
+
+
+class ContextIndex:
+    """
+    Where an entry's negations and qualifiers are, for confidence checks.
+
+    One regex scan finds the whitespace-separated tokens that are
+    negations or qualifiers; `modifiers` then tells which kinds a
+    character window contains with a binary search instead of splitting
+    the window. Words are compared exactly as
+    `set(text[start:end].split())` would: whole tokens inside the window,
+    plus the parts of the tokens the window cuts at either edge.
+    """
+
+    def __init__(self, modifiers: ContextModifiers, text: str):
+        """
+        Args:
+            modifiers: The words to find
+            text: The lowercased entry
+        """
+        self.words = modifiers
+        self.text = text
+        # Spans and kinds of the modifier tokens, in order
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.token_kinds: List[int] = []
+        for match in modifiers.regex.finditer(text):
+            start = match.start()
+            if start and not text[start - 1].isspace():
+                # The end of a longer token, like 'not' in 'cannot'
+                continue
+            self.starts.append(start)
+            self.ends.append(match.end())
+            self.token_kinds.append(modifiers.kinds[match.group()])
+
+    def modifiers(self, start: int, end: int) -> int:
+        """Kinds of modifier words (NEGATION | QUALIFIER) in text[start:end]."""
+        found = 0
+        i = bisect_left(self.starts, start)
+        while i < len(self.starts) and self.ends[i] <= end:
+            found |= self.token_kinds[i]
+            i += 1
+
+        # A token cut by the window's left edge counts from the edge on;
+        # parts longer than any word are cut short, as they can't match
+        words = self.words
+        text = self.text
+        if 0 < start < end and text[start] in words.first_chars \
+                and not text[start - 1].isspace():
+            part = TOKEN_RE.match(text, start, min(end, start + words.longest + 1))
+            found |= words.kinds.get(part.group(), 0)
+        # And one cut by the right edge up to the edge
+        if start < end < len(text) and text[end - 1] in words.last_chars \
+                and not text[end].isspace():
+            part_start = end - 1
+            while (part_start > start and end - part_start <= words.longest
+                   and not text[part_start - 1].isspace()):
+                part_start -= 1
+            found |= words.kinds.get(text[part_start:end], 0)
+        return found
+
 
 class EnhancedBiasDetector:
     """Detect cognitive biases with improved accuracy and context awareness."""
 
-    def __init__(self):
-        """Initialize bias detection patterns."""
+    # Bias types reported only below a sentiment valence, by that valence
+    VALENCE_GATES = {
+        'Catastrophizing': -0.15,
+        'Fortune Telling': -0.1,
+        'Personalization': -0.1,
+    }
+
+    # Patterns kept by the reduced set: the high-precision ones, which also
+    # excludes the broad single-word patterns that match most often
+    REDUCED_MIN_CONFIDENCE = 0.8
+
+    def __init__(self, pattern_pack: Union[str, PatternPack] = 'enhanced',
+                 cache: Optional[ResultCache] = None):
+        """
+        Initialize bias detection patterns.
+
+        Args:
+            pattern_pack: Name or path of the pattern pack file, whose
+                reloads are picked up, or a compiled PatternPack to pin
+            cache: Optional result cache shared across calls
+        """
+        self.pattern_pack = pattern_pack
+        self.cache = cache
         self.setup_patterns()
         self.setup_contextual_modifiers()
 
+    @property
+    def version(self) -> str:
+        """Identifier of the pattern set, stamped on stored bias rows."""
+        return f'{type(self).__name__}/{self.pack.version}'
+
+    @property
+    def pack(self) -> PatternPack:
+        """The current pattern pack; read it once per detection, as reloads swap it."""
+        if self._pack_path is None:
+            return self.pattern_pack
+        return active_pack(self._pack_path)
+
     def setup_patterns(self):
-        """Setup comprehensive regex patterns for bias detection."""
-
-        self.catastrophizing_patterns = [
-            (r'\b(always|never|everything|nothing|everyone|no one)\b.{0,30}(terrible|awful|horrible|worst|disaster|ruined|catastrophe)', 0.9),
-            (r'\b(can\'t|cannot|couldn\'t|won\'t|wouldn\'t)\b.{0,20}(anything|ever|survive|cope|handle)', 0.8),
-            (r'\b(end|over|finished|done for|hopeless|doomed|destroyed)\b', 0.7),
-            (r'\b(completely|totally|utterly|absolutely)\s+(ruined|destroyed|hopeless|terrible)', 0.85),
-        ]
-
-        self.black_white_patterns = [
-            (r'\b(all or nothing|black and white|either.*or)\b', 0.9),
-            (r'\b(always|never|every|all|none|no one|everyone|everything|nothing)\b', 0.6),
-            (r'\b(perfect|flawless|terrible|awful|complete failure|total success)\b', 0.75),
-            (r'\b(completely|totally|absolutely|entirely)\s+(wrong|right|bad|good|true|false)', 0.8),
-            (r'\b(must be|has to be|cannot be)\b.{0,20}\b(one|the only)', 0.7),
-        ]
-
-        self.emotional_reasoning_patterns = [
-            (r'\b(i feel|feeling).{0,30}(therefore|so|which means|this means|proves|shows)', 0.85),
-            (r'\b(because i feel|since i feel).{0,30}(it is|it must|that means)', 0.9),
-            (r'\b(feels like).{0,30}(is|are|must be)', 0.75),
-            (r'\b(my gut|intuition|feeling)\s+(tells me|says).{0,30}(so|therefore)', 0.7),
-        ]
-
-        self.fortune_telling_patterns = [
-            (r'\b(will definitely|going to|gonna|certain to).{0,40}(fail|bad|terrible|wrong|disaster)', 0.85),
-            (r'\b(i know|i\'m sure|certain).{0,30}(will|going to).{0,30}(bad|fail|wrong|terrible)', 0.8),
-            (r'\b(it\'s going to|things will|this will).{0,30}(go wrong|fail|end badly|be terrible)', 0.9),
-            (r'\b(no way|impossible).{0,30}(work out|succeed|be good|turn out well)', 0.75),
-        ]
-
-        self.overgeneralization_patterns = [
-            (r'\b(always|never|every time|whenever|constantly|invariably)\b.{0,30}(happens|happened|occurs)', 0.85),
-            (r'\b(this always|that never|it always|they always|he always|she always)\b', 0.8),
-            (r'\b(everyone|no one|everybody|nobody|all).{0,20}(are|is|do|does|think|believe)', 0.75),
-            (r'\b(once|one time|single).{0,40}(always|never|every)', 0.9),
-        ]
-
-        self.personalization_patterns = [
-            (r'\b(it\'s all my fault|all because of me|i\'m to blame)', 0.9),
-            (r'\b(must be something wrong with me|what did i do|why me)', 0.8),
-            (r'\b(taking it personally|directed at me|about me)', 0.7),
-        ]
-
-        self.mind_reading_patterns = [
-            (r'\b(i know what they\'re thinking|i can tell they|they must think)', 0.85),
-            (r'\b(they probably|they\'re probably|i bet they).{0,30}(think|believe|feel)', 0.75),
-            (r'\b(obviously thinks|clearly believes|definitely feels)', 0.8),
-        ]
+        """Load the pattern pack, compiled once per process for every detector using it."""
+        if isinstance(self.pattern_pack, PatternPack):
+            self._pack_path = None
+        else:
+            self._pack_path = pack_path(self.pattern_pack)
+            active_pack(self._pack_path)
 
     def setup_contextual_modifiers(self):
         """Setup words that modify bias detection confidence."""
         self.negations = {'not', 'no', 'never', 'neither', 'nor', "n't", 'barely', 'hardly'}
         self.qualifiers = {'maybe', 'perhaps', 'possibly', 'sometimes', 'often', 'usually', 'might', 'could'}
+        self.context_modifiers = ContextModifiers(self.negations, self.qualifiers)
+
+    def warm_up(self):
+        """Run every pattern once so compilation happens up front."""
+        self.detect_all("I always feel like everything will go wrong.", -1.0)
 
-    def detect_all(self, text: str, sentiment_valence: float) -> List[Dict]:
+    def detect_all(self, text: str, sentiment_valence: float, reduced: bool = False) -> List[Dict]:
         """
         Detect all cognitive biases with confidence scores.
 
         Args:
             text: Journal entry text
             sentiment_valence: Sentiment valence score (-1 to 1)
+            reduced: Only use patterns with a base confidence of at least
+                REDUCED_MIN_CONFIDENCE, for when time is short
 
         Returns:
             List of detected biases with type, pattern, explanation, and confidence
         """
+        # One pack for the whole call, even if it is reloaded meanwhile
+        pack = self.pack
+        if self.cache is None:
+            return self._detect(pack, text, sentiment_valence, reduced)
+
+        key = self._cache_key(pack, text, sentiment_valence, reduced)
+        biases = self.cache.get(key)
+        if biases is None:
+            biases = self._detect(pack, text, sentiment_valence, reduced)
+            self.cache.put(key, biases)
+        return biases
+
+    def _detect(self, pack: PatternPack, text: str, sentiment_valence: float,
+                reduced: bool = False) -> List[Dict]:
+        """Detect biases with `pack`, without consulting the cache."""
         if not text or not text.strip():
             return []
 
         text_lower = text.lower()
         detected_biases = []
         seen_types = set()
-
-        bias_checks = [
-            ('Catastrophizing', self.catastrophizing_patterns, sentiment_valence < -0.15),
-            ('Black-and-white Thinking', self.black_white_patterns, True),
-            ('Emotional Reasoning', self.emotional_reasoning_patterns, True),
-            ('Fortune Telling', self.fortune_telling_patterns, sentiment_valence < -0.1),
-            ('Overgeneralization', self.overgeneralization_patterns, True),
-            ('Personalization', self.personalization_patterns, sentiment_valence < -0.1),
-            ('Mind Reading', self.mind_reading_patterns, True),
-        ]
-
-        for bias_type, patterns, condition in bias_checks:
-            if not condition:
+        # Bias types with none of their trigger words are skipped
+        candidates = pack.trigger_filter.candidates(text_lower)
+        # Built on the first match, so entries without matches skip it
+        context = None
+
+        if reduced:
+            groups = pack.reduced_pattern_groups(self.REDUCED_MIN_CONFIDENCE)
+        else:
+            groups = pack.pattern_groups
+
+        for bias_type, group in groups.items():
+            gate = self.VALENCE_GATES.get(bias_type)
+            if gate is not None and not sentiment_valence < gate:
                 continue
 
-            if bias_type in seen_types:
+            if bias_type not in candidates or bias_type in seen_types:
                 continue
 
-            max_confidence = 0.0
-            best_match = None
-
-            for pattern, base_confidence in patterns:
-                matches = list(re.finditer(pattern, text_lower, re.IGNORECASE))
-                if matches:
-                    for match in matches:
-                        confidence = self._calculate_confidence(
-                            text_lower,
-                            match,
-                            base_confidence
-                        )
-
-                        if confidence > max_confidence:
-                            max_confidence = confidence
-                            best_match = match
-
-            if best_match and max_confidence >= 0.5:
+            # Highest confidence wins; ties go to the earlier pattern, then
+            # the earlier match, as when each pattern was scanned in turn
+            best_key = None
+            best_span = None
+
+            for index, start, end in group.matches(text_lower):
+                if context is None:
+                    context = self.context_modifiers.index(text_lower)
+                confidence = self._calculate_confidence(
+                    context,
+                    start,
+                    end,
+                    group.confidences[index]
+                )
+                key = (confidence, -index, -start)
+                if best_key is None or key > best_key:
+                    best_key = key
+                    best_span = (start, end)
+
+            if best_span and best_key[0] >= 0.5:
                 detected_biases.append({
                     'type': bias_type,
-                    'pattern': self._extract_match(text, best_match),
+                    'pattern': self._extract_match(text, *best_span),
                     'explanation': self._get_explanation(bias_type),
-                    'confidence': round(max_confidence, 2)
+                    'confidence': round(best_key[0], 2)
                 })
                 seen_types.add(bias_type)
 
@@ -133,34 +243,93 @@ class EnhancedBiasDetector:
 
         return detected_biases[:5]
 
+    def detect_batch(self, texts: Sequence[str], valences: Sequence[float],
+                     workers: Optional[int] = None, chunksize: int = 256) -> List[List[Dict]]:
+        """
+        Detect biases in many texts, spreading the work over a process pool.
+
+        Each worker builds its own detector with this detector's current
+        pattern pack, compiled once per worker, and is sent the texts in
+        chunks. With a cache, only the texts it misses are detected.
+
+        Args:
+            texts: Journal entry texts
+            valences: Sentiment valence of each text (-1 to 1)
+            workers: Number of worker processes (defaults to CPU count)
+            chunksize: Number of texts sent to a worker per task
+
+        Returns:
+            One list of biases per text, in input order, shaped like `detect_all`'s
+        """
+        if len(texts) != len(valences):
+            raise ValueError(f"Got {len(texts)} texts but {len(valences)} valences")
+        pack = self.pack
+        factory = partial(type(self), pattern_pack=pack)
+        if self.cache is None:
+            return map_in_pool(factory, '_detect_many', list(zip(texts, valences)),
+                               workers=workers, chunksize=chunksize, batched=True)
+
+        keys = [self._cache_key(pack, text, valence) for text, valence in zip(texts, valences)]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, biases in enumerate(results) if biases is None]
+
+        detected = map_in_pool(factory, '_detect_many', [(texts[i], valences[i]) for i in missing],
+                               workers=workers, chunksize=chunksize, batched=True)
+        for i, biases in zip(missing, detected):
+            self.cache.put(keys[i], biases)
+            results[i] = biases
+        return results
+
+    def _detect_many(self, texts: List[str], valences: List[float]) -> List[List[Dict]]:
+        """Detect biases in a chunk of texts."""
+        pack = self.pack
+        return [self._detect(pack, text, valence) for text, valence in zip(texts, valences)]
+
+    def _cache_key(self, pack: PatternPack, text: str, sentiment_valence: float,
+                   reduced: bool = False) -> str:
+        """
+        Cache key for detecting biases in `text` with `pack`.
+
+        The valence only matters through VALENCE_GATES, so it is bucketed
+        by how many of the gates it passes. The text is hashed as is, not
+        normalized: excerpts quote it, and patterns treat line breaks
+        differently from spaces.
+        """
+        bucket = sum(sentiment_valence < gate for gate in set(self.VALENCE_GATES.values()))
+        version = f'{type(self).__name__}/{pack.version}/{pack.digest}/valence{bucket}'
+        if reduced:
+            version += '/reduced'
+        return make_key(text, version, normalize=False)
+
     def _calculate_confidence(
         self,
-        text: str,
-        match: re.Match,
+        context: ContextIndex,
+        start: int,
+        end: int,
         base_confidence: float
     ) -> float:
-        """Calculate confidence score based on context."""
+        """Calculate confidence score based on the 50 characters around text[start:end]."""
         confidence = base_confidence
 
-        context_start = max(0, match.start() - 50)
-        context_end = min(len(text), match.end() + 50)
-        context = text[context_start:context_end]
-        context_words = set(context.split())
+        context_start = max(0, start - 50)
+        context_end = min(len(context.text), end + 50)
+
+        modifiers = context.modifiers(context_start, context_end)
 
-        has_negation = any(neg in context_words for neg in self.negations)
+        has_negation = modifiers & ContextModifiers.NEGATION
         if has_negation:
             confidence *= 0.7
 
-        has_qualifier = any(qual in context_words for qual in self.qualifiers)
+        has_qualifier = modifiers & ContextModifiers.QUALIFIER
         if has_qualifier:
             confidence *= 0.85
 
         return confidence
 
-    def _extract_match(self, text: str, match: re.Match, context_chars: int = 80) -> str:
-        """Extract matching text with context."""
-        start = max(0, match.start() - context_chars // 2)
-        end = min(len(text), match.end() + context_chars // 2)
+    def _extract_match(self, text: str, start: int, end: int, context_chars: int = 80) -> str:
+        """Extract text[start:end] with surrounding context."""
+        start = max(0, start - context_chars // 2)
+        end = min(len(text), end + context_chars // 2)
 
         excerpt = text[start:end].strip()
 
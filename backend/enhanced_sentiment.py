@@ -1,20 +1,53 @@
 """Enhanced sentiment analysis with improved accuracy."""
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from functools import partial
 import pandas as pd
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from batch import map_in_pool
+from lexicon_snapshot import vader_analyzer
+from polarity import make_polarity_backend
+from result_batch import EnhancedSentimentBatch
+from result_cache import ResultCache, make_key
+from sentence_scoring import SentenceScorer
+from text_processing import LexiconMatcher, PreparedEntry, prepare_entry, strip_token
 
 
 class EnhancedSentimentAnalyzer:
     """Enhanced sentiment analysis with context awareness and emotion detection."""
 
-    def __init__(self):
-        """Initialize sentiment analyzers and emotion lexicons."""
-        self.vader = SentimentIntensityAnalyzer()
+    # Bump whenever scoring changes so cached and stored results are invalidated
+    VERSION = '1.2'
+
+    def __init__(self, cache: Optional[ResultCache] = None,
+                 sentence_cache: Optional[ResultCache] = None,
+                 polarity_backend: str = 'textblob'):
+        """
+        Initialize sentiment analyzers and emotion lexicons.
+
+        Args:
+            cache: Optional result cache shared across calls
+            sentence_cache: Optional cache of per-sentence scores used by
+                `analyze_incremental` (in-memory by default)
+            polarity_backend: 'textblob', or 'lexicon' for the faster
+                TextBlob-compatible lexicon table (see `polarity`)
+        """
+        self.vader = vader_analyzer()
+        self.polarity_backend = polarity_backend
+        self.polarity = make_polarity_backend(polarity_backend)
+        self.cache = cache
+        self.sentence_scorer = SentenceScorer(self.vader, sentence_cache, polarity=self.polarity)
         self._setup_emotion_lexicons()
         self._setup_intensifiers()
 
+    @property
+    def version(self) -> str:
+        """Identifier of the scoring logic, used in cache keys."""
+        version = f'{type(self).__name__}/{self.VERSION}'
+        if self.polarity_backend != 'textblob':
+            version += f'+{self.polarity.version}'
+        return version
+
     def _setup_emotion_lexicons(self):
         """Setup emotion-specific word lists for better categorization."""
         self.emotion_words = {
@@ -31,6 +64,7 @@ class EnhancedSentimentAnalyzer:
             'surprise': ['surprised', 'shocked', 'amazed', 'astonished', 'stunned',
                         'bewildered', 'startled', 'unexpected']
         }
+        self.emotion_matcher = LexiconMatcher(self.emotion_words)
 
     def _setup_intensifiers(self):
         """Setup intensifier words that modify sentiment strength."""
@@ -53,6 +87,13 @@ class EnhancedSentimentAnalyzer:
             'not': -1.0,
             "n't": -1.0
         }
+        # Modifiers closer than this many tokens compound into one window
+        self.intensity_window = 3
+        self.max_intensity = max(abs(m) for m in self.intensifiers.values())
+
+    def warm_up(self):
+        """Run a throwaway analysis so lazy lexicon loading happens up front."""
+        self._analyze("I feel really good today, though a little worried.")
 
     def analyze(self, text: str) -> Dict[str, any]:
         """
@@ -61,22 +102,69 @@ class EnhancedSentimentAnalyzer:
         Returns:
             Dictionary with sentiment scores, emotions, and confidence metrics.
         """
+        if self.cache is None:
+            return self._analyze(text)
+
+        key = make_key(text, self.version)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._analyze(text)
+            self.cache.put(key, result)
+        return result
+
+    def analyze_incremental(self, text: str) -> Dict[str, any]:
+        """
+        Analyze text using cached per-sentence VADER and TextBlob scores.
+
+        Only sentences not seen before are scored, so re-analyzing an edited
+        entry costs roughly the edited sentences plus the cheap whole-entry
+        passes. Results match `analyze` except where VADER or TextBlob
+        context would cross a sentence boundary.
+
+        Returns:
+            Dictionary shaped like `analyze`.
+        """
+        if not text or not text.strip():
+            return self._empty_result()
+
+        vader_scores, polarity, subjectivity = self.sentence_scorer.score(text)
+        return self._build_result(prepare_entry(text), vader_scores, polarity, subjectivity)
+
+    def _analyze(self, text: str) -> Dict[str, any]:
+        """Score text without consulting the cache."""
         if not text or not text.strip():
             return self._empty_result()
 
-        text_lower = text.lower()
+        polarity, subjectivity = self.polarity.scores(text)
+        return self._build_result(
+            prepare_entry(text),
+            self.vader.polarity_scores(text),
+            polarity,
+            subjectivity
+        )
 
-        blob = TextBlob(text)
-        textblob_polarity = blob.sentiment.polarity
-        textblob_subjectivity = blob.sentiment.subjectivity
+    def _build_result(
+        self,
+        entry: PreparedEntry,
+        vader_scores: Dict[str, float],
+        textblob_polarity: float,
+        textblob_subjectivity: float,
+        emotions: Optional[Dict[str, int]] = None,
+        intensity_modifier: Optional[float] = None
+    ) -> Dict[str, any]:
+        """
+        Add emotions, intensity and confidence to the VADER and TextBlob scores.
 
-        vader_scores = self.vader.polarity_scores(text)
+        Emotions and intensity are computed from the entry unless given.
+        """
         vader_compound = vader_scores['compound']
 
-        emotions = self._detect_emotions(text_lower)
+        if emotions is None:
+            emotions = self._detect_emotions(entry)
         dominant_emotion = max(emotions.items(), key=lambda x: x[1])[0] if emotions else 'neutral'
 
-        intensity_modifier = self._calculate_intensity(text_lower)
+        if intensity_modifier is None:
+            intensity_modifier = self._calculate_intensity(entry)
 
         combined_valence = self._calculate_combined_valence(
             vader_compound,
@@ -89,7 +177,7 @@ class EnhancedSentimentAnalyzer:
             vader_compound,
             textblob_polarity,
             textblob_subjectivity,
-            len(text.split())
+            entry.word_count
         )
 
         return {
@@ -104,34 +192,118 @@ class EnhancedSentimentAnalyzer:
             'emotions': emotions,
             'dominant_emotion': dominant_emotion,
             'confidence': round(confidence, 3),
-            'word_count': len(text.split())
+            'word_count': entry.word_count
         }
 
-    def _detect_emotions(self, text: str) -> Dict[str, int]:
-        """Detect specific emotions in text."""
-        emotions = {}
-        words = text.split()
+    def analyze_batch(
+        self,
+        texts: Sequence[str],
+        workers: Optional[int] = None,
+        chunksize: int = 256,
+        compact: bool = False
+    ) -> Union[List[Dict[str, any]], EnhancedSentimentBatch]:
+        """
+        Analyze many texts on a process pool, keeping input order.
+
+        Args:
+            texts: Texts to analyze
+            workers: Number of worker processes (defaults to CPU count)
+            chunksize: Number of texts sent to a worker per task
+            compact: Return an `EnhancedSentimentBatch` (one array per field)
+                instead of a list of dicts; much smaller for large batches
+
+        Returns:
+            One result per text, shaped like `analyze`.
+        """
+        factory = partial(EnhancedSentimentAnalyzer, polarity_backend=self.polarity_backend)
+
+        if self.cache is None:
+            if compact:
+                return EnhancedSentimentBatch.concat(map_in_pool(
+                    factory,
+                    '_analyze_packed',
+                    [(text,) for text in texts],
+                    workers=workers,
+                    chunksize=chunksize,
+                    local=self,
+                    batched=True
+                ))
+            return map_in_pool(
+                factory,
+                'analyze',
+                [(text,) for text in texts],
+                workers=workers,
+                chunksize=chunksize,
+                local=self
+            )
+
+        keys = [make_key(text, self.version) for text in texts]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        scored = map_in_pool(
+            factory,
+            '_analyze',
+            [(texts[i],) for i in missing],
+            workers=workers,
+            chunksize=chunksize,
+            local=self
+        )
+        for i, result in zip(missing, scored):
+            self.cache.put(keys[i], result)
+            results[i] = result
+
+        return self._pack(results) if compact else results
 
-        for emotion, emotion_words in self.emotion_words.items():
-            count = sum(1 for word in words if any(ew in word for ew in emotion_words))
-            if count > 0:
-                emotions[emotion] = count
+    def _analyze_packed(self, texts: List[str]) -> List[EnhancedSentimentBatch]:
+        """Score a chunk of texts into a single batch, so workers send back columns."""
+        return [self._pack([self._analyze(text) for text in texts])]
 
-        return emotions
+    def _pack(self, results: Sequence[Dict[str, any]]) -> EnhancedSentimentBatch:
+        """Pack `analyze` results into columns."""
+        return EnhancedSentimentBatch.from_results(results, self.emotion_matcher.categories)
 
-    def _calculate_intensity(self, text: str) -> float:
-        """Calculate intensity modifier based on intensifier words."""
-        words = text.split()
-        modifier = 1.0
-        count = 0
+    def _detect_emotions(self, entry: PreparedEntry) -> Dict[str, int]:
+        """Detect specific emotions in a prepared entry."""
+        return self.emotion_matcher.count(entry.tokens)
 
-        for word in words:
-            for intensifier, multiplier in self.intensifiers.items():
-                if intensifier in word:
-                    modifier *= multiplier
-                    count += 1
+    def _calculate_intensity(self, entry: PreparedEntry) -> float:
+        """
+        Calculate intensity modifier based on intensifier words.
 
-        return modifier if count > 0 else 1.0
+        Each token is looked up once. Modifiers within `intensity_window`
+        tokens of each other compound ("not very"), each window is capped
+        at `max_intensity`, and the result is the mean over windows so it
+        stays bounded however long the entry is.
+        """
+        window_products = []
+        product = None
+        last_index = None
+
+        for index, token in enumerate(entry.tokens):
+            multiplier = self.intensifiers.get(token)
+            if multiplier is None:
+                word = strip_token(token)
+                multiplier = self.intensifiers.get(word)
+                if multiplier is None:
+                    if not word.endswith("n't"):
+                        continue
+                    multiplier = self.intensifiers["n't"]
+
+            if product is not None and index - last_index <= self.intensity_window:
+                product *= multiplier
+            else:
+                if product is not None:
+                    window_products.append(product)
+                product = multiplier
+            product = max(-self.max_intensity, min(self.max_intensity, product))
+            last_index = index
+
+        if product is None:
+            return 1.0
+
+        window_products.append(product)
+        return sum(window_products) / len(window_products)
 
     def _calculate_combined_valence(
         self,
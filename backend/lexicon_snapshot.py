@@ -0,0 +1,173 @@
+"""Pickled snapshot of the VADER and TextBlob lexicons for fast start-up.
+
+`SentimentIntensityAnalyzer()` parses VADER's lexicon and emoji text files
+on every construction, and TextBlob parses its sentiment XML the first
+time any text is scored. The parsed tables are saved once to a pickle
+next to mirror.db (or at MIRROR_LEXICON_SNAPSHOT) and loaded from there
+afterwards. The snapshot is rebuilt automatically when the installed
+lexicon files change.
+
+Usage:
+    python lexicon_snapshot.py    # (re)build the snapshot ahead of time
+"""
+import gc
+import hashlib
+import os
+import pickle
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import vaderSentiment.vaderSentiment as vader_module
+from textblob.en import sentiment as pattern_sentiment
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# Bump whenever the snapshot layout changes
+SNAPSHOT_VERSION = 1
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATH = os.getenv(
+    'MIRROR_LEXICON_SNAPSHOT',
+    os.path.join(_PROJECT_ROOT, 'lexicon_snapshot.pickle')
+)
+
+_lock = threading.Lock()
+_snapshot: Optional[Dict[str, Any]] = None
+
+
+def _source_files() -> List[str]:
+    """Lexicon files the snapshot is built from."""
+    vader_dir = os.path.dirname(os.path.abspath(vader_module.__file__))
+    return [
+        os.path.join(vader_dir, 'vader_lexicon.txt'),
+        os.path.join(vader_dir, 'emoji_utf8_lexicon.txt'),
+        pattern_sentiment.path
+    ]
+
+
+def _fingerprint() -> str:
+    """Identify the installed lexicon files by path, size and mtime."""
+    digest = hashlib.sha256(str(SNAPSHOT_VERSION).encode('utf-8'))
+    for path in _source_files():
+        stat = os.stat(path)
+        digest.update(f'\0{path}\0{stat.st_size}\0{stat.st_mtime_ns}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _parse_lexicons() -> Dict[str, Any]:
+    """Parse the lexicons from their text sources."""
+    vader = SentimentIntensityAnalyzer()
+    # Any lookup makes TextBlob load its lexicon
+    len(pattern_sentiment)
+    return {
+        'fingerprint': _fingerprint(),
+        'vader_lexicon': vader.lexicon,
+        'vader_emojis': vader.emojis,
+        'textblob_words': dict(dict.items(pattern_sentiment)),
+        'textblob_labels': dict(pattern_sentiment.labeler),
+        'textblob_synsets': dict(pattern_sentiment._synsets),
+        'textblob_language': pattern_sentiment._language
+    }
+
+
+def build_snapshot(path: str = DEFAULT_PATH) -> Dict[str, Any]:
+    """Parse the lexicons and write them to `path` atomically."""
+    snapshot = _parse_lexicons()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return snapshot
+
+
+def load_snapshot(path: str = DEFAULT_PATH) -> Dict[str, Any]:
+    """
+    Get the parsed lexicons, loading or building the snapshot once per process.
+
+    A missing, unreadable or outdated snapshot is rebuilt. If it can't be
+    written (e.g. a read-only install), the freshly parsed lexicons are
+    still used for this process.
+    """
+    global _snapshot
+    if _snapshot is not None:
+        return _snapshot
+
+    with _lock:
+        if _snapshot is not None:
+            return _snapshot
+
+        snapshot = None
+        # Unpickling allocates ~40k objects; without pausing the cyclic GC it
+        # keeps rescanning them and the load takes over three times as long
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Ignoring unreadable lexicon snapshot {path}: {e}")
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        if not isinstance(snapshot, dict) or snapshot.get('fingerprint') != _fingerprint():
+            try:
+                snapshot = build_snapshot(path)
+            except OSError as e:
+                print(f"Could not write lexicon snapshot {path}: {e}")
+                snapshot = _parse_lexicons()
+
+        _snapshot = snapshot
+        return snapshot
+
+
+def vader_analyzer(path: str = DEFAULT_PATH) -> SentimentIntensityAnalyzer:
+    """
+    Build a `SentimentIntensityAnalyzer` from the snapshot.
+
+    All analyzers built this way share the same (read-only) lexicon dicts.
+    """
+    snapshot = load_snapshot(path)
+    analyzer = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+    analyzer.lexicon = snapshot['vader_lexicon']
+    analyzer.emojis = snapshot['vader_emojis']
+    return analyzer
+
+
+def load_textblob_lexicon(path: str = DEFAULT_PATH):
+    """Fill TextBlob's sentiment lexicon from the snapshot unless it's loaded already."""
+    if dict.__len__(pattern_sentiment):
+        return
+
+    snapshot = load_snapshot(path)
+    with _lock:
+        if dict.__len__(pattern_sentiment):
+            return
+        pattern_sentiment._language = snapshot['textblob_language']
+        dict.update(pattern_sentiment.labeler, snapshot['textblob_labels'])
+        dict.update(pattern_sentiment._synsets, snapshot['textblob_synsets'])
+        # Filled last: a non-empty lexicon is what stops TextBlob loading the XML
+        dict.update(pattern_sentiment, snapshot['textblob_words'])
+
+
+def main():
+    """Rebuild the snapshot and report load times."""
+    start = time.perf_counter()
+    snapshot = build_snapshot()
+    built = time.perf_counter()
+    with open(DEFAULT_PATH, 'rb') as f:
+        pickle.load(f)
+    loaded = time.perf_counter()
+
+    print(f"Wrote {DEFAULT_PATH} ({os.path.getsize(DEFAULT_PATH) / 1024:.0f} KB): "
+          f"{len(snapshot['vader_lexicon'])} VADER words, "
+          f"{len(snapshot['vader_emojis'])} emojis, "
+          f"{len(snapshot['textblob_words'])} TextBlob words")
+    print(f"  parse from text : {(built - start) * 1000:8.1f} ms")
+    print(f"  load snapshot   : {(loaded - built) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -33,6 +33,7 @@ class JournalEntry:
     timestamp: Optional[datetime] = None
     sentiment_score: Optional[float] = None
     valence: Optional[float] = None
+    analyzer_version: Optional[str] = None
     
     def to_dict(self):
         """Convert entry to dictionary."""
@@ -50,6 +51,7 @@ class Bias:
     bias_type: str = ""
     detected_pattern: str = ""
     explanation: str = ""
+    pattern_version: Optional[str] = None
     
     def to_dict(self):
         """Convert bias to dictionary."""
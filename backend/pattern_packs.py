@@ -0,0 +1,300 @@
+"""Versioned bias pattern packs, compiled once per process and hot-reloadable.
+
+Each bias detector's regexes and base confidences live in a JSON pack in
+backend/patterns (or MIRROR_BIAS_PATTERNS_DIR), with a 'version' stamped
+on the bias rows they produce. A pack is compiled into a PatternPack once
+and cached by a hash of its content, so every detector using the same
+pack shares one compiled copy.
+
+Detectors look their pack up in the active registry on every call.
+`reload_packs` re-reads the pack files that changed, compiles each one in
+full and only then swaps it into the registry, with a single assignment:
+detections already running finish with the pack they started with, and
+none ever sees a half-compiled one.
+
+Usage:
+    python pattern_packs.py    # check that every pack in the directory compiles
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from bias_triggers import TriggerFilter
+
+# Bump whenever the pack file layout changes
+PACK_FORMAT = 1
+
+PACK_DIR = os.getenv(
+    'MIRROR_BIAS_PATTERNS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'patterns')
+)
+
+# Compiled packs kept for reuse after they stop being active
+MAX_COMPILED = 8
+
+_lock = threading.RLock()
+_compiled: 'OrderedDict[str, PatternPack]' = OrderedDict()
+# Active pack per pack file, with the (size, mtime) it was read at
+_active: Dict[str, Tuple[Tuple[int, int], 'PatternPack']] = {}
+
+
+def leading_chars(pattern: str) -> Optional[str]:
+    """
+    Characters a match of `pattern` can start with, if that's easy to tell.
+
+    Understands patterns opening with a word boundary and a group of
+    literal alternatives, like r'\b(always|never)...'; returns None for
+    anything else.
+    """
+    opening = re.match(r'\\b\(([^()]*)\)', pattern)
+    if opening is None:
+        return None
+    chars = set()
+    for alternative in opening.group(1).split('|'):
+        if not alternative or not alternative[0].isalnum():
+            return None
+        chars.add(alternative[0])
+    return ''.join(sorted(chars))
+
+
+class PatternGroup:
+    """
+    One bias type's patterns, compiled into a single master regex.
+
+    The master regex is an alternation of lookaheads, one named group
+    `p<i>` per pattern, so one scan of the text finds every position where
+    any pattern matches. `matches` turns those hits into exactly the
+    matches `re.finditer` would give for each pattern on its own: only
+    patterns after the reported one are re-tried at a hit, and each
+    pattern's matches are kept non-overlapping. When every pattern opens
+    with a word boundary and known first letters, the master regex checks
+    those first, so most positions are rejected in a single test.
+    """
+
+    def __init__(self, patterns: Sequence[Tuple[str, float]]):
+        """
+        Args:
+            patterns: (regex, base confidence) pairs, in priority order
+        """
+        self.confidences = [confidence for _, confidence in patterns]
+        self.compiled = [re.compile(pattern, re.IGNORECASE) for pattern, _ in patterns]
+
+        starts = [leading_chars(pattern) for pattern, _ in patterns]
+        prefix = ''
+        if starts and None not in starts:
+            prefix = r'(?=[%s])\b' % re.escape(''.join(sorted(set(''.join(starts)))))
+        self.master = re.compile(
+            prefix + '(?:' + '|'.join(
+                f'(?=(?P<p{i}>{pattern}))' for i, (pattern, _) in enumerate(patterns)
+            ) + ')',
+            re.IGNORECASE
+        )
+        self._indexes = {f'p{i}': i for i in range(len(patterns))}
+
+    def matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Find every pattern's matches in one scan.
+
+        Yields:
+            (pattern index, start, end), ordered by start and then pattern index
+        """
+        if not self.compiled:
+            return
+        compiled = self.compiled
+        # Where each pattern's own finditer would resume searching
+        resume = [0] * len(compiled)
+
+        for hit in self.master.finditer(text):
+            position = hit.start()
+            first = self._indexes[hit.lastgroup]
+            # Earlier patterns failed here; later ones may match here too
+            for index in range(first, len(compiled)):
+                if position < resume[index]:
+                    continue
+                if index == first:
+                    start, end = hit.span(hit.lastgroup)
+                else:
+                    match = compiled[index].match(text, position)
+                    if match is None:
+                        continue
+                    start, end = match.span()
+                resume[index] = end
+                yield index, start, end
+
+
+def pack_digest(spec: Dict[str, Any]) -> str:
+    """Hash of a pack's content, ignoring how its file is laid out."""
+    return hashlib.sha256(
+        json.dumps(spec, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    ).hexdigest()
+
+
+class PatternPack:
+    """
+    A pack's patterns, compiled for the detectors.
+
+    Built in full before anything can use it and never changed afterwards,
+    so detectors can share one across threads without locking.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        """
+        Args:
+            spec: The parsed pack file
+
+        Raises:
+            ValueError: If the pack is malformed or a pattern doesn't compile
+        """
+        if not isinstance(spec, dict) or spec.get('format') != PACK_FORMAT:
+            found = spec.get('format') if isinstance(spec, dict) else type(spec).__name__
+            raise ValueError(f"Unsupported pattern pack format: {found!r}")
+        if 'version' not in spec or not isinstance(spec.get('bias_types'), dict):
+            raise ValueError("Pattern pack needs a 'version' and a 'bias_types' object")
+
+        self.spec = spec
+        self.digest = pack_digest(spec)
+        self.name = spec.get('name', '')
+        self.version = str(spec['version'])
+
+        macros = spec.get('macros', {})
+        # (regex, base confidence) pairs by bias type, in priority order
+        self.patterns: Dict[str, List[Tuple[str, float]]] = {}
+        for bias_type, entries in spec['bias_types'].items():
+            patterns = []
+            for entry in entries:
+                pattern = entry['pattern']
+                for name, value in macros.items():
+                    pattern = pattern.replace('{' + name + '}', value)
+                confidence = float(entry.get('confidence', 1.0))
+                if not 0.0 <= confidence <= 1.0:
+                    raise ValueError(f"Confidence {confidence} of {bias_type} pattern "
+                                     f"{entry['pattern']!r} is outside 0-1")
+                try:
+                    re.compile(pattern, re.IGNORECASE)
+                except re.error as e:
+                    raise ValueError(f"Bad {bias_type} pattern {entry['pattern']!r}: {e}") from e
+                patterns.append((pattern, confidence))
+            self.patterns[bias_type] = patterns
+
+        self.bias_types = tuple(self.patterns)
+        self.pattern_groups: Dict[str, PatternGroup] = {
+            bias_type: PatternGroup(patterns) for bias_type, patterns in self.patterns.items()
+        }
+        self.trigger_filter = TriggerFilter({
+            bias_type: [pattern for pattern, _ in patterns]
+            for bias_type, patterns in self.patterns.items()
+        })
+        self._reduced: Dict[float, Dict[str, PatternGroup]] = {}
+
+    def __repr__(self) -> str:
+        return f'PatternPack({self.name!r}, version={self.version!r}, digest={self.digest[:12]!r})'
+
+    def __reduce__(self):
+        # Workers recompile from the spec, through their own process's cache
+        return compile_pack, (self.spec,)
+
+    def reduced_pattern_groups(self, min_confidence: float) -> Dict[str, PatternGroup]:
+        """Each type's patterns with a base confidence of at least `min_confidence`."""
+        groups = self._reduced.get(min_confidence)
+        if groups is None:
+            groups = {
+                bias_type: PatternGroup([
+                    (pattern, confidence) for pattern, confidence in patterns
+                    if confidence >= min_confidence
+                ])
+                for bias_type, patterns in self.patterns.items()
+            }
+            # Published whole; threads racing here build equal copies
+            self._reduced[min_confidence] = groups
+        return groups
+
+
+def pack_path(pack: str) -> str:
+    """Path of a pack file given by name (e.g. 'enhanced') or by path."""
+    if os.sep in pack or pack.endswith('.json'):
+        return os.path.abspath(pack)
+    return os.path.join(PACK_DIR, f'{pack}.json')
+
+
+def compile_pack(spec: Dict[str, Any]) -> PatternPack:
+    """Compile a parsed pack, reusing the copy compiled from the same content."""
+    digest = pack_digest(spec)
+    with _lock:
+        pack = _compiled.get(digest)
+        if pack is None:
+            pack = PatternPack(spec)
+            _compiled[digest] = pack
+            while len(_compiled) > MAX_COMPILED:
+                _compiled.popitem(last=False)
+        else:
+            _compiled.move_to_end(digest)
+    return pack
+
+
+def _stamp(path: str) -> Tuple[int, int]:
+    """Identify a pack file's current contents by size and mtime."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_pack(path: str) -> PatternPack:
+    """Read and compile a pack file, without making it active."""
+    with open(path, encoding='utf-8') as f:
+        return compile_pack(json.load(f))
+
+
+def active_pack(path: str) -> PatternPack:
+    """The active pack for a pack file, loading it on first use."""
+    entry = _active.get(path)
+    if entry is None:
+        with _lock:
+            entry = _active.get(path)
+            if entry is None:
+                stamp = _stamp(path)
+                entry = (stamp, load_pack(path))
+                _active[path] = entry
+    return entry[1]
+
+
+def reload_packs(force: bool = False) -> Dict[str, PatternPack]:
+    """
+    Re-read the active pack files that changed since they were loaded.
+
+    Cheap enough to call on every request: unchanged files cost one stat.
+    A pack that fails to load or compile is reported and the one before
+    it stays active.
+
+    Args:
+        force: Re-read every active pack file, changed or not
+
+    Returns:
+        The packs that replaced a different one, by path
+    """
+    reloaded = {}
+    with _lock:
+        for path, (stamp, old_pack) in list(_active.items()):
+            try:
+                new_stamp = _stamp(path)
+                if new_stamp == stamp and not force:
+                    continue
+                new_pack = load_pack(path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Error reloading bias pattern pack {path}: {e}")
+                continue
+            _active[path] = (new_stamp, new_pack)
+            if new_pack is not old_pack:
+                reloaded[path] = new_pack
+    return reloaded
+
+
+if __name__ == '__main__':
+    for filename in sorted(os.listdir(PACK_DIR)):
+        if filename.endswith('.json'):
+            pack = load_pack(os.path.join(PACK_DIR, filename))
+            counts = ', '.join(f'{bias_type} {len(patterns)}'
+                               for bias_type, patterns in pack.patterns.items())
+            print(f"{filename}: {pack.name} {pack.version} ({pack.digest[:12]}): {counts}")
@@ -0,0 +1,162 @@
+"""Polarity/subjectivity backends for the sentiment analyzers."""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from textblob import TextBlob
+from textblob._text import EMOTICONS
+from textblob.en import sentiment as pattern_sentiment
+
+from lexicon_snapshot import load_snapshot, load_textblob_lexicon
+
+
+def average(values: List[float]) -> float:
+    """Average the way TextBlob does, so sums over the same values agree exactly."""
+    total = 0
+    for value in values:
+        total += value
+    return total / float(len(values) or 1)
+
+
+class TextBlobPolarity:
+    """TextBlob's pattern analyzer; the reference backend."""
+
+    NAME = 'textblob'
+    VERSION = '1.0'
+
+    def __init__(self):
+        load_textblob_lexicon()
+
+    @property
+    def version(self) -> str:
+        """Identifier of the scoring logic, used in analyzer versions."""
+        return f'{self.NAME}/{self.VERSION}'
+
+    def scores(self, text: str) -> Tuple[float, float]:
+        """Return (polarity -1 to 1, subjectivity 0 to 1) for the text."""
+        sentiment = TextBlob(text).sentiment
+        return sentiment.polarity, sentiment.subjectivity
+
+    def assessments(self, text: str) -> List[Tuple[float, float]]:
+        """(polarity, subjectivity) of each assessed chunk; `scores` averages these."""
+        return [(p, s) for _, p, s, _ in pattern_sentiment(text).assessments]
+
+
+class LexiconPolarity:
+    """
+    TextBlob-compatible polarity from a precomputed word table in one pass.
+
+    Uses TextBlob's own lexicon, flattened into word -> (polarity,
+    subjectivity, intensity, is_modifier), and applies the same negation,
+    modifier, "!" and emoticon rules while walking regex tokens. Skipping
+    TextBlob's tokenizer and per-token dict building makes it several
+    times faster. Results match TextBlob except where the tokenizers
+    disagree: TextBlob leaves words glued together by punctuation
+    ("bad,bad", "good@home") unsplit and so unscored, and finds some
+    emoticons that are glued to punctuation.
+    """
+
+    NAME = 'lexicon'
+    VERSION = '1.0'
+
+    def __init__(self):
+        words = load_snapshot()['textblob_words']
+        modifiers = pattern_sentiment.modifiers
+        self.table: Dict[str, Tuple[float, float, float, bool]] = {
+            word: (*tags[None], any(tag in tags for tag in modifiers))
+            for word, tags in words.items()
+        }
+        self.negations = frozenset(pattern_sentiment.negations)
+
+        # First listed mood wins, as in TextBlob's scan
+        self.emoticons: Dict[str, float] = {}
+        for (_, polarity), faces in EMOTICONS.items():
+            for face in faces:
+                self.emoticons.setdefault(face.lower(), polarity)
+
+        # Split like TextBlob's tokenizer: emoticons are matched
+        # case-sensitively at the end of a token, "n't" comes off the word
+        # before it and everything else is words and single punctuation marks
+        faces = sorted({face for group in EMOTICONS.values() for face in group},
+                       key=len, reverse=True)
+        self.token_re = re.compile(
+            r"(?:%s)(?=[!?.,;]*(?:\s|$))|\(!\)|[^\W_]+?(?=n't)|[^\W_]+(?:[-.][^\W_]+)*|\S"
+            % '|'.join(re.escape(face) for face in faces)
+        )
+
+    @property
+    def version(self) -> str:
+        """Identifier of the scoring logic, used in analyzer versions."""
+        return f'{self.NAME}/{self.VERSION}'
+
+    def scores(self, text: str) -> Tuple[float, float]:
+        """Return (polarity -1 to 1, subjectivity 0 to 1) for the text."""
+        assessed = self.assessments(text)
+        return (average([p for p, _ in assessed]), average([s for _, s in assessed]))
+
+    def assessments(self, text: str) -> List[Tuple[float, float]]:
+        """(polarity, subjectivity) of each assessed chunk; `scores` averages these."""
+        table = self.table
+        negations = self.negations
+        # Each chunk is [polarity, subjectivity, intensity, negated]
+        chunks: List[list] = []
+        modifier: Optional[str] = None
+        negation: Optional[str] = None
+
+        for token in self.token_re.findall(text):
+            word = token.lower()
+            entry = table.get(word)
+            if entry is not None:
+                polarity, subjectivity, intensity, is_modifier = entry
+                if modifier is None:
+                    chunk = [polarity, subjectivity, intensity, False]
+                    chunks.append(chunk)
+                else:
+                    # "really good": the modifier's intensity scales this word
+                    chunk = chunks[-1]
+                    chunk[0] = max(-1.0, min(polarity * chunk[2], 1.0))
+                    chunk[1] = max(-1.0, min(subjectivity * chunk[2], 1.0))
+                    chunk[2] = intensity
+                if negation is not None:
+                    chunk[2] = 1.0 / chunk[2]
+                    chunk[3] = True
+                modifier = word if is_modifier else None
+                negation = word if word in negations else None
+                continue
+
+            if word in negations:
+                negation = word
+            elif negation is not None and len(word.strip("'")) > 1:
+                # Negations carry across small words only ("not a good")
+                negation = None
+            if negation is not None and modifier is not None and modifier.endswith('ly'):
+                # "really not good"
+                chunks[-1][3] = True
+                negation = None
+            elif modifier is not None and len(word) > 2:
+                modifier = None
+
+            if word == '!' and chunks:
+                chunks[-1][0] = max(-1.0, min(chunks[-1][0] * 1.25, 1.0))
+            elif word == '(!)':
+                # Sarcasm marker
+                chunks.append([0.0, 1.0, 1.0, False])
+            elif not word.isalpha():
+                face = self.emoticons.get(word)
+                if face is not None:
+                    chunks.append([face, 1.0, 1.0, False])
+
+        # "not good" = slightly bad, "not bad" = slightly good
+        return [(p * -0.5 if negated else p, s) for p, s, _, negated in chunks]
+
+
+POLARITY_BACKENDS = {
+    TextBlobPolarity.NAME: TextBlobPolarity,
+    LexiconPolarity.NAME: LexiconPolarity
+}
+
+
+def make_polarity_backend(name: str):
+    """Build the polarity backend registered under `name`."""
+    if name not in POLARITY_BACKENDS:
+        raise ValueError(f"Unknown polarity backend: {name}")
+    return POLARITY_BACKENDS[name]()
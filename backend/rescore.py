@@ -0,0 +1,238 @@
+"""Re-run sentiment and bias analysis over stored journal entries.
+
+Entries are streamed from the database in chunks, scored on a worker
+pool and written back one chunk at a time. After every chunk a checkpoint
+records the last finished entry id, so an interrupted run resumes where
+it stopped. With --stale only entries whose analyzer_version stamp
+differs from the current analyzers are processed.
+
+Usage:
+    python rescore.py --backend sqlite --db-path ../mirror.db --workers 4
+    python rescore.py --backend supabase --chunk-size 200
+    python rescore.py --stale     # only entries scored by other versions
+    python rescore.py --restart   # ignore an existing checkpoint
+
+Each backend is scored with the analyzers of the app that writes to it:
+the basic ones of app.py for SQLite, the enhanced ones of
+streamlit_app.py for Supabase. The checkpoint is kept next to the SQLite
+database, or in the project root for Supabase.
+"""
+import argparse
+import json
+import os
+import time
+from functools import partial
+from typing import Any, Dict, Optional
+
+from batch import WorkerPool
+from bias_detector import BiasDetector
+from enhanced_bias_detector import EnhancedBiasDetector
+from enhanced_sentiment import EnhancedSentimentAnalyzer
+from polarity import POLARITY_BACKENDS
+from sentiment_analyzer import SentimentAnalyzer
+from utils import analysis_version
+
+DEFAULT_CHECKPOINT = 'rescore_checkpoint.json'
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Analyzers of the app writing to each backend, so rescored rows match its own
+DEFAULT_ANALYZERS = {'sqlite': 'basic', 'supabase': 'enhanced'}
+
+
+class EntryScorer:
+    """Sentiment analyzer and bias detector pair, built once per worker."""
+
+    def __init__(self, analyzers: str = 'enhanced', polarity_backend: str = 'textblob'):
+        """
+        Args:
+            analyzers: 'enhanced' for the analyzers used by streamlit_app,
+                'basic' for the ones used by app.py
+            polarity_backend: Polarity backend for the sentiment analyzer
+        """
+        if analyzers == 'enhanced':
+            self.sentiment_analyzer = EnhancedSentimentAnalyzer(polarity_backend=polarity_backend)
+            self.bias_detector = EnhancedBiasDetector()
+        elif analyzers == 'basic':
+            self.sentiment_analyzer = SentimentAnalyzer(polarity_backend=polarity_backend)
+            self.bias_detector = BiasDetector()
+        else:
+            raise ValueError(f"Unknown analyzers: {analyzers}")
+
+    @property
+    def version(self) -> str:
+        """Version stamp stored on every entry this scorer writes."""
+        return analysis_version(self.sentiment_analyzer, self.bias_detector)
+
+    def score(self, entry_id: Any, text: str) -> Dict[str, Any]:
+        """Analyze one entry and shape the result for `save_analyses`."""
+        sentiment = self.sentiment_analyzer.analyze(text)
+        biases = self.bias_detector.detect_all(text, sentiment['valence'])
+        return {
+            'entry_id': entry_id,
+            'sentiment_score': sentiment['sentiment_score'],
+            'valence': sentiment['valence'],
+            'analyzer_version': self.version,
+            'pattern_version': self.bias_detector.version,
+            'biases': [
+                {
+                    'type': bias['type'],
+                    'pattern': bias['pattern'],
+                    'explanation': bias['explanation']
+                }
+                for bias in biases
+            ]
+        }
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """Read a checkpoint file, or return None if there isn't one."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]):
+    """Write a checkpoint atomically so a crash never leaves a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def open_database(backend: str, db_path: Optional[str] = None):
+    """Connect to the SQLite or Supabase store."""
+    if backend == 'sqlite':
+        from database import Database
+        return Database(db_path)
+    from supabase_client import SupabaseDatabase
+    return SupabaseDatabase()
+
+
+def default_checkpoint(db) -> str:
+    """Checkpoint path next to a SQLite database, or in the project root otherwise."""
+    db_path = getattr(db, 'db_path', None)
+    if db_path:
+        return f'{db_path}.{DEFAULT_CHECKPOINT}'
+    return os.path.join(_PROJECT_ROOT, DEFAULT_CHECKPOINT)
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as H:MM:SS."""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def rescore(db, scorer_factory, checkpoint_path: str, chunk_size: int = 500,
+            workers: Optional[int] = None, restart: bool = False,
+            stale_only: bool = False) -> Dict[str, Any]:
+    """
+    Re-analyze stored entries, resuming from a checkpoint if present.
+
+    Args:
+        db: `Database` or `SupabaseDatabase`
+        scorer_factory: Picklable callable building an `EntryScorer`
+        checkpoint_path: Where progress is recorded after each chunk
+        chunk_size: Entries read, scored and written per chunk
+        workers: Worker processes (defaults to CPU count)
+        restart: Ignore an existing checkpoint and start from the beginning
+        stale_only: Only process entries not stamped with the scorer's version
+
+    Returns:
+        The final checkpoint
+    """
+    scorer = scorer_factory()
+    checkpoint = None if restart else load_checkpoint(checkpoint_path)
+
+    if checkpoint and (checkpoint.get('version'), checkpoint.get('stale_only')) != \
+            (scorer.version, stale_only):
+        print(f"Checkpoint was written by {checkpoint.get('version')} "
+              f"(stale_only={checkpoint.get('stale_only')}), now running {scorer.version} "
+              f"(stale_only={stale_only}); starting over.")
+        checkpoint = None
+
+    if checkpoint is None:
+        checkpoint = {
+            'version': scorer.version,
+            'stale_only': stale_only,
+            'last_id': None,
+            'processed': 0,
+            'biases': 0,
+            'elapsed_seconds': 0.0
+        }
+    else:
+        print(f"Resuming after entry {checkpoint['last_id']} "
+              f"({checkpoint['processed']} already done).")
+
+    current_version = scorer.version if stale_only else None
+    remaining = db.count_entries(after_id=checkpoint['last_id'], current_version=current_version)
+    total = checkpoint['processed'] + remaining
+    run_processed = 0
+    previous_elapsed = checkpoint['elapsed_seconds']
+    start = time.perf_counter()
+
+    with WorkerPool(scorer_factory, workers=workers, local=scorer) as pool:
+        for rows in db.iter_entries(chunk_size=chunk_size, after_id=checkpoint['last_id'],
+                                    current_version=current_version):
+            analyses = pool.map('score', [(row['id'], row['entry_text']) for row in rows])
+            db.save_analyses(analyses)
+
+            run_processed += len(rows)
+            run_elapsed = time.perf_counter() - start
+            checkpoint['last_id'] = rows[-1]['id']
+            checkpoint['processed'] += len(rows)
+            checkpoint['biases'] += sum(len(a['biases']) for a in analyses)
+            checkpoint['elapsed_seconds'] = previous_elapsed + run_elapsed
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            rate = run_processed / run_elapsed if run_elapsed > 0 else float('inf')
+            eta = (total - checkpoint['processed']) / rate if rate > 0 else 0
+            percent = 100 * checkpoint['processed'] / total if total else 100.0
+            print(f"{checkpoint['processed']}/{total} entries ({percent:5.1f}%) | "
+                  f"{rate:8.1f} entries/sec | ETA {format_duration(eta)}", flush=True)
+
+    return checkpoint
+
+
+def main():
+    """Parse arguments and run the backfill."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', choices=['sqlite', 'supabase'], default='sqlite')
+    parser.add_argument('--db-path', default=None,
+                        help='SQLite database file (defaults to mirror.db in the project root)')
+    parser.add_argument('--analyzers', choices=['enhanced', 'basic'], default=None,
+                        help="defaults to the writing app's: basic for sqlite, enhanced for supabase")
+    parser.add_argument('--polarity', choices=sorted(POLARITY_BACKENDS), default='textblob',
+                        help='polarity backend (lexicon is faster, TextBlob-compatible)')
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--checkpoint', default=None,
+                        help=f'progress file (defaults to <db-path>.{DEFAULT_CHECKPOINT}, '
+                             f'or {DEFAULT_CHECKPOINT} in the project root for supabase)')
+    parser.add_argument('--stale', action='store_true',
+                        help='only re-score entries stamped with a different version')
+    parser.add_argument('--restart', action='store_true',
+                        help='ignore an existing checkpoint')
+    args = parser.parse_args()
+
+    db = open_database(args.backend, args.db_path)
+    analyzers = args.analyzers or DEFAULT_ANALYZERS[args.backend]
+    checkpoint = rescore(
+        db,
+        partial(EntryScorer, analyzers=analyzers, polarity_backend=args.polarity),
+        args.checkpoint or default_checkpoint(db),
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        restart=args.restart,
+        stale_only=args.stale
+    )
+
+    elapsed = checkpoint['elapsed_seconds']
+    rate = checkpoint['processed'] / elapsed if elapsed > 0 else 0.0
+    print(f"Done: {checkpoint['processed']} entries, {checkpoint['biases']} biases "
+          f"in {format_duration(elapsed)} ({rate:.1f} entries/sec overall).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Column-oriented sentiment results for bulk analysis.
+
+A list of `analyze()` dicts costs several hundred bytes per entry: a dict,
+a float object per score and, for the enhanced analyzer, a nested emotions
+dict. The batches here keep one NumPy array per field instead, so each
+entry costs a few dozen bytes. Bulk APIs return them with `compact=True`;
+convert to dicts (`to_dicts`, indexing) or a DataFrame (`to_frame`) only
+where the results leave the analysis code.
+"""
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SentimentBatch:
+    """Results of `SentimentAnalyzer.analyze` for many entries, one array per field."""
+
+    __slots__ = ('columns',)
+
+    FLOAT_FIELDS = (
+        'textblob_polarity',
+        'textblob_subjectivity',
+        'vader_compound',
+        'vader_pos',
+        'vader_neu',
+        'vader_neg',
+        'sentiment_score',
+        'valence'
+    )
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        """
+        Args:
+            columns: One array per field, all of the same length
+        """
+        self.columns = columns
+
+    @classmethod
+    def from_results(cls, results: Sequence[Dict[str, Any]]) -> 'SentimentBatch':
+        """Pack `analyze` dicts into columns."""
+        return cls(cls._float_columns(results))
+
+    @classmethod
+    def _float_columns(cls, results: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """One float64 array per score; float64 keeps every value exact."""
+        return {
+            name: np.fromiter((result[name] for result in results), dtype=np.float64,
+                              count=len(results))
+            for name in cls.FLOAT_FIELDS
+        }
+
+    @classmethod
+    def concat(cls, batches: Sequence['SentimentBatch']) -> 'SentimentBatch':
+        """Join batches end to end, e.g. the per-chunk batches from a worker pool."""
+        if not batches:
+            return cls.from_results([])
+        return cls({
+            name: np.concatenate([batch.columns[name] for batch in batches])
+            for name in batches[0].columns
+        })
+
+    def __len__(self) -> int:
+        return len(self.columns['valence'])
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """One entry's result as an `analyze`-shaped dict."""
+        return self._row({name: column[index].tolist() for name, column in self.columns.items()})
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_dicts())
+
+    def _row(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn one row of column values into a result dict."""
+        return {name: values[name] for name in self.FLOAT_FIELDS}
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """All results as `analyze`-shaped dicts."""
+        names = list(self.columns)
+        rows = zip(*(self.columns[name].tolist() for name in names))
+        return [self._row(dict(zip(names, row))) for row in rows]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Results as a DataFrame with one column per field."""
+        return pd.DataFrame({name: self.columns[name] for name in self.FLOAT_FIELDS})
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays."""
+        return sum(column.nbytes for column in self.columns.values())
+
+
+class EnhancedSentimentBatch(SentimentBatch):
+    """
+    Results of `EnhancedSentimentAnalyzer.analyze` for many entries.
+
+    Emotion counts are a 2-D array with one column per emotion, and the
+    dominant emotion is stored as a code into `labels`.
+    """
+
+    __slots__ = ('emotions',)
+
+    FLOAT_FIELDS = SentimentBatch.FLOAT_FIELDS + ('confidence',)
+
+    def __init__(self, columns: Dict[str, np.ndarray], emotions: Tuple[str, ...]):
+        """
+        Args:
+            columns: One array per field, all of the same length
+            emotions: Emotion names, in the order of the emotion count columns
+        """
+        super().__init__(columns)
+        self.emotions = tuple(emotions)
+
+    @property
+    def labels(self) -> Tuple[str, ...]:
+        """Dominant emotion names by code; 0 is 'neutral'."""
+        return ('neutral',) + self.emotions
+
+    @classmethod
+    def from_results(cls, results: Sequence[Dict[str, Any]],
+                     emotions: Sequence[str] = ()) -> 'EnhancedSentimentBatch':
+        """
+        Pack `analyze` dicts into columns.
+
+        Args:
+            results: Results of `EnhancedSentimentAnalyzer.analyze`
+            emotions: Emotion names in lexicon order
+                (`analyzer.emotion_matcher.categories`)
+        """
+        emotions = tuple(emotions)
+        columns = cls._float_columns(results)
+
+        counts = np.zeros((len(results), len(emotions)), dtype=np.int32)
+        codes = {label: code for code, label in enumerate(('neutral',) + emotions)}
+        dominant = np.empty(len(results), dtype=np.int8)
+        word_count = np.empty(len(results), dtype=np.int32)
+
+        for i, result in enumerate(results):
+            for j, emotion in enumerate(emotions):
+                counts[i, j] = result['emotions'].get(emotion, 0)
+            dominant[i] = codes[result['dominant_emotion']]
+            word_count[i] = result['word_count']
+
+        columns.update(emotion_counts=counts, dominant_emotion=dominant, word_count=word_count)
+        return cls(columns, emotions)
+
+    @classmethod
+    def concat(cls, batches: Sequence['EnhancedSentimentBatch']) -> 'EnhancedSentimentBatch':
+        """Join batches end to end; all must use the same emotions."""
+        if not batches:
+            return cls.from_results([])
+        emotions = batches[0].emotions
+        if any(batch.emotions != emotions for batch in batches):
+            raise ValueError("Cannot concatenate batches with different emotions")
+        return cls({
+            name: np.concatenate([batch.columns[name] for batch in batches])
+            for name in batches[0].columns
+        }, emotions)
+
+    def _row(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn one row of column values into a result dict, in `analyze`'s key order."""
+        row = {name: values[name] for name in SentimentBatch.FLOAT_FIELDS}
+        row['emotions'] = {emotion: count for emotion, count
+                           in zip(self.emotions, values['emotion_counts']) if count}
+        row['dominant_emotion'] = self.labels[values['dominant_emotion']]
+        row['confidence'] = values['confidence']
+        row['word_count'] = values['word_count']
+        return row
+
+    def to_frame(self) -> pd.DataFrame:
+        """Results as a DataFrame, with one count column per emotion."""
+        df = super().to_frame()
+        counts = self.columns['emotion_counts']
+        for j, emotion in enumerate(self.emotions):
+            df[f'emotion_{emotion}'] = counts[:, j]
+        df['dominant_emotion'] = pd.Categorical.from_codes(
+            self.columns['dominant_emotion'], categories=list(self.labels)
+        )
+        df['word_count'] = self.columns['word_count']
+        return df
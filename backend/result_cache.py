@@ -0,0 +1,145 @@
+"""Memoization cache for analysis results keyed by content hash."""
+import hashlib
+import json
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so that whitespace-only edits map to the same key."""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def make_key(text: str, version: str, normalize: bool = True) -> str:
+    """
+    Build a cache key from the text and the analyzer version.
+
+    Args:
+        text: The analyzed text
+        version: Identifier of everything else the result depends on
+        normalize: Normalize the text first; turn off for results that
+            depend on its exact characters, like quoted excerpts
+    """
+    if normalize:
+        text = normalize_text(text)
+    digest = hashlib.sha256()
+    digest.update(version.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(text.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Bounded in-memory LRU cache with an optional shared SQLite tier."""
+
+    def __init__(self, max_entries: int = 10000, db_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of results kept in memory
+            db_path: Optional SQLite file shared between processes
+        """
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if db_path:
+            self._ensure_table()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get this thread's connection to the SQLite tier."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _ensure_table(self):
+        """Create the on-disk table if it doesn't exist."""
+        conn = self._get_connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached result, or None on a miss."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(result)
+
+        if self.db_path:
+            row = self._get_connection().execute(
+                "SELECT result FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, row[0])
+                return json.loads(row[0])
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: Any):
+        """Store a result in memory and, if configured, on disk."""
+        serialized = json.dumps(result)
+        with self._lock:
+            self._remember(key, serialized)
+
+        if self.db_path:
+            conn = self._get_connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, result) VALUES (?, ?)",
+                (key, serialized)
+            )
+            conn.commit()
+
+    def _remember(self, key: str, serialized: str):
+        """Insert into the LRU layer, evicting the oldest entries. Caller holds the lock."""
+        self._entries[key] = serialized
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop the in-memory entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters for sizing the cache."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0
+            }
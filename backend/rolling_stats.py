@@ -0,0 +1,345 @@
+"""Incremental rolling sentiment statistics for a single user's timeline."""
+import json
+import math
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+NANOS_PER_DAY = 86_400 * 10**9
+
+
+class _RollingMean:
+    """Windowed sum with Kahan compensation, updated the way pandas' roll_mean is."""
+
+    def __init__(self):
+        """Start with an empty window."""
+        self.nobs = 0
+        self.sum = 0.0
+        self.neg_count = 0
+        self.add_compensation = 0.0
+        self.remove_compensation = 0.0
+        self.same_count = 0
+        self.prev_value = math.nan
+
+    def add(self, value: float):
+        """Add a value entering the window; NaNs are skipped."""
+        if value != value:
+            return
+        self.nobs += 1
+        y = value - self.add_compensation
+        t = self.sum + y
+        self.add_compensation = t - self.sum - y
+        self.sum = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_count += 1
+        self.same_count = self.same_count + 1 if value == self.prev_value else 1
+        self.prev_value = value
+
+    def remove(self, value: float):
+        """Remove a value leaving the window; NaNs are skipped."""
+        if value != value:
+            return
+        self.nobs -= 1
+        y = -value - self.remove_compensation
+        t = self.sum + y
+        self.remove_compensation = t - self.sum - y
+        self.sum = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_count -= 1
+
+    def value(self, min_periods: int = 1) -> float:
+        """Mean of the window, or NaN with fewer than `min_periods` values."""
+        if self.nobs < max(min_periods, 1):
+            return math.nan
+        result = self.sum / self.nobs
+        # Same clean-ups as pandas for runs of equal values and sign drift
+        if self.same_count >= self.nobs:
+            return self.prev_value
+        if self.neg_count == 0 and result < 0:
+            return 0.0
+        if self.neg_count == self.nobs and result > 0:
+            return 0.0
+        return result
+
+
+class _RollingVariance:
+    """Welford running variance with Kahan compensation, following pandas' roll_var."""
+
+    def __init__(self):
+        """Start with an empty window."""
+        self.nobs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.add_compensation = 0.0
+        self.remove_compensation = 0.0
+        self.same_count = 0
+        self.prev_value = math.nan
+
+    def add(self, value: float):
+        """Add a value entering the window; NaNs are skipped."""
+        if value != value:
+            return
+        if self.nobs and self.same_count >= self.nobs:
+            # Only one distinct value is left: drop the accumulated rounding error
+            self.mean = self.prev_value
+            self.ssqdm = 0.0
+            self.add_compensation = self.remove_compensation = 0.0
+        self.nobs += 1
+        self.same_count = self.same_count + 1 if value == self.prev_value else 1
+        self.prev_value = value
+
+        prev_mean = self.mean - self.add_compensation
+        y = value - self.add_compensation
+        t = y - self.mean
+        self.add_compensation = t + self.mean - y
+        self.mean = self.mean + t / self.nobs
+        self.ssqdm = self.ssqdm + (value - prev_mean) * (value - self.mean)
+
+    def remove(self, value: float):
+        """Remove a value leaving the window; NaNs are skipped."""
+        if value != value:
+            return
+        self.nobs -= 1
+        if not self.nobs:
+            self.mean = 0.0
+            self.ssqdm = 0.0
+            return
+        prev_mean = self.mean - self.remove_compensation
+        y = value - self.remove_compensation
+        t = y - self.mean
+        self.remove_compensation = t + self.mean - y
+        self.mean = self.mean - t / self.nobs
+        self.ssqdm = self.ssqdm - (value - prev_mean) * (value - self.mean)
+
+    def std(self, min_periods: int = 2, ddof: int = 1) -> float:
+        """Sample std of the window, or NaN with fewer than `min_periods` values."""
+        if self.nobs < max(min_periods, 1) or self.nobs <= ddof:
+            return math.nan
+        if self.nobs == 1 or self.same_count >= self.nobs:
+            return 0.0
+        variance = self.ssqdm / (self.nobs - ddof)
+        return math.sqrt(variance) if variance >= 0 else 0.0
+
+
+class RollingSentimentStats:
+    """
+    Rolling statistics over one user's timeline, updated one entry at a time.
+
+    Gives the same per-entry values as the analyzers' pandas helpers
+    (`calculate_rolling_average`, `detect_volatility`, `detect_mood_shifts`)
+    in O(1) amortized time per new entry instead of recomputing the whole
+    timeline: the 7-day average keeps a deque of the entries inside the time
+    window and the volatility std a ring buffer of the last 7 valences. Both
+    apply pandas' add/remove arithmetic: averages, shifts and volatility
+    flags agree exactly, the std itself to within a few ulps after runs of
+    identical valences.
+
+    Entries must arrive in timestamp order. The state is small and can be
+    saved with `save`/`to_dict` and picked up again with `load`/`from_dict`.
+    """
+
+    # Bump whenever the saved state layout changes
+    VERSION = '1.0'
+
+    def __init__(self, window_days: int = 7, volatility_window: int = 7,
+                 volatility_threshold: float = 0.5, shift_threshold: float = 0.3):
+        """
+        Args:
+            window_days: Days in the rolling average window
+            volatility_window: Entries in the rolling std window
+            volatility_threshold: Std above which an entry is volatile
+            shift_threshold: Valence change that counts as a mood shift
+        """
+        self.window_days = window_days
+        self.volatility_window = volatility_window
+        self.volatility_threshold = volatility_threshold
+        self.shift_threshold = shift_threshold
+
+        self.count = 0
+        self.last_timestamp: Optional[int] = None
+        self.last_valence = math.nan
+        self._day_entries: deque = deque()
+        self._day_mean = _RollingMean()
+        self._recent: deque = deque(maxlen=volatility_window)
+        self._recent_var = _RollingVariance()
+
+    def update(self, timestamp, valence: float) -> Dict[str, Any]:
+        """
+        Add the next entry and return its rolling statistics.
+
+        Returns:
+            Dictionary with 'rolling_avg', 'rolling_std', 'volatile',
+            'shift' and 'shift_magnitude' for this entry
+        """
+        ts = pd.Timestamp(timestamp).value
+        if self.last_timestamp is not None and ts < self.last_timestamp:
+            raise ValueError(
+                f"Entries must be added in timestamp order "
+                f"({pd.Timestamp(ts)} is before {pd.Timestamp(self.last_timestamp)})"
+            )
+        valence = float(valence)
+
+        # 7-day window covers (ts - 7 days, ts]
+        cutoff = ts - self.window_days * NANOS_PER_DAY
+        evicted = []
+        while self._day_entries and self._day_entries[0][0] <= cutoff:
+            evicted.append(self._day_entries.popleft()[1])
+        if not self._day_entries:
+            # pandas starts from scratch once no earlier entry is left
+            self._day_mean = _RollingMean()
+        else:
+            for old in evicted:
+                self._day_mean.remove(old)
+        self._day_entries.append((ts, valence))
+        self._day_mean.add(valence)
+
+        if len(self._recent) == self.volatility_window:
+            self._recent_var.remove(self._recent[0])
+        self._recent.append(valence)
+        self._recent_var.add(valence)
+
+        rolling_std = self._recent_var.std()
+        shift_magnitude = abs(valence - self.last_valence)
+
+        self.count += 1
+        self.last_timestamp = ts
+        self.last_valence = valence
+
+        return {
+            'rolling_avg': self._day_mean.value(),
+            'rolling_std': rolling_std,
+            'volatile': rolling_std > self.volatility_threshold,
+            'shift': shift_magnitude > self.shift_threshold,
+            'shift_magnitude': shift_magnitude
+        }
+
+    def update_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add every entry of a DataFrame in order.
+
+        Args:
+            df: DataFrame with 'timestamp' and 'valence' columns, sorted by timestamp
+
+        Returns:
+            Copy of `df` with the statistics from `update` as extra columns
+        """
+        df = df.copy()
+        rows = [self.update(ts, v) for ts, v in zip(df['timestamp'], df['valence'])]
+        for column in ('rolling_avg', 'rolling_std', 'volatile', 'shift', 'shift_magnitude'):
+            df[column] = [row[column] for row in rows]
+        return df
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable snapshot of the full state."""
+        return {
+            'version': self.VERSION,
+            'settings': {
+                'window_days': self.window_days,
+                'volatility_window': self.volatility_window,
+                'volatility_threshold': self.volatility_threshold,
+                'shift_threshold': self.shift_threshold
+            },
+            'count': self.count,
+            'last_timestamp': self.last_timestamp,
+            'last_valence': self.last_valence,
+            'day_entries': [list(item) for item in self._day_entries],
+            'day_mean': vars(self._day_mean),
+            'recent': list(self._recent),
+            'recent_var': vars(self._recent_var)
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'RollingSentimentStats':
+        """Rebuild stats from `to_dict` output."""
+        if state.get('version') != cls.VERSION:
+            raise ValueError(f"Unsupported rolling stats version: {state.get('version')}")
+
+        stats = cls(**state['settings'])
+        stats.count = state['count']
+        stats.last_timestamp = state['last_timestamp']
+        stats.last_valence = state['last_valence']
+        stats._day_entries.extend((ts, valence) for ts, valence in state['day_entries'])
+        vars(stats._day_mean).update(state['day_mean'])
+        stats._recent.extend(state['recent'])
+        vars(stats._recent_var).update(state['recent_var'])
+        return stats
+
+    def save(self, path: str):
+        """Write the state to a JSON file atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'RollingSentimentStats':
+        """Read stats saved with `save`."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+class TimelineStats:
+    """
+    Each user's RollingSentimentStats, kept between page loads.
+
+    The dashboards fetch a user's scored entries on every page load. Only
+    the entries added since the last load are fed to the user's stats; if
+    earlier entries changed (a partial analysis replaced by the full one,
+    a re-score, a deletion), the user's stats are rebuilt from scratch.
+    """
+
+    # Users whose stats are kept, least recently seen dropped first
+    MAX_USERS = 256
+
+    def __init__(self, max_users: int = MAX_USERS):
+        """
+        Args:
+            max_users: Number of users whose stats are kept
+        """
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._users: 'OrderedDict[Hashable, Tuple[RollingSentimentStats, pd.DataFrame]]' = OrderedDict()
+
+    def frame(self, user_id: Hashable, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        A user's entries with their rolling statistics.
+
+        Args:
+            user_id: The user the entries belong to
+            df: All the user's scored entries, with 'timestamp' and
+                'valence' columns, sorted by timestamp
+
+        Returns:
+            `df` with the columns from `RollingSentimentStats.update_frame`;
+            shared between calls, so don't modify it
+        """
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is not None and self._extends(cached[1], df):
+                stats, done = cached
+                if len(df) > len(done):
+                    done = pd.concat([done, stats.update_frame(df.iloc[len(done):])],
+                                     ignore_index=True)
+            else:
+                stats = RollingSentimentStats()
+                done = stats.update_frame(df).reset_index(drop=True)
+
+            self._users[user_id] = (stats, done)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+            return done
+
+    @staticmethod
+    def _extends(done: pd.DataFrame, df: pd.DataFrame) -> bool:
+        """Whether `df` is the entries in `done` followed by new ones."""
+        if len(df) < len(done):
+            return False
+        head = df.iloc[:len(done)]
+        return all(
+            head[column].reset_index(drop=True).equals(done[column])
+            for column in ('timestamp', 'valence')
+        )
@@ -0,0 +1,155 @@
+"""Sentence-level VADER and TextBlob scoring with per-sentence caching."""
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT, SentiText, SentimentIntensityAnalyzer, allcap_differential
+)
+
+from lexicon_snapshot import vader_analyzer
+from polarity import TextBlobPolarity, average
+from result_cache import ResultCache, make_key
+from text_processing import split_sentences
+
+
+class SentenceScorer:
+    """
+    Score text sentence by sentence, caching each sentence's raw scores.
+
+    For every sentence the VADER token valences and polarity assessments
+    (TextBlob's by default) are cached under a hash of the sentence and
+    the few neighbouring words VADER's rules look at. Scoring a whole entry concatenates them and
+    applies the entry-wide steps (the "but" rule, punctuation emphasis and
+    the ALL CAPS differential) once, so an edited entry only re-scores the
+    changed sentences and their immediate neighbours.
+
+    VADER scores match whole-text scoring exactly. TextBlob carries a
+    pending negation or modifier across a sentence break, which is lost
+    here; this only matters for sentences ending in one ("... or not.").
+    """
+
+    # Bump whenever the cached per-sentence data changes
+    VERSION = '1.0'
+
+    # Words either side of a token that VADER's negation, booster and
+    # idiom rules can look at
+    LEFT_CONTEXT = 3
+    RIGHT_CONTEXT = 2
+
+    def __init__(self, vader: Optional[SentimentIntensityAnalyzer] = None,
+                 cache: Optional[ResultCache] = None, max_sentences: int = 50000,
+                 polarity=None):
+        """
+        Args:
+            vader: VADER analyzer to reuse (a new one is created if omitted)
+            cache: Cache for per-sentence scores (in-memory by default)
+            max_sentences: Size of the default in-memory cache
+            polarity: Polarity backend from `polarity` (TextBlob by default)
+        """
+        self.vader = vader or vader_analyzer()
+        self.polarity = polarity or TextBlobPolarity()
+        self.cache = cache if cache is not None else ResultCache(max_entries=max_sentences)
+        # VADER replaces emojis one character at a time, so only
+        # single-character entries can ever match
+        self.emoji_chars = frozenset(key for key in self.vader.emojis if len(key) == 1)
+
+    @property
+    def version(self) -> str:
+        """Identifier of the cached sentence data, used in cache keys."""
+        return f'{type(self).__name__}/{self.VERSION}+{self.polarity.version}'
+
+    def score(self, text: str) -> Tuple[Dict[str, float], float, float]:
+        """
+        Score text from its (possibly cached) sentences.
+
+        Returns:
+            (VADER scores shaped like `polarity_scores`, polarity,
+            subjectivity)
+        """
+        sentences = split_sentences(text)
+        replaced = [self._replace_emojis(sentence) for sentence in sentences]
+        sentence_words = [
+            [SentiText._strip_punc_if_word(token) for token in sentence.split()]
+            for sentence in replaced
+        ]
+
+        words: List[str] = [word for chunk in sentence_words for word in chunk]
+        cap_diff = allcap_differential(words)
+
+        sentiments: List[float] = []
+        polarities: List[float] = []
+        subjectivities: List[float] = []
+        position = 0
+
+        for sentence, chunk_words in zip(sentences, sentence_words):
+            end = position + len(chunk_words)
+            left = words[max(0, position - self.LEFT_CONTEXT):position]
+            right = words[end:end + self.RIGHT_CONTEXT]
+            chunk = self._score_sentence(sentence, chunk_words, left, right, cap_diff)
+            sentiments.extend(chunk['sentiments'])
+            polarities.extend(chunk['polarities'])
+            subjectivities.extend(chunk['subjectivities'])
+            position = end
+
+        sentiments = self.vader._but_check(words, sentiments)
+        # score_valence only reads the text to count '!' and '?'
+        vader_scores = self.vader.score_valence(sentiments, ' '.join(replaced))
+
+        return vader_scores, average(polarities), average(subjectivities)
+
+    def _score_sentence(self, sentence: str, words: List[str], left: List[str],
+                        right: List[str], cap_diff: bool) -> Dict[str, list]:
+        """Get a sentence's raw scores from the cache, computing them on a miss."""
+        context = '\0'.join([self.version, str(cap_diff), ' '.join(left), ' '.join(right)])
+        key = make_key(sentence, context)
+        chunk = self.cache.get(key)
+        if chunk is None:
+            chunk = self._analyze_sentence(sentence, words, left, right, cap_diff)
+            self.cache.put(key, chunk)
+        return chunk
+
+    def _analyze_sentence(self, sentence: str, words: List[str], left: List[str],
+                          right: List[str], cap_diff: bool) -> Dict[str, list]:
+        """Run VADER's per-word pass and the polarity assessments on one sentence."""
+        window = left + words + right
+        # sentiment_valence only reads these two attributes; the caps flag
+        # comes from the whole entry, not just this window
+        sentitext = SimpleNamespace(words_and_emoticons=window, is_cap_diff=cap_diff)
+
+        sentiments: List[float] = []
+        for i in range(len(left), len(left) + len(words)):
+            item = window[i]
+            lowered = item.lower()
+            if lowered in BOOSTER_DICT or (
+                i < len(window) - 1 and lowered == 'kind' and window[i + 1].lower() == 'of'
+            ):
+                sentiments.append(0)
+                continue
+            # sentiment_valence only appends this token's valence to the list
+            sentiments.append(self.vader.sentiment_valence(0, sentitext, item, i, [])[-1])
+
+        assessments = self.polarity.assessments(sentence)
+
+        return {
+            'sentiments': sentiments,
+            'polarities': [polarity for polarity, _ in assessments],
+            'subjectivities': [subjectivity for _, subjectivity in assessments]
+        }
+
+    def _replace_emojis(self, text: str) -> str:
+        """Swap emojis for their descriptions exactly like `polarity_scores`."""
+        if self.emoji_chars.isdisjoint(text):
+            return text.strip()
+
+        parts = []
+        prev_space = True
+        for char in text:
+            if char in self.emoji_chars:
+                if not prev_space:
+                    parts.append(' ')
+                parts.append(self.vader.emojis[char])
+                prev_space = False
+            else:
+                parts.append(char)
+                prev_space = char == ' '
+        return ''.join(parts).strip()
@@ -1,16 +1,64 @@
 """Sentiment analysis using TextBlob and VADER."""
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from functools import partial
 import pandas as pd
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from batch import map_in_pool
+from lexicon_snapshot import vader_analyzer
+from polarity import make_polarity_backend
+from result_batch import SentimentBatch
+from result_cache import ResultCache, make_key
+from sentence_scoring import SentenceScorer
 
 
 class SentimentAnalyzer:
     """Combined sentiment analysis using TextBlob and VADER."""
     
-    def __init__(self):
-        """Initialize sentiment analyzers."""
-        self.vader = SentimentIntensityAnalyzer()
+    # Bump whenever scoring changes so cached and stored results are invalidated
+    VERSION = '1.0'
+    
+    VADER_ENGINES = ('vader', 'numpy')
+    
+    def __init__(self, cache: Optional[ResultCache] = None, vader_engine: str = 'vader',
+                 sentence_cache: Optional[ResultCache] = None,
+                 polarity_backend: str = 'textblob'):
+        """
+        Initialize sentiment analyzers.
+        
+        Args:
+            cache: Optional result cache shared across calls
+            vader_engine: 'vader' for the reference implementation, or
+                'numpy' to score VADER in vectorized batches
+            sentence_cache: Optional cache of per-sentence scores used by
+                `analyze_incremental` (in-memory by default)
+            polarity_backend: 'textblob', or 'lexicon' for the faster
+                TextBlob-compatible lexicon table (see `polarity`)
+        """
+        if vader_engine not in self.VADER_ENGINES:
+            raise ValueError(f"Unknown VADER engine: {vader_engine}")
+        
+        self.vader = vader_analyzer()
+        self.polarity_backend = polarity_backend
+        self.polarity = make_polarity_backend(polarity_backend)
+        self.cache = cache
+        self.vader_engine = vader_engine
+        self.vectorized_vader = None
+        if vader_engine == 'numpy':
+            from vader_numpy import VectorizedVader
+            self.vectorized_vader = VectorizedVader(self.vader)
+        self.sentence_scorer = SentenceScorer(self.vader, sentence_cache, polarity=self.polarity)
+    
+    @property
+    def version(self) -> str:
+        """Identifier of the scoring logic, used in cache keys."""
+        version = f'{type(self).__name__}/{self.VERSION}'
+        if self.polarity_backend != 'textblob':
+            version += f'+{self.polarity.version}'
+        return version
+    
+    def warm_up(self):
+        """Run a throwaway analysis so lazy lexicon loading happens up front."""
+        self._analyze("I feel really good today, though a little worried.")
     
     def analyze(self, text: str) -> Dict[str, float]:
         """
@@ -19,13 +67,57 @@ class SentimentAnalyzer:
         Returns:
             Dictionary with sentiment scores and combined valence.
         """
-        # TextBlob analysis
-        blob = TextBlob(text)
-        textblob_polarity = blob.sentiment.polarity  # -1 to 1
-        textblob_subjectivity = blob.sentiment.subjectivity  # 0 to 1
+        if self.cache is None:
+            return self._analyze(text)
+        
+        key = make_key(text, self.version)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._analyze(text)
+            self.cache.put(key, result)
+        return result
+    
+    def analyze_incremental(self, text: str) -> Dict[str, float]:
+        """
+        Analyze text from cached per-sentence scores.
+        
+        Intended for long or repeatedly edited entries: only sentences not
+        seen before are scored. Results match `analyze` except where VADER
+        or TextBlob context would cross a sentence boundary.
         
+        Returns:
+            Dictionary shaped like `analyze`.
+        """
+        vader_scores, polarity, subjectivity = self.sentence_scorer.score(text)
+        return self._build_result(vader_scores, polarity, subjectivity)
+    
+    def _analyze(self, text: str) -> Dict[str, float]:
+        """Score text without consulting the cache."""
+        if self.vectorized_vader is not None:
+            return self._analyze_many([text])[0]
+        return self._combine(text, self.vader.polarity_scores(text))
+    
+    def _analyze_many(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Score a list of texts, running VADER over the whole list at once if enabled."""
+        if self.vectorized_vader is not None:
+            vader_scores = self.vectorized_vader.polarity_scores_batch(texts)
+        else:
+            vader_scores = [self.vader.polarity_scores(text) for text in texts]
+        return [self._combine(text, scores) for text, scores in zip(texts, vader_scores)]
+    
+    def _analyze_packed(self, texts: List[str]) -> List[SentimentBatch]:
+        """Score a chunk of texts into a single batch, so workers send back columns."""
+        return [SentimentBatch.from_results(self._analyze_many(texts))]
+    
+    def _combine(self, text: str, vader_scores: Dict[str, float]) -> Dict[str, float]:
+        """Add polarity backend scores to VADER's and build the result."""
+        polarity, subjectivity = self.polarity.scores(text)
+        return self._build_result(vader_scores, polarity, subjectivity)
+    
+    def _build_result(self, vader_scores: Dict[str, float], textblob_polarity: float,
+                      textblob_subjectivity: float) -> Dict[str, float]:
+        """Combine VADER and TextBlob scores (polarity -1 to 1, subjectivity 0 to 1)."""
         # VADER analysis
-        vader_scores = self.vader.polarity_scores(text)
         vader_compound = vader_scores['compound']  # -1 to 1
         
         # Combined valence (weighted average)
@@ -44,6 +136,46 @@ class SentimentAnalyzer:
             'valence': combined_valence  # Combined weighted score
         }
     
+    def analyze_batch(self, texts: Sequence[str], workers: Optional[int] = None,
+                      chunksize: int = 256,
+                      compact: bool = False) -> Union[List[Dict[str, float]], SentimentBatch]:
+        """
+        Analyze many texts, spreading the work over a process pool.
+        
+        Args:
+            texts: Texts to analyze
+            workers: Number of worker processes (defaults to CPU count)
+            chunksize: Number of texts sent to a worker per task
+            compact: Return a `SentimentBatch` (one array per field) instead
+                of a list of dicts; much smaller for large batches
+        
+        Returns:
+            One result per text, in input order, shaped like `analyze`.
+        """
+        factory = partial(SentimentAnalyzer, vader_engine=self.vader_engine,
+                          polarity_backend=self.polarity_backend)
+        
+        if self.cache is None:
+            if compact:
+                return SentimentBatch.concat(map_in_pool(
+                    factory, '_analyze_packed', [(text,) for text in texts],
+                    workers=workers, chunksize=chunksize, local=self, batched=True
+                ))
+            return map_in_pool(factory, '_analyze_many', [(text,) for text in texts],
+                               workers=workers, chunksize=chunksize, local=self, batched=True)
+        
+        keys = [make_key(text, self.version) for text in texts]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        scored = map_in_pool(factory, '_analyze_many', [(texts[i],) for i in missing],
+                             workers=workers, chunksize=chunksize, local=self, batched=True)
+        for i, result in zip(missing, scored):
+            self.cache.put(keys[i], result)
+            results[i] = result
+        
+        return SentimentBatch.from_results(results) if compact else results
+    
     def calculate_rolling_average(self, df: pd.DataFrame, window: int = 7) -> pd.DataFrame:
         """
         Calculate rolling average of sentiment scores.
@@ -0,0 +1,101 @@
+"""Process-wide registry of shared, pre-warmed analyzer instances."""
+import gc
+import sys
+import threading
+import time
+import types
+from typing import Any, Dict, List, Optional, Tuple
+
+_lock = threading.Lock()
+_instances: Dict[Tuple, Any] = {}
+_build_info: Dict[Tuple, Dict[str, float]] = {}
+
+# Objects reachable from an instance that belong to the interpreter rather
+# than to the instance, and so shouldn't count towards its memory.
+_SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+
+
+def _make_key(cls: type, args: Tuple, kwargs: Dict) -> Tuple:
+    """Build the registry key for a class and its constructor arguments."""
+    return (cls, args, tuple(sorted(kwargs.items())))
+
+
+def get_shared(cls: type, *args, **kwargs) -> Any:
+    """
+    Get the process-wide instance of `cls`, creating and warming it once.
+
+    Instances are keyed by class and constructor arguments. If the class
+    defines `warm_up()`, it is called before the instance is published so
+    that the first real request doesn't pay for lazy loading.
+    """
+    key = _make_key(cls, args, kwargs)
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        instance = _instances.get(key)
+        if instance is None:
+            start = time.perf_counter()
+            instance = cls(*args, **kwargs)
+            built = time.perf_counter()
+            if hasattr(instance, 'warm_up'):
+                instance.warm_up()
+            warmed = time.perf_counter()
+
+            _build_info[key] = {
+                'construct_ms': (built - start) * 1000,
+                'warm_up_ms': (warmed - built) * 1000
+            }
+            _instances[key] = instance
+
+    return instance
+
+
+def deep_sizeof(obj: Any) -> int:
+    """Approximate the memory held by an object and everything it references."""
+    seen = set()
+    pending = [obj]
+    total = 0
+
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, _SHARED_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        pending.extend(gc.get_referents(current))
+
+    return total
+
+
+def registry_stats() -> Dict[str, Any]:
+    """Report how many shared instances exist and how much memory they hold."""
+    with _lock:
+        items = list(_instances.items())
+        info = dict(_build_info)
+
+    instances: List[Dict[str, Any]] = []
+    for key, instance in items:
+        instances.append({
+            'class': key[0].__name__,
+            'bytes': deep_sizeof(instance),
+            **info.get(key, {})
+        })
+
+    return {
+        'count': len(instances),
+        'total_bytes': sum(entry['bytes'] for entry in instances),
+        'instances': instances
+    }
+
+
+def format_registry_stats(stats: Optional[Dict[str, Any]] = None) -> str:
+    """Render `registry_stats()` as a few lines for the server log."""
+    stats = stats if stats is not None else registry_stats()
+    lines = [f"{stats['count']} shared instances, {stats['total_bytes'] / 1e6:.2f} MB"]
+    for entry in stats['instances']:
+        lines.append(f"  {entry['class']}: {entry['bytes'] / 1e6:.2f} MB "
+                     f"(built in {entry.get('construct_ms', 0.0):.0f} ms, "
+                     f"warmed up in {entry.get('warm_up_ms', 0.0):.0f} ms)")
+    return '\n'.join(lines)
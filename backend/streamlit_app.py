@@ -4,6 +4,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 import os
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -16,6 +17,11 @@ from visualization import EmotionalTimeline
 from summary_generator import WeeklySummaryGenerator
 from utils import get_week_start, get_week_range
 from auth import verify_auth_token
+from shared_instances import format_registry_stats, get_shared
+from background_analysis import BackgroundAnalyzer
+from budgeted_analysis import BudgetedAnalyzer
+from pattern_packs import reload_packs
+from rolling_stats import TimelineStats
 
 st.set_page_config(
     page_title="Mirror - AI Journal",
@@ -152,13 +158,69 @@ if 'user_name' not in st.session_state:
 if 'db' not in st.session_state:
     st.session_state.db = SupabaseDatabase()
 if 'sentiment_analyzer' not in st.session_state:
-    st.session_state.sentiment_analyzer = EnhancedSentimentAnalyzer()
+    st.session_state.sentiment_analyzer = get_shared(EnhancedSentimentAnalyzer)
 if 'bias_detector' not in st.session_state:
-    st.session_state.bias_detector = EnhancedBiasDetector()
+    st.session_state.bias_detector = get_shared(EnhancedBiasDetector)
+if 'background_analyzer' not in st.session_state:
+    st.session_state.background_analyzer = get_shared(
+        BackgroundAnalyzer,
+        st.session_state.sentiment_analyzer,
+        st.session_state.bias_detector,
+        # Used when entries arrive faster than the workers finish them: a
+        # quick partial score lands first, the full one overwrites it
+        budgeted_analyzer=get_shared(
+            BudgetedAnalyzer,
+            budget_ms=float(os.getenv('ANALYSIS_BUDGET_MS', '500')),
+            sentiment_analyzer=st.session_state.sentiment_analyzer,
+            bias_detector=st.session_state.bias_detector
+        )
+    )
+if 'awaiting_analysis' not in st.session_state:
+    # Entries saved in this session whose analysis hasn't been reported yet
+    st.session_state.awaiting_analysis = set()
 if 'visualizer' not in st.session_state:
-    st.session_state.visualizer = EmotionalTimeline()
+    st.session_state.visualizer = get_shared(EmotionalTimeline)
+if 'timeline_stats' not in st.session_state:
+    st.session_state.timeline_stats = get_shared(TimelineStats)
 if 'summary_generator' not in st.session_state:
-    st.session_state.summary_generator = WeeklySummaryGenerator(use_ai=False)
+    st.session_state.summary_generator = get_shared(WeeklySummaryGenerator, use_ai=False)
+
+
+@st.cache_resource
+def log_shared_instances():
+    """Log the shared instances' count and memory once per process, after startup."""
+    print(format_registry_stats())
+
+
+log_shared_instances()
+
+# Pick up edited bias pattern packs; unchanged ones cost a stat per rerun
+reload_packs()
+
+
+# How often the dashboard refreshes while an entry is being analyzed
+ANALYSIS_POLL_SECONDS = 1.0
+
+
+def show_analysis_status():
+    """Show entries still being analyzed and report the ones that just finished."""
+    awaiting = st.session_state.awaiting_analysis
+    background = st.session_state.background_analyzer
+
+    for entry_id, outcome in background.collect(awaiting).items():
+        awaiting.discard(entry_id)
+        if 'error' in outcome:
+            st.error("⚠️ Your entry is saved, but analyzing it failed. It will be analyzed again later.")
+        elif outcome['partial']:
+            st.success(f"✅ Entry analyzed! Quick analysis found {outcome['biases']} "
+                       "cognitive pattern(s); the full analysis is finishing in the background.")
+        else:
+            st.success(f"✅ Entry analyzed! Detected {outcome['biases']} cognitive pattern(s).")
+
+    pending = background.pending(awaiting)
+    if pending:
+        st.info(f"⏳ Entry saved. Analyzing {len(pending)} entr{'y' if len(pending) == 1 else 'ies'}"
+                "… your insights will update when the scores arrive.")
 
 
 def check_auth_token():
@@ -298,34 +360,22 @@ def main_journal_interface():
         submit = st.button("💾 Save & Analyze", type="primary", use_container_width=True)
 
         if submit and entry_text.strip():
-            with st.spinner("Analyzing your reflection..."):
-                sentiment_result = st.session_state.sentiment_analyzer.analyze(entry_text)
-
-                entry_id = st.session_state.db.add_journal_entry(
-                    user_id=st.session_state.user_id,
-                    entry_text=entry_text,
-                    sentiment_score=sentiment_result['sentiment_score'],
-                    valence=sentiment_result['valence']
-                )
-
-                biases = st.session_state.bias_detector.detect_all(
-                    entry_text,
-                    sentiment_result['valence']
-                )
-
-                for bias in biases:
-                    st.session_state.db.add_bias(
-                        entry_id=entry_id,
-                        bias_type=bias['type'],
-                        detected_pattern=bias['pattern'],
-                        explanation=bias['explanation']
-                    )
-
-                st.success(f"✅ Entry saved! Detected {len(biases)} cognitive pattern(s).")
-                st.rerun()
+            # Save now with empty scores; the analysis runs in the background
+            # and fills them in (see BackgroundAnalyzer)
+            entry_id = st.session_state.db.add_journal_entry(
+                user_id=st.session_state.user_id,
+                entry_text=entry_text,
+                sentiment_score=None,
+                valence=None
+            )
+            st.session_state.background_analyzer.submit(st.session_state.db, entry_id, entry_text)
+            st.session_state.awaiting_analysis.add(entry_id)
+            st.rerun()
         elif submit:
             st.warning("⚠️ Please write something before submitting.")
 
+        show_analysis_status()
+
     with col2:
         st.markdown("""<h2 style="font-size: 1.5rem; font-weight: 700; color: #f1f5f9; margin-bottom: 1rem;">📊 Insights</h2>""", unsafe_allow_html=True)
 
@@ -378,7 +428,9 @@ def main_journal_interface():
     if not sentiment_data.empty and len(sentiment_data) > 0:
         try:
             st.markdown(f"""<p style="color: #94a3b8; font-size: 0.9rem; margin-bottom: 1rem;">{len(sentiment_data)} entries tracked</p>""", unsafe_allow_html=True)
-            fig = st.session_state.visualizer.create_timeline(sentiment_data)
+            # Rolling statistics are only computed for entries new since the last load
+            timeline = st.session_state.timeline_stats.frame(st.session_state.user_id, sentiment_data)
+            fig = st.session_state.visualizer.create_timeline(timeline)
             st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
         except Exception as e:
             st.error(f"Error creating timeline: {str(e)}")
@@ -424,6 +476,11 @@ def main_journal_interface():
     else:
         st.info("📉 Pattern tracking will appear after your first entry")
 
+    # Poll until this session's entries are scored, then show the new numbers
+    if st.session_state.background_analyzer.pending(st.session_state.awaiting_analysis):
+        time.sleep(ANALYSIS_POLL_SECONDS)
+        st.rerun()
+
 
 def main():
     """Main entry point."""
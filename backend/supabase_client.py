@@ -1,6 +1,6 @@
 """Supabase database operations for Mirror application."""
 import os
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, Iterator, List, Optional
 from datetime import datetime
 import pandas as pd
 from supabase import create_client, Client
@@ -81,16 +81,22 @@ class SupabaseDatabase:
         self,
         user_id: str,
         entry_text: str,
-        sentiment_score: float,
-        valence: float
+        sentiment_score: Optional[float],
+        valence: Optional[float],
+        analyzer_version: Optional[str] = None
     ) -> str:
-        """Add a new journal entry and return entry_id."""
+        """
+        Add a new journal entry, stamped with the analysis version, and return entry_id.
+
+        Scores may be None for an entry that is analyzed afterwards.
+        """
         try:
             response = self.client.table('journal_entries').insert({
                 'user_id': user_id,
                 'entry_text': entry_text,
                 'sentiment_score': sentiment_score,
-                'valence': valence
+                'valence': valence,
+                'analyzer_version': analyzer_version
             }).execute()
 
             if response.data and len(response.data) > 0:
@@ -117,12 +123,119 @@ class SupabaseDatabase:
             print(f"Error fetching entries: {e}")
             return []
 
+    @staticmethod
+    def _filter_entries(query, after_id: Optional[str], current_version: Optional[str]):
+        """Restrict a journal_entries query to ids after `after_id` and, optionally, stale rows."""
+        if after_id:
+            query = query.gt('id', after_id)
+        if current_version is not None:
+            query = query.or_(
+                f'analyzer_version.is.null,analyzer_version.neq."{current_version}"'
+            )
+        return query
+
+    def count_entries(
+        self,
+        after_id: Optional[str] = None,
+        current_version: Optional[str] = None
+    ) -> int:
+        """
+        Count journal entries visible to this client.
+
+        Args:
+            after_id: Only count entries with a larger id
+            current_version: If given, only count entries not stamped with it
+        """
+        try:
+            query = self.client.table('journal_entries')\
+                .select('id', count='exact')\
+                .limit(1)
+
+            response = self._filter_entries(query, after_id, current_version).execute()
+            return response.count or 0
+        except Exception as e:
+            print(f"Error counting entries: {e}")
+            return 0
+
+    def iter_entries(
+        self,
+        chunk_size: int = 500,
+        after_id: Optional[str] = None,
+        current_version: Optional[str] = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Stream journal entries visible to this client in id order.
+
+        Uses keyset pagination on the primary key, so a run can resume from
+        the last id it finished. If `current_version` is given, only entries
+        whose analyzer_version differs from it (including unstamped ones)
+        are returned. Errors propagate so a backfill stops rather than
+        silently skipping rows.
+        """
+        last_id = after_id
+
+        while True:
+            try:
+                query = self.client.table('journal_entries')\
+                    .select('id, user_id, entry_text')\
+                    .order('id')\
+                    .limit(chunk_size)
+
+                rows = self._filter_entries(query, last_id, current_version).execute().data or []
+            except Exception as e:
+                print(f"Error streaming entries: {e}")
+                raise e
+
+            if not rows:
+                return
+
+            yield rows
+            last_id = rows[-1]['id']
+
+    def save_analyses(self, analyses: List[Dict[str, Any]]):
+        """
+        Write re-computed scores and biases for many entries in one transaction.
+
+        Each analysis has 'entry_id', 'sentiment_score', 'valence', the
+        'analyzer_version' and 'pattern_version' that produced it, and a
+        'biases' list of {'type', 'pattern', 'explanation'} dicts, which
+        replace the entry's existing bias rows. The whole chunk is one call
+        to the save_analyses database function, which updates, deletes and
+        inserts in a single transaction.
+        """
+        try:
+            self.client.rpc('save_analyses', {
+                'analyses': [
+                    {
+                        'entry_id': analysis['entry_id'],
+                        'sentiment_score': analysis['sentiment_score'],
+                        'valence': analysis['valence'],
+                        'analyzer_version': analysis['analyzer_version'],
+                        'pattern_version': analysis['pattern_version'],
+                        'biases': [
+                            {
+                                'type': bias['type'],
+                                'pattern': bias['pattern'],
+                                'explanation': bias['explanation']
+                            }
+                            for bias in analysis['biases']
+                        ]
+                    }
+                    for analysis in analyses
+                ]
+            }).execute()
+        except Exception as e:
+            print(f"Error saving analyses: {e}")
+            raise e
+
     def get_entries_dataframe(self, user_id: str) -> pd.DataFrame:
-        """Get entries as pandas DataFrame for analysis."""
+        """Get scored entries as pandas DataFrame for analysis."""
         try:
+            # Entries still being analyzed in the background have no scores yet
             response = self.client.table('journal_entries')\
                 .select('timestamp, sentiment_score, valence')\
                 .eq('user_id', user_id)\
+                .not_.is_('valence', 'null')\
                 .order('timestamp', desc=False)\
                 .execute()
 
@@ -143,15 +256,17 @@ class SupabaseDatabase:
         entry_id: str,
         bias_type: str,
         detected_pattern: str,
-        explanation: str
+        explanation: str,
+        pattern_version: Optional[str] = None
     ) -> str:
-        """Add detected bias and return bias_id."""
+        """Add detected bias, stamped with its pattern set, and return bias_id."""
         try:
             response = self.client.table('biases').insert({
                 'entry_id': entry_id,
                 'bias_type': bias_type,
                 'detected_pattern': detected_pattern,
-                'explanation': explanation
+                'explanation': explanation,
+                'pattern_version': pattern_version
             }).execute()
 
             if response.data and len(response.data) > 0:
@@ -0,0 +1,219 @@
+"""Seeded synthetic journal corpus for benchmarking the analyzers.
+
+Entries are assembled from short journal-like sentences. Each entry gets
+a length (log-uniform, so short entries dominate as in real journals
+while a few run to thousands of words), a bias-trigger density (the
+share of sentences written to trip the bias detectors) and an emotion
+mix (random weights over the emotion lexicons plus neutral filler). The
+same seed always gives the same corpus.
+
+`make_vader_corpus` builds shorter entries salted with the tokens VADER
+has special rules for (boosters, negations, idioms, caps, emoji), for
+checking VADER-compatible scorers, and `make_timeline` a user's
+timestamped valences for the timeline statistics.
+"""
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+from vaderSentiment.vaderSentiment import BOOSTER_DICT, NEGATE, SPECIAL_CASES
+
+# Typical entries' sentences, for the simple benchmark inputs and the VADER corpus
+SAMPLE_SENTENCES = [
+    "I felt really happy after talking to my sister today.",
+    "Work was stressful and I am worried about the deadline.",
+    "Nothing ever goes right for me, everything is terrible.",
+    "I'm grateful for the quiet morning and a good cup of coffee.",
+    "My manager probably thinks I am not good enough.",
+    "The meeting went fine, nothing special happened.",
+    "I am so frustrated that I keep making the same mistakes.",
+    "We went for a long walk and I felt calm and content.",
+    "I know this presentation is going to fail tomorrow.",
+    "Honestly I was surprised by how well the exam went.",
+]
+
+NEUTRAL_SENTENCES = [
+    "I had breakfast and went to work.",
+    "The meeting ran a bit long this afternoon.",
+    "We talked about the plans for next week.",
+    "I read a few chapters of my book before bed.",
+    "The weather was cloudy with some wind.",
+    "I spent the evening cleaning the kitchen.",
+    "Traffic was normal on the way home.",
+    "I called my parents and we caught up.",
+]
+
+EMOTION_SENTENCES = {
+    'joy': [
+        "I felt really happy after talking to my sister today.",
+        "I'm grateful for the quiet morning and a good cup of coffee.",
+        "We went for a long walk and I felt calm and content.",
+        "I was thrilled and excited when the good news came in.",
+    ],
+    'sadness': [
+        "I felt lonely and sad when I got home.",
+        "Today I was disappointed and a little heartbroken.",
+        "Everything felt empty and gloomy this evening.",
+    ],
+    'anger': [
+        "I am so frustrated that I keep making the same mistakes.",
+        "I was angry and irritated with how the call went.",
+        "The delays made me furious and resentful.",
+    ],
+    'fear': [
+        "Work was stressful and I am worried about the deadline.",
+        "I felt anxious and nervous before the appointment.",
+        "I'm scared and uneasy about what comes next.",
+    ],
+    'love': [
+        "I love the time I spend with my family.",
+        "I cherish these evenings and feel real warmth and affection.",
+    ],
+    'surprise': [
+        "Honestly I was surprised by how well the exam went.",
+        "I was shocked and amazed by the unexpected call.",
+    ],
+}
+
+BIAS_SENTENCES = {
+    'Catastrophizing': [
+        "Nothing ever goes right for me, everything is terrible.",
+        "I can't handle anything anymore, it's completely hopeless.",
+        "Everyone will see it was a disaster and my career is over.",
+    ],
+    'Black-and-white Thinking': [
+        "Either I do it perfectly or I am a complete failure.",
+        "It's all or nothing, I was totally wrong about everything.",
+        "I always mess up and never get anything right.",
+    ],
+    'Emotional Reasoning': [
+        "I feel stupid, so that means I must be stupid.",
+        "It feels like everyone is against me, which means they are.",
+        "Because I feel guilty it must be my fault.",
+    ],
+    'Fortune Telling': [
+        "I know this presentation is going to fail tomorrow.",
+        "It's going to go wrong, things will be terrible.",
+        "I'm sure the interview will go badly and I will fail.",
+    ],
+    'Overgeneralization': [
+        "This always happens to me whenever I try something new.",
+        "Once I messed up and now I never get it right.",
+        "Everyone is like that, nobody ever thinks of me.",
+    ],
+    'Personalization': [
+        "It's all my fault that the project slipped.",
+        "There must be something wrong with me, why me again.",
+    ],
+    'Mind Reading': [
+        "My manager probably thinks I am not good enough.",
+        "I can tell they don't like me, they must think I'm lazy.",
+    ],
+}
+
+
+@dataclass
+class SyntheticEntry:
+    """One generated entry and the knobs it was generated with."""
+    text: str
+    words: int
+    bias_density: float
+    emotion_mix: Dict[str, float] = field(default_factory=dict)
+
+
+def _word_count(sentence: str) -> int:
+    return len(sentence.split())
+
+
+def make_corpus(
+    count: int,
+    seed: int = 7,
+    min_words: int = 10,
+    max_words: int = 20000,
+    bias_densities: Sequence[float] = (0.0, 0.05, 0.2, 0.5),
+    emotions: Optional[Sequence[str]] = None
+) -> List[SyntheticEntry]:
+    """
+    Generate a reproducible synthetic journal corpus.
+
+    Args:
+        count: Number of entries
+        seed: Random seed; the same seed gives the same corpus
+        min_words: Shortest entry length in words
+        max_words: Longest entry length in words
+        bias_densities: Share of bias-trigger sentences, one picked per entry
+        emotions: Emotions to mix in (all of EMOTION_SENTENCES by default)
+
+    Returns:
+        Entries with their text and generation parameters
+    """
+    rng = random.Random(seed)
+    emotions = list(emotions or EMOTION_SENTENCES)
+    bias_pool = [sentence for sentences in BIAS_SENTENCES.values() for sentence in sentences]
+    log_min, log_max = math.log(min_words), math.log(max_words)
+
+    corpus = []
+    for _ in range(count):
+        target = int(round(math.exp(rng.uniform(log_min, log_max))))
+        bias_density = rng.choice(bias_densities)
+
+        # Dirichlet(1, ..., 1) weights over the emotions and neutral filler
+        weights = [rng.gammavariate(1.0, 1.0) for _ in range(len(emotions) + 1)]
+        total = sum(weights)
+        mix = {name: weight / total for name, weight in zip(emotions + ['neutral'], weights)}
+        pools = [EMOTION_SENTENCES[name] for name in emotions] + [NEUTRAL_SENTENCES]
+
+        sentences = []
+        words = 0
+        while words < target:
+            if rng.random() < bias_density:
+                sentence = rng.choice(bias_pool)
+            else:
+                sentence = rng.choice(rng.choices(pools, weights=weights)[0])
+            if words and words + _word_count(sentence) > target:
+                break
+            sentences.append(sentence)
+            words += _word_count(sentence)
+
+        # Short targets may be under one sentence; trim to the word budget
+        text = ' '.join(sentences)
+        if words > target:
+            text = ' '.join(text.split()[:max(target, 1)])
+            words = _word_count(text)
+
+        corpus.append(SyntheticEntry(text, words, bias_density, mix))
+
+    return corpus
+
+
+def make_vader_corpus(count: int, lexicon: List[str], seed: int = 7) -> List[str]:
+    """Mix journal sentences with tokens that exercise VADER's special rules."""
+    rng = random.Random(seed)
+    vocabulary = (
+        rng.sample(lexicon, 500) + list(BOOSTER_DICT) + NEGATE
+        + ' '.join(SPECIAL_CASES).split()
+        + ['but', 'BUT', 'least', 'at', 'very', 'no', 'No', 'or', 'nor', 'kind', 'of',
+           'GOOD', 'HAPPY', 'Sad!', ':)', ':(', '\U0001F600', 'x\U0001F641', '??', '!!!']
+    )
+    corpus = []
+    for _ in range(count):
+        parts = [rng.choice(SAMPLE_SENTENCES)]
+        parts += [rng.choice(vocabulary) for _ in range(rng.choice([0, 3, 8, 20]))]
+        rng.shuffle(parts)
+        corpus.append(' '.join(parts) + rng.choice(['', '!', '?', '!!', '??']))
+    return corpus
+
+
+def make_timeline(count: int, seed: int = 7) -> pd.DataFrame:
+    """Build a sorted timeline of entries, a few hours to a few weeks apart."""
+    rng = random.Random(seed)
+    timestamp = pd.Timestamp('2025-01-01')
+    rows = []
+    for _ in range(count):
+        timestamp += pd.Timedelta(hours=rng.choice([1, 5, 20, 24, 30, 72, 400]))
+        # Repeated valences exercise pandas' same-value clean-ups
+        valence = rng.choice([0.0, 0.5, round(rng.uniform(-1, 1), 4)])
+        rows.append({'timestamp': timestamp, 'valence': valence})
+    return pd.DataFrame(rows)
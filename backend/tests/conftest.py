@@ -0,0 +1,42 @@
+"""Shared fixed inputs for the parity tests."""
+import pytest
+
+from sentiment_analyzer import SentimentAnalyzer
+from synthetic_corpus import SAMPLE_SENTENCES, make_corpus, make_timeline, make_vader_corpus
+
+# Below, between and above the detectors' valence gates
+VALENCES = [-0.5, -0.12, 0.3]
+
+
+@pytest.fixture(scope='session')
+def vader_corpus():
+    """Entries salted with VADER's special-rule tokens, plus plain and empty ones."""
+    lexicon = list(SentimentAnalyzer().vader.lexicon)
+    return make_vader_corpus(300, lexicon) + SAMPLE_SENTENCES + ['', '   ']
+
+
+@pytest.fixture
+def timeline():
+    """A user's timeline of valences, a few hours to a few weeks apart."""
+    return make_timeline(200)
+
+
+@pytest.fixture(scope='session')
+def bias_corpus():
+    """Synthetic entries of up to 500 words, plus hand-written edge cases."""
+    return [entry.text for entry in make_corpus(100, seed=7, max_words=500)] + [
+        "",
+        "I always mess up and I never get anything right.",
+        # Lowercasing changes the length, so offsets into the lowered text differ
+        "İstanbul was awful, I always fail and everything is ruined.",
+        "I ALWAYS ruin it and NEVER learn.",
+        "I feel like a failure, so I must be one.",
+        "I don't always fail, but maybe I never really get it right.",
+        "Not everything is ruined,sometimes it's fine. I always mess up",
+    ]
+
+
+@pytest.fixture(params=VALENCES)
+def valence(request):
+    """Each sentiment valence the bias tests run at."""
+    return request.param
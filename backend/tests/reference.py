@@ -0,0 +1,95 @@
+"""
+Reference implementations the optimized analyzers must agree with.
+
+Each is the straightforward version an optimization replaced, kept so
+the parity tests can compare against it and the benchmarks can time it.
+"""
+import re
+from typing import Dict, List
+
+from bias_detector import BiasDetector
+from enhanced_bias_detector import EnhancedBiasDetector
+
+
+def per_pattern_detect(detector: EnhancedBiasDetector, text: str,
+                       sentiment_valence: float) -> List[Dict]:
+    """The original `detect_all`, one `re.finditer` per pattern, kept as a baseline."""
+    text_lower = text.lower()
+    detected_biases = []
+    context = detector.context_modifiers.index(text_lower)
+    for bias_type, patterns in detector.pack.patterns.items():
+        gate = detector.VALENCE_GATES.get(bias_type)
+        if gate is not None and not sentiment_valence < gate:
+            continue
+        max_confidence = 0.0
+        best_match = None
+        for pattern, base_confidence in patterns:
+            for match in re.finditer(pattern, text_lower, re.IGNORECASE):
+                confidence = detector._calculate_confidence(
+                    context, match.start(), match.end(), base_confidence
+                )
+                if confidence > max_confidence:
+                    max_confidence = confidence
+                    best_match = match
+        if best_match and max_confidence >= 0.5:
+            detected_biases.append({
+                'type': bias_type,
+                'pattern': detector._extract_match(text, best_match.start(), best_match.end()),
+                'explanation': detector._get_explanation(bias_type),
+                'confidence': round(max_confidence, 2)
+            })
+    detected_biases.sort(key=lambda x: x['confidence'], reverse=True)
+    return detected_biases[:5]
+
+
+def per_pattern_basic_detect(detector: BiasDetector, text: str,
+                             sentiment_valence: float) -> List[Dict]:
+    """
+    The original BiasDetector.detect_all, kept as a baseline: one
+    `re.search` per pattern, a second scan of the original text for the
+    excerpt, and every black-and-white pattern. Biases have only 'type'
+    and 'pattern'.
+    """
+    text_lower = text.lower()
+    candidates = detector.pack.trigger_filter.candidates(text_lower)
+    detected_biases = []
+    gates = {'Catastrophizing': sentiment_valence < -0.2,
+             'Fortune Telling': sentiment_valence < -0.1}
+    for bias_type, patterns in detector.pack.patterns.items():
+        if not gates.get(bias_type, True) or bias_type not in candidates:
+            continue
+        patterns = [pattern for pattern, _ in patterns]
+        if bias_type == 'Black-and-white Thinking':
+            if sum(1 for pattern in patterns if re.search(pattern, text_lower, re.IGNORECASE)) >= 2:
+                detected_biases.append({'type': bias_type,
+                                        'pattern': 'Binary language patterns detected'})
+            continue
+        for pattern in patterns:
+            if re.search(pattern, text_lower, re.IGNORECASE):
+                matches = list(re.finditer(pattern, text, re.IGNORECASE))
+                excerpt = detector._excerpt(text, *matches[0].span()) if matches else ""
+                detected_biases.append({'type': bias_type, 'pattern': excerpt})
+                break
+    return detected_biases
+
+
+class NoTriggerFilter:
+    """Stand-in for `TriggerFilter` that never skips a bias type, as a baseline."""
+
+    def __init__(self, trigger_filter):
+        self.bias_types = set(trigger_filter.words)
+
+    def candidates(self, text_lower: str):
+        return self.bias_types
+
+
+def split_window_confidence(detector: EnhancedBiasDetector, text: str, start: int, end: int,
+                            base_confidence: float) -> float:
+    """The original confidence check, splitting the window around each match, kept as a baseline."""
+    confidence = base_confidence
+    context_words = set(text[max(0, start - 50):min(len(text), end + 50)].split())
+    if any(neg in context_words for neg in detector.negations):
+        confidence *= 0.7
+    if any(qual in context_words for qual in detector.qualifiers):
+        confidence *= 0.85
+    return confidence
@@ -0,0 +1,15 @@
+"""The modifier index must give the confidences splitting each match's window gives."""
+from enhanced_bias_detector import EnhancedBiasDetector
+from tests.reference import split_window_confidence
+
+
+def test_indexed_matches_split_windows(bias_corpus):
+    detector = EnhancedBiasDetector()
+    for text in bias_corpus:
+        text_lower = text.lower()
+        context = detector.context_modifiers.index(text_lower)
+        for group in detector.pack.pattern_groups.values():
+            for index, start, end in group.matches(text_lower):
+                base = group.confidences[index]
+                assert (detector._calculate_confidence(context, start, end, base)
+                        == split_window_confidence(detector, text_lower, start, end, base)), text
@@ -0,0 +1,22 @@
+"""Bounding the basic pack's gaps must not change what its patterns find."""
+import copy
+import json
+
+from bias_detector import BiasDetector
+from pattern_packs import PatternPack, pack_path
+from synthetic_corpus import make_corpus
+
+
+def test_bounded_gaps_match_unbounded(valence):
+    detector = BiasDetector()
+    with open(pack_path('basic'), encoding='utf-8') as f:
+        spec = json.load(f)
+    # The pack as it was before the gaps were bounded
+    unbounded_spec = copy.deepcopy(spec)
+    unbounded_spec['macros']['gap'] = '.*'
+    unbounded = BiasDetector(pattern_pack=PatternPack(unbounded_spec))
+
+    # Entries short enough that no match can need more than the bound
+    for entry in make_corpus(300, seed=7, max_words=30):
+        assert (detector.detect_all(entry.text, valence)
+                == unbounded.detect_all(entry.text, valence)), entry.text
@@ -0,0 +1,19 @@
+"""The trigger-word prefilter must never change which biases are found."""
+import pytest
+
+from bias_detector import BiasDetector
+from enhanced_bias_detector import EnhancedBiasDetector
+from pattern_packs import PatternPack
+from tests.reference import NoTriggerFilter
+
+
+@pytest.mark.parametrize('detector_class', [BiasDetector, EnhancedBiasDetector])
+def test_prefiltered_matches_all_patterns(detector_class, bias_corpus, valence):
+    filtered = detector_class()
+    # A private copy, not the shared cached one
+    unfiltered_pack = PatternPack(filtered.pack.spec)
+    unfiltered_pack.trigger_filter = NoTriggerFilter(filtered.pack.trigger_filter)
+    unfiltered = detector_class(pattern_pack=unfiltered_pack)
+
+    for text in bias_corpus:
+        assert filtered.detect_all(text, valence) == unfiltered.detect_all(text, valence), text
@@ -0,0 +1,28 @@
+"""Master-regex bias detection must find what one scan per pattern finds."""
+from typing import Dict, List
+
+from bias_detector import BiasDetector
+from enhanced_bias_detector import EnhancedBiasDetector
+from tests.reference import per_pattern_basic_detect, per_pattern_detect
+
+
+def same_biases(baseline: List[Dict], biases: List[Dict]) -> bool:
+    """Whether `biases` agree with a baseline's on every field the baseline reports."""
+    return len(baseline) == len(biases) and all(
+        all(bias[key] == value for key, value in expected.items())
+        for expected, bias in zip(baseline, biases)
+    )
+
+
+def test_enhanced_matches_per_pattern(bias_corpus, valence):
+    detector = EnhancedBiasDetector()
+    for text in bias_corpus:
+        assert same_biases(per_pattern_detect(detector, text, valence),
+                           detector.detect_all(text, valence)), text
+
+
+def test_basic_matches_per_pattern(bias_corpus, valence):
+    detector = BiasDetector()
+    for text in bias_corpus:
+        assert same_biases(per_pattern_basic_detect(detector, text, valence),
+                           detector.detect_all(text, valence)), text
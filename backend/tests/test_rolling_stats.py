@@ -0,0 +1,43 @@
+"""RollingSentimentStats must match recomputing the timeline with pandas."""
+import numpy as np
+import pandas as pd
+
+from enhanced_sentiment import EnhancedSentimentAnalyzer
+from rolling_stats import RollingSentimentStats, TimelineStats
+
+
+def assert_matches_pandas(df, result):
+    analyzer = EnhancedSentimentAnalyzer()
+    assert np.array_equal(result['rolling_avg'].to_numpy(),
+                          analyzer.calculate_rolling_average(df)['rolling_avg'].to_numpy())
+    assert np.array_equal(result['volatile'].to_numpy(),
+                          analyzer.detect_volatility(df).to_numpy())
+    assert np.array_equal(result['shift'].to_numpy(),
+                          analyzer.detect_mood_shifts(df)['shift'].to_numpy())
+    assert np.allclose(result['rolling_std'], df['valence'].rolling(window=7, min_periods=2).std(),
+                       rtol=0, atol=1e-12, equal_nan=True)
+
+
+def test_updates_match_pandas(timeline):
+    stats = RollingSentimentStats()
+    rows = [stats.update(ts, v) for ts, v in zip(timeline['timestamp'], timeline['valence'])]
+    assert_matches_pandas(timeline, pd.DataFrame(rows))
+
+
+def test_resumed_state_matches_pandas(timeline):
+    half = len(timeline) // 2
+    stats = RollingSentimentStats()
+    first = stats.update_frame(timeline.iloc[:half])
+    resumed = RollingSentimentStats.from_dict(stats.to_dict())
+    assert_matches_pandas(timeline, pd.concat([first, resumed.update_frame(timeline.iloc[half:])]))
+
+
+def test_timeline_stats_match_pandas_as_entries_arrive(timeline):
+    timelines = TimelineStats()
+    for end in (50, 51, 51, 120, len(timeline)):
+        assert_matches_pandas(timeline.iloc[:end], timelines.frame('user', timeline.iloc[:end]))
+
+    # An earlier entry re-scored: the stats start over
+    rescored = timeline.copy()
+    rescored.loc[10, 'valence'] = -0.9
+    assert_matches_pandas(rescored, timelines.frame('user', rescored))
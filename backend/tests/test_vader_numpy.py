@@ -0,0 +1,11 @@
+"""VectorizedVader must score exactly like vaderSentiment's polarity_scores."""
+from sentiment_analyzer import SentimentAnalyzer
+from vader_numpy import VectorizedVader
+
+
+def test_batch_matches_polarity_scores(vader_corpus):
+    analyzer = SentimentAnalyzer()
+    engine = VectorizedVader(analyzer.vader)
+
+    expected = [analyzer.vader.polarity_scores(text) for text in vader_corpus]
+    assert engine.polarity_scores_batch(vader_corpus) == expected
@@ -0,0 +1,106 @@
+"""Shared text preprocessing for the analyzers."""
+import re
+import string
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+TOKEN_RE = re.compile(r'\S+')
+
+# Sentence boundaries: whitespace after terminal punctuation, or a line break
+SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+|\s*\n\s*')
+
+# Characters trimmed from token edges before lexicon lookups
+EDGE_PUNCTUATION = string.punctuation + '\u2018\u2019\u201c\u201d\u2026'
+
+
+@dataclass(frozen=True)
+class PreparedEntry:
+    """A journal entry tokenized once and shared by every analysis stage."""
+    text: str
+    lower: str
+    tokens: Tuple[str, ...]
+
+    @property
+    def word_count(self) -> int:
+        """Number of whitespace-separated words."""
+        return len(self.tokens)
+
+
+def prepare_entry(text: str) -> PreparedEntry:
+    """
+    Lowercase and tokenize text once.
+
+    Tokens match `text.lower().split()`. Only the token strings are kept:
+    recording each token's offsets cost more than the splits it replaced.
+    """
+    lower = text.lower()
+    return PreparedEntry(text, lower, tuple(lower.split()))
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences at whitespace boundaries.
+
+    Only whitespace is dropped, so the words of the sentences joined back
+    together are exactly `text.split()`.
+    """
+    return [sentence for sentence in SENTENCE_BREAK_RE.split(text) if sentence.strip()]
+
+
+def strip_token(token: str) -> str:
+    """Trim surrounding punctuation from a token."""
+    return token.strip(EDGE_PUNCTUATION)
+
+
+def inflections(word: str) -> List[str]:
+    """Generate common inflected forms of a lexicon word."""
+    forms = [word, word + 's', word + 'es', word + 'ed', word + 'ing',
+             word + 'ly', word + 'ness']
+    if word.endswith('e'):
+        forms += [word + 'd', word[:-1] + 'ing']
+    if word.endswith('y'):
+        forms += [word[:-1] + 'ies', word[:-1] + 'ied', word[:-1] + 'ily',
+                  word[:-1] + 'iness']
+    return forms
+
+
+class LexiconMatcher:
+    """Single-pass matcher from tokens to lexicon categories.
+
+    Every lexicon word and its common inflections are compiled into one
+    hash table, so each token costs a single dictionary lookup and words
+    only match whole tokens (``mad`` no longer matches ``made``).
+    """
+
+    def __init__(self, lexicon: Dict[str, Iterable[str]]):
+        """Compile a {category: words} lexicon into a lookup table."""
+        self.categories = tuple(lexicon)
+        table: Dict[str, List[str]] = {}
+
+        for category, words in lexicon.items():
+            for word in words:
+                for form in inflections(word.lower()):
+                    matched = table.setdefault(form, [])
+                    if category not in matched:
+                        matched.append(category)
+
+        self.table: Dict[str, Tuple[str, ...]] = {
+            form: tuple(categories) for form, categories in table.items()
+        }
+
+    def count(self, tokens: Iterable[str]) -> Dict[str, int]:
+        """Count matching tokens per category, in lexicon order."""
+        counts: Dict[str, int] = {}
+        table = self.table
+
+        for token in tokens:
+            categories = table.get(token)
+            if categories is None:
+                categories = table.get(strip_token(token))
+                if categories is None:
+                    continue
+            for category in categories:
+                counts[category] = counts.get(category, 0) + 1
+
+        return {category: counts[category] for category in self.categories
+                if category in counts}
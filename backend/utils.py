@@ -46,3 +46,13 @@ def format_date(timestamp: datetime) -> str:
     """Format date for display."""
     return timestamp.strftime('%B %d, %Y')
 
+
+
+def analysis_version(sentiment_analyzer, bias_detector) -> str:
+    """
+    Version stamp for an entry analyzed by this analyzer and detector pair.
+    
+    Stored with each journal entry so re-scoring can pick out entries
+    produced by older scoring logic or patterns.
+    """
+    return f"{sentiment_analyzer.version}+{bias_detector.version}"
@@ -0,0 +1,389 @@
+"""Vectorized, VADER-compatible sentiment scoring with NumPy."""
+import heapq
+import math
+import string
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT,
+    C_INCR,
+    N_SCALAR,
+    NEGATE,
+    SPECIAL_CASES,
+    SentimentIntensityAnalyzer,
+)
+
+from lexicon_snapshot import vader_analyzer
+
+# Words whose identity matters to VADER's context rules (negation,
+# "least", "no", idioms and multi-word boosters). Every other token gets id 0.
+_KEYWORDS = sorted(
+    {'no', 'or', 'nor', 'never', 'so', 'this', 'without', 'doubt', 'least',
+     'at', 'very', 'kind', 'of', 'but'}
+    | {word for phrase in SPECIAL_CASES for word in phrase.split()}
+    | {word for phrase in BOOSTER_DICT if ' ' in phrase for word in phrase.split()}
+)
+
+
+def _strip_punc_if_word(token: str) -> str:
+    """Strip surrounding punctuation unless the token looks like an emoticon."""
+    stripped = token.strip(string.punctuation)
+    if len(stripped) <= 2:
+        return token
+    return stripped
+
+
+def _replay_but_check(sentiments: List[float], but_index: int) -> List[float]:
+    """
+    Reproduce VADER's `_but_check` exactly, in O(n log n).
+
+    VADER locates each score with `list.index(value)`, so when scores repeat
+    it can rescale an earlier equal-valued token instead of the current
+    one. Heaps of positions per value replay that lookup without the
+    quadratic scan.
+    """
+    positions: Dict[float, List[int]] = {}
+    for i, value in enumerate(sentiments):
+        positions.setdefault(value, []).append(i)
+
+    current = list(sentiments)
+    for value in sentiments:
+        heap = positions[value]
+        while current[heap[0]] != value:
+            heapq.heappop(heap)
+        si = heap[0]
+
+        if si < but_index:
+            updated = value * 0.5
+        elif si > but_index:
+            updated = value * 1.5
+        else:
+            continue
+
+        current[si] = updated
+        heapq.heappush(positions.setdefault(updated, []), si)
+
+    return current
+
+
+class VectorizedVader:
+    """Score whole batches with array operations, matching `polarity_scores`.
+
+    The lexicon and booster tables are loaded into NumPy arrays once. A
+    batch is flattened into one token array, each token is mapped to its
+    lexicon index, and VADER's per-token rules (boosters, caps emphasis,
+    negation and idiom windows, "least", "but") are applied as shifted
+    array operations over the whole batch at once.
+    """
+
+    def __init__(self, vader: Optional[SentimentIntensityAnalyzer] = None):
+        """
+        Load lexicons into arrays.
+
+        Args:
+            vader: Existing analyzer to take the lexicon from, to avoid
+                parsing the lexicon files again
+        """
+        vader = vader or vader_analyzer()
+        self.emojis = vader.emojis
+
+        self.lexicon_index = {word: i for i, word in enumerate(vader.lexicon)}
+        self.lexicon_values = np.fromiter(vader.lexicon.values(), dtype=np.float64,
+                                          count=len(vader.lexicon))
+        self.booster_values = {word: value for word, value in BOOSTER_DICT.items()
+                               if ' ' not in word}
+        self.negations = frozenset(NEGATE)
+
+        self.keyword_ids = {word: i + 1 for i, word in enumerate(_KEYWORDS)}
+        self._base = len(self.keyword_ids) + 1
+        self._special_bigrams = self._phrase_table(SPECIAL_CASES, 2)
+        self._special_trigrams = self._phrase_table(SPECIAL_CASES, 3)
+        self._booster_bigrams = self._phrase_table(BOOSTER_DICT, 2)
+        self._booster_trigrams = self._phrase_table(BOOSTER_DICT, 3)
+
+        # polarity_scores only replaces emojis one character at a time
+        self._emoji_chars = frozenset(emoji for emoji in self.emojis if len(emoji) == 1)
+
+    def _phrase_table(self, phrases: Dict[str, float], length: int):
+        """Encode n-word phrases as sorted integer codes and matching values."""
+        table = {}
+        for phrase, value in phrases.items():
+            words = phrase.split()
+            if len(words) == length:
+                table[self._code([self.keyword_ids[w] for w in words])] = value
+        codes = np.array(sorted(table), dtype=np.int64)
+        values = np.array([table[code] for code in codes], dtype=np.float64)
+        return codes, values
+
+    def _code(self, ids):
+        """Combine keyword ids (scalars or arrays) into one n-gram code."""
+        code = 0
+        for word_id in ids:
+            code = code * self._base + word_id
+        return code
+
+    @staticmethod
+    def _lookup(table, codes: np.ndarray):
+        """Return (matched mask, values) for each code in a phrase table."""
+        table_codes, table_values = table
+        if len(table_codes) == 0:
+            return np.zeros(len(codes), dtype=bool), np.zeros(len(codes))
+        slots = np.minimum(np.searchsorted(table_codes, codes), len(table_codes) - 1)
+        return table_codes[slots] == codes, table_values[slots]
+
+    def _replace_emojis(self, text: str) -> str:
+        """Swap emojis for their descriptions exactly like `polarity_scores`."""
+        if self._emoji_chars.isdisjoint(text):
+            return text.strip()
+
+        parts = []
+        prev_space = True
+        for char in text:
+            if char in self._emoji_chars:
+                if not prev_space:
+                    parts.append(' ')
+                parts.append(self.emojis[char])
+                prev_space = False
+            else:
+                parts.append(char)
+                prev_space = char == ' '
+        return ''.join(parts).strip()
+
+    def polarity_scores(self, text: str) -> Dict[str, float]:
+        """Score a single text; same output as VADER's `polarity_scores`."""
+        return self.polarity_scores_batch([text])[0]
+
+    def polarity_scores_batch(self, texts: Sequence[str]) -> List[Dict[str, float]]:
+        """Score a batch of texts with one pass of array operations."""
+        texts = [self._replace_emojis(text) for text in texts]
+
+        # Map every token to an id in a batch vocabulary so per-word work
+        # (punctuation stripping, lexicon lookups) runs once per distinct token
+        vocabulary: Dict[str, int] = {}
+        token_ids: List[int] = []
+        lengths = np.zeros(len(texts), dtype=np.int64)
+        for n, text in enumerate(texts):
+            tokens = text.split()
+            token_ids.extend([vocabulary.setdefault(token, len(vocabulary)) for token in tokens])
+            lengths[n] = len(tokens)
+
+        words = [_strip_punc_if_word(token) for token in vocabulary]
+        valences = self._token_valences(words, np.array(token_ids, dtype=np.int64), lengths)
+
+        entry_ids = np.repeat(np.arange(len(texts)), lengths)
+        totals = np.bincount(entry_ids, weights=valences, minlength=len(texts))
+        pos_sums = np.bincount(entry_ids, weights=np.where(valences > 0, valences + 1, 0.0),
+                               minlength=len(texts))
+        neg_sums = np.bincount(entry_ids, weights=np.where(valences < 0, valences - 1, 0.0),
+                               minlength=len(texts))
+        neu_counts = np.bincount(entry_ids, weights=valences == 0, minlength=len(texts))
+
+        results = []
+        for n, text in enumerate(texts):
+            results.append(self._score(text, lengths[n], totals[n], pos_sums[n],
+                                       neg_sums[n], neu_counts[n]))
+        return results
+
+    def _token_valences(self, words: List[str], token_ids: np.ndarray,
+                        lengths: np.ndarray) -> np.ndarray:
+        """Apply VADER's per-token rules to a flattened batch of tokens.
+
+        `words` holds the distinct stripped tokens; `token_ids` indexes into
+        it for every token of the batch.
+        """
+        total = len(token_ids)
+        if total == 0:
+            return np.zeros(0)
+
+        count = len(words)
+        lowers = [word.lower() for word in words]
+        lex_idx = np.fromiter((self.lexicon_index.get(w, -1) for w in lowers),
+                              dtype=np.int64, count=count)[token_ids]
+        in_lex = lex_idx >= 0
+        lex_val = np.where(in_lex, self.lexicon_values[np.maximum(lex_idx, 0)], 0.0)
+        booster = np.fromiter((self.booster_values.get(w, 0.0) for w in lowers),
+                              dtype=np.float64, count=count)[token_ids]
+        is_booster = np.fromiter((w in self.booster_values for w in lowers),
+                                 dtype=bool, count=count)[token_ids]
+        is_upper = np.fromiter((w.isupper() for w in words),
+                               dtype=bool, count=count)[token_ids]
+        negated = np.fromiter((w in self.negations or "n't" in w for w in lowers),
+                              dtype=bool, count=count)[token_ids]
+        kw = np.fromiter((self.keyword_ids.get(w, 0) for w in lowers),
+                         dtype=np.int64, count=count)[token_ids]
+
+        # Position of each token inside its entry, and the entry's length
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        pos = np.arange(total) - starts
+        entry_len = np.repeat(lengths, lengths)
+
+        cap_diff_entries = np.zeros(len(lengths), dtype=bool)
+        cap_diff_entries[lengths > 0] = self._cap_differential(is_upper, lengths)
+        cap_diff = np.repeat(cap_diff_entries, lengths)
+
+        def prev(arr, k, fill):
+            out = np.full(total, fill, dtype=arr.dtype)
+            out[k:] = arr[:-k]
+            return np.where(pos >= k, out, fill)
+
+        def nxt(arr, k, fill):
+            out = np.full(total, fill, dtype=arr.dtype)
+            out[:-k] = arr[k:]
+            return np.where(pos + k < entry_len, out, fill)
+
+        kid = self.keyword_ids
+        kw_p1, kw_p2, kw_p3 = prev(kw, 1, 0), prev(kw, 2, 0), prev(kw, 3, 0)
+        kw_n1, kw_n2 = nxt(kw, 1, 0), nxt(kw, 2, 0)
+
+        # "no" before another lexicon word is a negator, not a sentiment word
+        valence = lex_val.copy()
+        valence = np.where((kw == kid['no']) & nxt(in_lex, 1, False), 0.0, valence)
+        after_no = (kw_p1 == kid['no']) | (kw_p2 == kid['no']) | \
+            ((kw_p3 == kid['no']) & ((kw_p1 == kid['or']) | (kw_p1 == kid['nor'])))
+        valence = np.where(after_no, lex_val * N_SCALAR, valence)
+
+        caps = is_upper & cap_diff
+        valence = np.where(caps, np.where(valence > 0, valence + C_INCR, valence - C_INCR),
+                           valence)
+
+        so_or_this = (kid['so'], kid['this'])
+        for start_i in range(3):
+            k = start_i + 1
+            applies = (pos > start_i) & ~prev(in_lex, k, True)
+
+            # scalar_inc_dec on the k-th preceding token
+            scalar = prev(booster, k, 0.0)
+            scalar = np.where(valence < 0, scalar * -1, scalar)
+            boost_caps = prev(is_booster, k, False) & prev(is_upper, k, False) & cap_diff
+            scalar = np.where(boost_caps, np.where(valence > 0, scalar + C_INCR, scalar - C_INCR),
+                              scalar)
+            if start_i == 1:
+                scalar = np.where(scalar != 0, scalar * 0.95, scalar)
+            elif start_i == 2:
+                scalar = np.where(scalar != 0, scalar * 0.9, scalar)
+            checked = valence + scalar
+
+            # _negation_check
+            if start_i == 0:
+                flip = prev(negated, 1, False)
+                checked = np.where(flip, checked * N_SCALAR, checked)
+            elif start_i == 1:
+                never_so = (kw_p2 == kid['never']) & np.isin(kw_p1, so_or_this)
+                without_doubt = (kw_p2 == kid['without']) & (kw_p1 == kid['doubt'])
+                flip = ~never_so & ~without_doubt & prev(negated, 2, False)
+                checked = np.where(never_so, checked * 1.25, checked)
+                checked = np.where(flip, checked * N_SCALAR, checked)
+            else:
+                never_so = ((kw_p3 == kid['never']) & np.isin(kw_p2, so_or_this)) | \
+                    np.isin(kw_p1, so_or_this)
+                without_doubt = (kw_p3 == kid['without']) & \
+                    ((kw_p2 == kid['doubt']) | (kw_p1 == kid['doubt']))
+                flip = ~never_so & ~without_doubt & prev(negated, 3, False)
+                checked = np.where(never_so, checked * 1.25, checked)
+                checked = np.where(flip, checked * N_SCALAR, checked)
+                checked = self._special_idioms(checked, kw, kw_p1, kw_p2, kw_p3,
+                                               kw_n1, kw_n2, pos, entry_len)
+
+            valence = np.where(applies, checked, valence)
+
+        # _least_check
+        least_p1 = ~prev(in_lex, 1, True) & (kw_p1 == kid['least'])
+        least_far = least_p1 & (pos > 1) & (kw_p2 != kid['at']) & (kw_p2 != kid['very'])
+        least_near = least_p1 & (pos == 1)
+        valence = np.where(least_far | least_near, valence * N_SCALAR, valence)
+
+        # Boosters and "kind of" contribute nothing themselves
+        kind_of = (kw == kid['kind']) & (kw_n1 == kid['of'])
+        active = in_lex & ~is_booster & ~kind_of
+        valence = np.where(active, valence, 0.0)
+
+        return self._but_check(valence, kw == kid['but'], pos, lengths)
+
+    @staticmethod
+    def _cap_differential(is_upper: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """True for non-empty entries where some but not all tokens are ALL CAPS."""
+        nonempty = lengths[lengths > 0]
+        offsets = np.cumsum(nonempty) - nonempty
+        upper_counts = np.add.reduceat(is_upper.astype(np.int64), offsets)
+        return (upper_counts > 0) & (upper_counts < nonempty)
+
+    def _special_idioms(self, valence, kw, kw_p1, kw_p2, kw_p3, kw_n1, kw_n2,
+                        pos, entry_len):
+        """Vectorized `_special_idioms_check` (only reached when pos > 2)."""
+        code = self._code
+        sequences = [
+            (self._special_bigrams, code([kw_p1, kw])),
+            (self._special_trigrams, code([kw_p2, kw_p1, kw])),
+            (self._special_bigrams, code([kw_p2, kw_p1])),
+            (self._special_trigrams, code([kw_p3, kw_p2, kw_p1])),
+            (self._special_bigrams, code([kw_p3, kw_p2])),
+        ]
+        # The first matching sequence wins, so apply them in reverse order
+        for table, codes in reversed(sequences):
+            matched, values = self._lookup(table, codes)
+            valence = np.where(matched, values, valence)
+
+        matched, values = self._lookup(self._special_bigrams, code([kw, kw_n1]))
+        valence = np.where(matched & (entry_len - 1 > pos), values, valence)
+        matched, values = self._lookup(self._special_trigrams, code([kw, kw_n1, kw_n2]))
+        valence = np.where(matched & (entry_len - 1 > pos + 1), values, valence)
+
+        for table, codes in ((self._booster_trigrams, code([kw_p3, kw_p2, kw_p1])),
+                             (self._booster_bigrams, code([kw_p3, kw_p2])),
+                             (self._booster_bigrams, code([kw_p2, kw_p1]))):
+            matched, values = self._lookup(table, codes)
+            valence = np.where(matched, valence + values, valence)
+
+        return valence
+
+    @staticmethod
+    def _but_check(valence, is_but, pos, lengths):
+        """Halve sentiment before the first "but" and boost it by half after."""
+        if not is_but.any():
+            return valence
+
+        valence = valence.copy()
+        starts = np.cumsum(lengths) - lengths
+        entry_ids = np.repeat(np.arange(len(lengths)), lengths)
+        for entry in np.unique(entry_ids[is_but]):
+            begin, end = starts[entry], starts[entry] + lengths[entry]
+            but_index = int(pos[begin:end][is_but[begin:end]][0])
+            valence[begin:end] = _replay_but_check(valence[begin:end].tolist(), but_index)
+
+        return valence
+
+    @staticmethod
+    def _score(text, length, total, pos_sum, neg_sum, neu_count) -> Dict[str, float]:
+        """Turn summed token valences into VADER's score dictionary."""
+        if length == 0:
+            return {'neg': 0.0, 'neu': 0.0, 'pos': 0.0, 'compound': 0.0}
+
+        ep_count = min(text.count('!'), 4)
+        qm_count = text.count('?')
+        qm_amplifier = 0
+        if qm_count > 1:
+            qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+        punct = ep_count * 0.292 + qm_amplifier
+
+        sum_s = float(total)
+        if sum_s > 0:
+            sum_s += punct
+        elif sum_s < 0:
+            sum_s -= punct
+        compound = max(-1.0, min(1.0, sum_s / math.sqrt(sum_s * sum_s + 15)))
+
+        pos_sum = float(pos_sum)
+        neg_sum = float(neg_sum)
+        if pos_sum > math.fabs(neg_sum):
+            pos_sum += punct
+        elif pos_sum < math.fabs(neg_sum):
+            neg_sum -= punct
+
+        denominator = pos_sum + math.fabs(neg_sum) + neu_count
+        return {
+            'neg': round(math.fabs(neg_sum / denominator), 3),
+            'neu': round(math.fabs(neu_count / denominator), 3),
+            'pos': round(math.fabs(pos_sum / denominator), 3),
+            'compound': round(compound, 4)
+        }
@@ -32,7 +32,8 @@ class EmotionalTimeline:
         Create interactive emotional timeline chart.
         
         Args:
-            df: DataFrame with 'timestamp' and 'valence' columns
+            df: DataFrame with 'timestamp' and 'valence' columns, and
+                optionally a precomputed 'rolling_avg' (e.g. from TimelineStats)
             rolling_window: Days for rolling average
         
         Returns:
@@ -44,12 +45,13 @@ class EmotionalTimeline:
         df = df.copy()
         df = df.sort_values('timestamp')
         
-        # Calculate rolling average
-        df.set_index('timestamp', inplace=True)
-        df['rolling_avg'] = df['valence'].rolling(
-            window=f'{rolling_window}D', min_periods=1
-        ).mean()
-        df.reset_index(inplace=True)
+        # Calculate rolling average, unless it was kept up to date incrementally
+        if 'rolling_avg' not in df.columns:
+            df.set_index('timestamp', inplace=True)
+            df['rolling_avg'] = df['valence'].rolling(
+                window=f'{rolling_window}D', min_periods=1
+            ).mean()
+            df.reset_index(inplace=True)
         
         fig = go.Figure()
         
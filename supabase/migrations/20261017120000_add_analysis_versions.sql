@@ -0,0 +1,24 @@
+/*
+  # Stamp analysis results with the version that produced them
+
+  ## Changes
+  - journal_entries.analyzer_version (text) - Sentiment analyzer and bias
+    pattern set that produced sentiment_score, valence and the entry's biases
+  - biases.pattern_version (text) - Bias pattern set that detected the row
+
+  Rows written before this migration have NULL versions and are treated as
+  stale by the re-scoring tool.
+
+  ## Indexes
+  - (analyzer_version, id) so stale entries can be paged through in id order
+  - pattern_version for auditing bias rows by pattern set
+*/
+
+ALTER TABLE journal_entries ADD COLUMN IF NOT EXISTS analyzer_version text;
+ALTER TABLE biases ADD COLUMN IF NOT EXISTS pattern_version text;
+
+CREATE INDEX IF NOT EXISTS idx_journal_entries_analyzer_version
+  ON journal_entries(analyzer_version, id);
+
+CREATE INDEX IF NOT EXISTS idx_biases_pattern_version
+  ON biases(pattern_version);
@@ -0,0 +1,45 @@
+/*
+  # Save re-computed analyses in one transaction
+
+  ## Changes
+  - save_analyses(analyses jsonb) - For a JSON array of analyses, each with
+    entry_id, sentiment_score, valence, analyzer_version, pattern_version and
+    a biases array of {type, pattern, explanation}: updates the entries'
+    scores and versions, and replaces their bias rows
+
+  The update, delete and insert run in the function's single transaction, so
+  a failure leaves every entry in the chunk as it was. One RPC call replaces
+  a request per entry.
+
+  ## Security
+  - SECURITY INVOKER: the caller's row level security policies still apply
+*/
+
+CREATE OR REPLACE FUNCTION save_analyses(analyses jsonb)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY INVOKER
+AS $$
+BEGIN
+  UPDATE journal_entries AS e
+  SET sentiment_score = (a->>'sentiment_score')::real,
+      valence = (a->>'valence')::real,
+      analyzer_version = a->>'analyzer_version'
+  FROM jsonb_array_elements(analyses) AS a
+  WHERE e.id = (a->>'entry_id')::uuid;
+
+  DELETE FROM biases
+  WHERE entry_id IN (
+    SELECT (a->>'entry_id')::uuid FROM jsonb_array_elements(analyses) AS a
+  );
+
+  INSERT INTO biases (entry_id, bias_type, detected_pattern, explanation, pattern_version)
+  SELECT (a->>'entry_id')::uuid,
+         b->>'type',
+         b->>'pattern',
+         b->>'explanation',
+         a->>'pattern_version'
+  FROM jsonb_array_elements(analyses) AS a,
+       jsonb_array_elements(a->'biases') AS b;
+END;
+$$;